@@ -1,19 +1,73 @@
-from flask import Flask, render_template_string, request, redirect, url_for, send_file, current_app
+import time
+_baslangic = time.perf_counter()
+import click
+from flask import Flask, render_template, request, redirect, url_for, send_file, current_app, g, jsonify, make_response
 from io import BytesIO
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from jinja2 import ChoiceLoader, DictLoader, FileSystemBytecodeCache
+from markupsafe import escape
+from werkzeug.security import safe_join
+from werkzeug.wsgi import ClosingIterator
 import os
+import re
+import functools
+import hashlib
+import importlib
 import json
-import matplotlib
-matplotlib.use('Agg')  # Non-interactive backend
-import matplotlib.pyplot as plt
-import base64
-from datetime import datetime
+import atexit
+import sqlite3
+import mimetypes
+import zlib
+from collections import OrderedDict
+import threading
+from datetime import datetime, date, timedelta
+
+# Başlangıç süresi raporu: modül yüklenirken aşamaların ve sonradan ilk
+# kullanımda yüklenen kütüphanelerin süresi (ms). Ayrıntı için:
+#   python -X importtime -c "import app"
+BASLANGIC_SURELERI = []
+_asama_baslangici = _baslangic
+
+def asama_bitti(ad):
+    global _asama_baslangici
+    simdi = time.perf_counter()
+    BASLANGIC_SURELERI.append((ad, (simdi - _asama_baslangici) * 1000))
+    _asama_baslangici = simdi
+
+asama_bitti('flask ve standart kütüphane')
+
+from chart_data import hareketli_ortalama, lttb, onek_toplamlari
+from plan_grid import PlanGrid, PlanHistory
+from plan_view import PlanView
+from svg_charts import dagilim_svg, ilerleme_svg, puan_svg
+from plan_generator import cohort_pool, generate_cohort, generate_plan
+from static_sikistir import STATIC_ESLERI
+try:
+    import brotli
+except ImportError:
+    # brotli kurulu değilse yalnızca gzip kullanılır
+    brotli = None
+from storage import (ConflictError, ConnectionPool, JournalStore, Partition, PartitionCache, SqliteStore,
+                     WriteError, apply_change, json_default)
+
+asama_bitti('uygulama modülleri')
+
+# PDF (ReportLab) ve PDF'teki grafik (matplotlib, charts.py) kütüphaneleri
+# yalnızca PDF isteklerinde gerekir; ilk kullanımda yüklenir. Böylece her worker
+# açılışı ve soğuk başlangıç bu yükü yalnızca gerçekten PDF istendiğinde öder.
+_gec_yuklenenler = {}
+_gec_yukleme_kilidi = threading.Lock()
+
+def gec_yukle(ad, yukle):
+    # yukle() bir kez çalışır; süresi başlangıç raporuna eklenir
+    if ad not in _gec_yuklenenler:
+        with _gec_yukleme_kilidi:
+            if ad not in _gec_yuklenenler:
+                bas = time.perf_counter()
+                _gec_yuklenenler[ad] = yukle()
+                sure = (time.perf_counter() - bas) * 1000
+                BASLANGIC_SURELERI.append((f'{ad} (ilk kullanım)', sure))
+                print(f"{ad} yüklendi: {sure:.0f} ms")
+    return _gec_yuklenenler[ad]
 
 # Türkçe karakter desteği için font kaydet
 TURKISH_FONT = 'Helvetica'  # Varsayılan
@@ -27,21 +81,34 @@ font_paths = [
     '/Library/Fonts/Arial.ttf'
 ]
 
-for font_path in font_paths:
-    try:
-        if os.path.exists(font_path):
-            # Normal font
-            pdfmetrics.registerFont(TTFont('TurkishFont', font_path))
-            # Bold font için aynı fontu kullan (ReportLab otomatik bold yapacak)
-            pdfmetrics.registerFont(TTFont('TurkishFont-Bold', font_path))
-            TURKISH_FONT = 'TurkishFont'
-            print(f"Türkçe font başarıyla yüklendi: {font_path}")
-            break
-    except Exception as e:
-        print(f"Font yükleme hatası {font_path}: {e}")
-        continue
-
-print(f"Kullanılacak font: {TURKISH_FONT}")
+def _reportlab_yukle():
+    global TURKISH_FONT
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    # PDF görünümlerinin kullandığı en ağır modül; ısınmada bu da yüklenmiş olsun
+    importlib.import_module('reportlab.platypus')
+    for font_path in font_paths:
+        try:
+            if os.path.exists(font_path):
+                # Normal font
+                pdfmetrics.registerFont(TTFont('TurkishFont', font_path))
+                # Bold font için aynı fontu kullan (ReportLab otomatik bold yapacak)
+                pdfmetrics.registerFont(TTFont('TurkishFont-Bold', font_path))
+                TURKISH_FONT = 'TurkishFont'
+                print(f"Türkçe font başarıyla yüklendi: {font_path}")
+                break
+        except Exception as e:
+            print(f"Font yükleme hatası {font_path}: {e}")
+            continue
+    print(f"Kullanılacak font: {TURKISH_FONT}")
+    return True
+
+def pdf_hazirla():
+    # PDF görünümleri ReportLab adlarını kendi içlerinde içe aktarmadan önce çağırır
+    gec_yukle('reportlab', _reportlab_yukle)
+
+def charts_modulu():
+    return gec_yukle('matplotlib', lambda: importlib.import_module('charts'))
 
 # Font kullanımı için güvenli fonksiyon
 def get_font_name(is_bold=False):
@@ -52,8 +119,98 @@ def get_font_name(is_bold=False):
 
 app = Flask(__name__)
 
-# Dinamik ders/konu ve haftalık program verileri
-DERSLER = {
+# Sayfa şablonları route'ların içinde yazılı kalır ama render_template_string
+# gibi her istekte yeniden derlenmez: render_page şablonu ilk kullanımda adıyla
+# SAYFA_SABLONLARI'na kaydeder, Jinja derlenmiş şablonu önbellekte tutar.
+# KOC_TEMPLATE_CACHE=<dizin> verilirse derlenmiş kod diske de yazılır; yeni
+# açılan süreçler (serverless soğuk başlangıç) derlemeyi atlar.
+SAYFA_SABLONLARI = {}
+app.jinja_env.loader = ChoiceLoader([DictLoader(SAYFA_SABLONLARI), app.jinja_env.loader])
+if os.environ.get('KOC_TEMPLATE_CACHE'):
+    os.makedirs(os.environ['KOC_TEMPLATE_CACHE'], exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(os.environ['KOC_TEMPLATE_CACHE'])
+
+# Tüm sayfaların ortak iskeleti; sayfalar baslik, head ve body bloklarını doldurur
+SAYFA_SABLONLARI['base.html'] = '''
+<html>
+<head>
+    <title>{% block baslik %}İsmet ÇÜÇEN Eğitim Danışmanlığı{% endblock %}</title>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <link rel="stylesheet" href="{{ asset_url('css/ortak.css') }}">
+    {% block head %}{% endblock %}
+</head>
+<body>
+    {% block body %}{% endblock %}
+</body>
+</html>
+'''
+
+# Stil dosyaları static/ altından içerik özetli adlarla sunulur
+# (css/ortak.css -> /static/css/ortak.<özet>.css). İçerik değişince ad da
+# değiştiğinden tarayıcı dosyayı bir yıl boyunca sormadan önbellekten kullanır.
+_ozetler = {}
+OZETLI_AD = re.compile(r'^(.+)\.([0-9a-f]{10})(\.[A-Za-z0-9]+)$')
+
+def asset_ozeti(ad):
+    ozet = _ozetler.get(ad)
+    if ozet is None:
+        with open(os.path.join(app.static_folder, ad), 'rb') as f:
+            ozet = _ozetler[ad] = hashlib.sha256(f.read()).hexdigest()[:10]
+    return ozet
+
+@app.template_global()
+def asset_url(ad):
+    kok, uzanti = os.path.splitext(ad)
+    return url_for('static', filename=f'{kok}.{asset_ozeti(ad)}{uzanti}')
+
+def static_yanit(ad):
+    # static_sikistir.py'nin ürettiği .br/.gz eşi varsa ve kaynaktan eski
+    # değilse, istemci kabul ediyorsa sıkıştırılmış dosya olduğu gibi gönderilir
+    yol = safe_join(app.static_folder, ad)
+    if yol is None or not os.path.isfile(yol):
+        return app.send_static_file(ad)
+    kaynak_zamani = os.stat(yol).st_mtime
+    esler = {kodlama: yol + uzanti for kodlama, uzanti in STATIC_ESLERI
+             if os.path.isfile(yol + uzanti) and os.stat(yol + uzanti).st_mtime >= kaynak_zamani}
+    kodlama = request.accept_encodings.best_match(list(esler)) if esler else None
+    if kodlama is None:
+        yanit = app.send_static_file(ad)
+    else:
+        yanit = send_file(esler[kodlama], mimetype=mimetypes.guess_type(ad)[0] or 'application/octet-stream',
+                          max_age=app.get_send_file_max_age(ad))
+        yanit.headers['Content-Encoding'] = kodlama
+    if esler:
+        yanit.vary.add('Accept-Encoding')
+    return yanit
+
+def static_dosya(filename):
+    # Flask'ın static görünümünün yerine: özetli adlar gerçek dosyaya çevrilir.
+    # Özet güncel değilse (eski bir sayfadan gelen istek) dosya yine verilir
+    # ama kalıcı önbelleğe alınmaz.
+    eslesme = OZETLI_AD.match(filename)
+    if eslesme:
+        ad = eslesme.group(1) + eslesme.group(3)
+        if os.path.isfile(os.path.join(app.static_folder, ad)):
+            yanit = static_yanit(ad)
+            if eslesme.group(2) == asset_ozeti(ad):
+                yanit.cache_control.no_cache = None
+                yanit.cache_control.public = True
+                yanit.cache_control.max_age = 365 * 24 * 3600
+                yanit.cache_control.immutable = True
+            return yanit
+    return static_yanit(filename)
+
+app.view_functions['static'] = static_dosya
+
+def render_page(ad, kaynak, **context):
+    # ad '.html' ile bitmeli; otomatik kaçışlama uzantıya göre açılır
+    if ad not in SAYFA_SABLONLARI:
+        SAYFA_SABLONLARI[ad] = kaynak
+    return render_template(ad, **context)
+
+# Yeni bir öğrenci için varsayılan dersler/konular
+VARSAYILAN_DERSLER = {
     "Matematik": ["Fonksiyonlar", "Kümeler", "Denklemler"],
     "Türkçe": ["Paragraf", "Dil Bilgisi", "Cümle Anlamı"],
     "Fizik": ["Hareket", "Kuvvet", "Enerji"],
@@ -61,94 +218,489 @@ DERSLER = {
 }
 GUNLER = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
 SAATLER = [f"{h:02d}:00" for h in range(8, 25)]  # 08:00 - 00:00
-# Her hücre için: ders, konu, soru_tipi, soru_adedi, youtube
-weekly_plan_table = {saat: {gun: {} for gun in GUNLER} for saat in SAATLER}
-
-# Üst bilgi (tarih ve öğrenci adı)
-program_info = {"adsoyad": "", "tarih": ""}
 
-# Konu takibi için: ders -> konu -> yayınlar (her yayın: ad, tik)
-konu_takip = {d: {k: [{"ad": "", "tik": False} for _ in range(3)] for k in DERSLER[d]} for d in DERSLER}
+def default_data():
+    # Bir öğrencinin verisi yedi bölümden oluşur
+    dersler = {d: list(konular) for d, konular in VARSAYILAN_DERSLER.items()}
+    return {
+        # Her hücre için: ders, konu, soru_tipi, soru_adedi, youtube, kaynak
+        # (seyrek ızgara; boş hücreler saklanmaz)
+        'weekly_plan_table': PlanGrid.empty(SAATLER, GUNLER),
+        # Geçmiş ve gelecek haftaların planları: ISO hafta ('2026-W42') -> ızgara.
+        # Aktif hafta (program_info['hafta']) weekly_plan_table'dadır, burada değil
+        'plan_haftalari': PlanHistory.empty(SAATLER, GUNLER),
+        # Konu takibi için: ders -> konu -> yayınlar (her yayın: ad, tik)
+        'konu_takip': {d: {k: [{"ad": "", "tik": False} for _ in range(3)] for k in dersler[d]} for d in dersler},
+        # Dinamik ders/konu listesi
+        'DERSLER': dersler,
+        # Üst bilgi (tarih ve öğrenci adı)
+        'program_info': {"adsoyad": "", "tarih": "", "hafta": ""},
+        # Deneme sınavları verisi
+        'deneme_sinavlari': [],
+        # Kaynak yönetimi verisi
+        # Format: {ders: {kaynak_adi: {tur: 'kolay/orta/zor', aciklama: '', link: ''}}}
+        'kaynaklar': {}
+    }
 
-# Deneme sınavları verisi (JSON'da saklanacak)
-deneme_sinavlari = []
+# Kalıcılık modu: 'journal' (varsayılan) her değişikliği data.journal'a tek satır ekler,
+# 'json' her değişiklikte data.json'u baştan yazar (eski davranış),
+# 'sqlite' veriyi koc.db içindeki tablolarda satır satır tutar
+STORAGE_MODE = os.environ.get('KOC_STORAGE', 'journal')
+# Öğrenci kullanıcıları koc.db'deki users tablosundan gelir; 0 numaralı bölüm
+# öğrenci seçilmemişken kullanılan mevcut (data.json) verisidir
+KULLANICI_DB = 'koc.db'
+OGRENCI_VERI_DIZINI = 'veri'
+# Bağlantı havuzu ilk kullanımda açılır (yalnızca sqlite modunda); havuz
+# bağlantıları veritabanını WAL'a geçirir, diğer modlarda koc.db'ye dokunulmaz
+_db_pool = None
+_db_pool_kilidi = threading.Lock()
 
-# Kaynak yönetimi verisi (JSON'da saklanacak)
-# Format: {ders: {kaynak_adi: {tur: 'kolay/orta/zor', aciklama: '', link: ''}}}
-kaynaklar = {}
+def db_pool():
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_kilidi:
+            if _db_pool is None:
+                _db_pool = ConnectionPool(KULLANICI_DB)
+    return _db_pool
 
-def load_data():
-    try:
-        with open('data.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return data
-    except Exception:
-        return {}
-
-def save_data():
-    data = {
-        'weekly_plan_table': weekly_plan_table,
-        'konu_takip': konu_takip,
-        'DERSLER': DERSLER,
-        'program_info': program_info,
-        'deneme_sinavlari': deneme_sinavlari,
-        'kaynaklar': kaynaklar
-    }
-    with open('data.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-# --- Uygulama başlarken verileri yükle ---
-data = load_data()
-if data:
-    weekly_plan_table = data.get('weekly_plan_table', weekly_plan_table)
-    konu_takip = data.get('konu_takip', konu_takip)
-    DERSLER = data.get('DERSLER', DERSLER)
-    program_info = data.get('program_info', program_info)
+def reload_data(hedef, data):
+    # Diskten okunan bölümleri yerleştir. Bölümler içerik kopyalanarak değil
+    # yeniden atanarak değiştirilir; o anda eski anlık görüntüyü okuyan istekler
+    # etkilenmez.
+    if not data:
+        return
     # Eski string formatını yeni dictionary formatına dönüştür
     eski_deneme_sinavlari = data.get('deneme_sinavlari', [])
     if eski_deneme_sinavlari and isinstance(eski_deneme_sinavlari[0], str):
         # Eski string formatı, yeni formatına dönüştür
-        deneme_sinavlari = []
+        data['deneme_sinavlari'] = []
         for i, sinav in enumerate(eski_deneme_sinavlari):
-            deneme_sinavlari.append({
+            data['deneme_sinavlari'].append({
                 'tur': 'TYT',  # Varsayılan değer
                 'ad': sinav,
                 'tarih': datetime.now().strftime('%Y-%m-%d'),
                 'net': 0.0,
                 'puan': 0.0
             })
+    # Plan sözlüğünü seyrek ızgaraya çevir (SQLite ve ikili biçim yalnızca dolu
+    # hücreleri döndürür). Bölüm bölüm yüklemede yalnızca değişen bölümler gelir.
+    if 'weekly_plan_table' in data:
+        data['weekly_plan_table'] = PlanGrid.from_dict(data['weekly_plan_table'], SAATLER, GUNLER)
+    if 'plan_haftalari' in data:
+        data['plan_haftalari'] = PlanHistory.from_dict(data['plan_haftalari'], SAATLER, GUNLER)
+    for bolum, icerik in data.items():
+        if bolum in hedef:
+            hedef[bolum] = icerik
+
+def open_partition(kullanici_id):
+    # Öğrencinin verisini varsayılanların üzerine yükle
+    data = default_data()
+    if STORAGE_MODE == 'sqlite':
+        store = SqliteStore(KULLANICI_DB, kullanici_id=kullanici_id,
+                            import_path='data.json' if kullanici_id == 0 else None, pool=db_pool())
+        yeni = False  # SqliteStore boş kullanıcıyı kendisi yazar
     else:
-        deneme_sinavlari = eski_deneme_sinavlari
-    kaynaklar = data.get('kaynaklar', {})
+        if kullanici_id == 0:
+            path = 'data.json'
+        else:
+            os.makedirs(OGRENCI_VERI_DIZINI, exist_ok=True)
+            path = os.path.join(OGRENCI_VERI_DIZINI, f'ogrenci_{kullanici_id}.json')
+        store = JournalStore(path, journal=(STORAGE_MODE == 'journal'))
+        yeni = not store.exists()
+    store.bind(lambda: data, lambda yuklenen: reload_data(data, yuklenen))
+    store.load()
+    if yeni:
+        # Varsayılanları hemen yaz; günlük hep bilinen bir anlık görüntünün üzerine oynatılsın
+        store.save()
+    return Partition(kullanici_id, data, store)
+
+partitions = PartitionCache(open_partition)
+atexit.register(partitions.flush_all)
+
+# Öğrenci listesi bellekte tutulur. Kullanıcılar uygulama dışında eklenip
+# silindiğinden koc.db ve WAL dosyasının damgasına bakılır; damga değişince
+# liste yeniden okunur ve içerik farklıysa ogrenci_kusagi artar. Sayfa
+# önbelleği anahtarı listenin kendisi yerine bu sayacı kullanır.
+_ogrenci_listesi = ()
+_ogrenci_damgasi = None
+_ogrenci_kilidi = threading.Lock()
+ogrenci_kusagi = 0
+
+def _kullanici_db_damgasi():
+    damga = []
+    for yol in (KULLANICI_DB, KULLANICI_DB + '-wal'):
+        try:
+            st = os.stat(yol)
+            damga.append((st.st_ino, st.st_size, st.st_mtime_ns))
+        except FileNotFoundError:
+            damga.append(None)
+    return tuple(damga)
+
+def _ogrencileri_oku():
+    sorgu = "SELECT id, username FROM users WHERE role = 'student' ORDER BY username"
+    if STORAGE_MODE == 'sqlite':
+        with db_pool().connection() as conn:
+            return tuple(map(tuple, conn.execute(sorgu).fetchall()))
+    if not os.path.exists(KULLANICI_DB):
+        return ()
+    # Diğer modlarda salt okunur tek bağlantı: günlük kipi değişmez, salt okunur
+    # dosya sistemlerinde de çalışır
+    conn = sqlite3.connect(f'file:{KULLANICI_DB}?mode=ro', uri=True)
+    try:
+        return tuple(map(tuple, conn.execute(sorgu).fetchall()))
+    finally:
+        conn.close()
+
+def ogrenci_listesini_tazele():
+    global _ogrenci_listesi, _ogrenci_damgasi, ogrenci_kusagi
+    damga = _kullanici_db_damgasi()
+    if damga == _ogrenci_damgasi:
+        return
+    with _ogrenci_kilidi:
+        if damga != _ogrenci_damgasi:
+            liste = _ogrencileri_oku()
+            if liste != _ogrenci_listesi:
+                _ogrenci_listesi = liste
+                ogrenci_kusagi += 1
+            _ogrenci_damgasi = damga
+
+def ogrenciler():
+    # koc.db'deki öğrenci kullanıcıları: ((id, kullanıcı adı), ...)
+    ogrenci_listesini_tazele()
+    return _ogrenci_listesi
+
+def current_student():
+    # Seçili öğrenci ?ogrenci=<kullanıcı adı> ile değişir ve çerezde saklanır
+    ad = request.args.get('ogrenci', request.cookies.get('ogrenci', ''))
+    if not ad:
+        return 0
+    return next((kid for kid, kullanici in ogrenciler() if kullanici == ad), 0)
+
+def current_partition():
+    if 'partition' not in g:
+        g.partition = partitions.get(current_student())
+    return g.partition
+
+def current_data():
+    # İstek boyunca kullanılan değişmez anlık görüntü; record_change sonrası
+    # yeniden alınır, böylece istek kendi yazdığını görür
+    if 'veri' not in g:
+        g.veri = current_partition().snapshot()
+    return g.veri
+
+def record_change(op, *path, value=None, expected=None):
+    # Değişikliği uygula ve kaydet (günlüğe bir satır, SQLite'ta ilgili satırlar
+    # ya da json modunda tam anlık görüntü). expected verilirse yol bu sürümde
+    # değilse ConflictError fırlatılır ve hiçbir şey yazılmaz.
+    parca = current_partition()
+    parca.record(op, path, value, expected)
+    sayfa_onbellegi_temizle(parca.key, {path[0]})
+    g.pop('veri', None)
+
+def record_changes(changes, expected=()):
+    # Birden çok değişikliği tek kayıtta uygula: ya hepsi ya hiçbiri
+    parca = current_partition()
+    parca.record_many(changes, expected)
+    sayfa_onbellegi_temizle(parca.key, {path[0] for _, path, _ in changes})
+    g.pop('veri', None)
+
+def plan_gorunumu(grid, aktif=True):
+    # Izgaranın görünümü, öğrencinin son görünümünden artımlı üretilir. Aktif
+    # planın görünümü saklanır; başka haftalar yalnızca ondan türetilir.
+    parca = current_partition()
+    onceki = parca.derived.get('plan_gorunumu')
+    gorunum = onceki.updated(grid) if onceki else PlanView.from_grid(grid)
+    if aktif:
+        parca.derived['plan_gorunumu'] = gorunum
+    return gorunum
+
+def wants_json():
+    # JSON gövdeli ya da fetch() ile gelen istekler (Accept: */* veya
+    # application/json) JSON yanıt alır; tarayıcı formları sayfaya döner
+    return (request.is_json or
+            request.accept_mimetypes.best_match(['application/json', 'text/html']) == 'application/json')
+
+def path_version(*path):
+    # Bölümün ya da hücrenin güncel sürümü (formlara 'surum' olarak konur)
+    return current_partition().store.versions.get(path)
+
+def expected_version():
+    # İstemcinin gördüğü sürüm; gönderilmemişse yazım koşulsuzdur
+    surum = request.form.get('surum', '')
+    return int(surum) if surum.isdigit() else None
+
+# Sayfa önbelleği: GET ile açılan sayfaların üretilmiş HTML'i (uç nokta,
+# öğrenci, sorgu argümanları, sayfanın okuduğu bölümlerin sürümleri) anahtarıyla
+# saklanır. Tekrar açılışta şablon çalışmaz; ETag tutuyorsa gövdesiz 304 döner.
+# Bir bölüm değişince yalnızca o bölümü okuyan sayfalar atılır.
+SAYFA_ONBELLEGI_BOYUTU = int(os.environ.get('KOC_PAGE_CACHE', '256'))
+_sayfa_onbellegi = OrderedDict()
+_sayfa_kilidi = threading.Lock()
 
-# --- Her değişiklikte save_data() çağrılacak ---
+def sayfa_onbellegi_temizle(kullanici_id, bolumler=None):
+    # bolumler None ise öğrencinin tüm sayfaları atılır
+    with _sayfa_kilidi:
+        for anahtar, (_, _, okunan) in list(_sayfa_onbellegi.items()):
+            if anahtar[1] == kullanici_id and (bolumler is None or okunan & bolumler):
+                del _sayfa_onbellegi[anahtar]
+
+def sayfa_onbellekli(*bolumler):
+    # Sayfa yalnızca bolumler'i okuyorsa doğru sonuç verir; menüdeki öğrenci
+    # listesinin kuşağı ve bugünün tarihi de anahtara girer
+    okunan = frozenset(bolumler)
+    def sarmala(f):
+        @functools.wraps(f)
+        def sayfa(*args, **kwargs):
+            if request.method != 'GET':
+                return f(*args, **kwargs)
+            parca = current_partition()
+            # Sürümler sayfa üretilmeden önce okunur; arada gelen bir yazım
+            # daha yeni sürümle farklı bir anahtara düşer
+            ogrenci_listesini_tazele()
+            anahtar = (request.endpoint, parca.key, tuple(sorted(request.args.items(multi=True))),
+                       tuple(parca.store.versions.get((b,)) for b in bolumler),
+                       date.today().toordinal(), ogrenci_kusagi)
+            with _sayfa_kilidi:
+                kayit = _sayfa_onbellegi.get(anahtar)
+                if kayit is not None:
+                    _sayfa_onbellegi.move_to_end(anahtar)
+            if kayit is None:
+                sonuc = f(*args, **kwargs)
+                if not isinstance(sonuc, str):
+                    return sonuc
+                govde = sonuc.encode('utf-8')
+                kayit = (hashlib.sha1(govde).hexdigest(), govde, okunan)
+                with _sayfa_kilidi:
+                    _sayfa_onbellegi[anahtar] = kayit
+                    while len(_sayfa_onbellegi) > SAYFA_ONBELLEGI_BOYUTU:
+                        _sayfa_onbellegi.popitem(last=False)
+            yanit = make_response(kayit[1])
+            yanit.set_etag(kayit[0])
+            # Tarayıcı her açılışta ETag ile sorar; sayfa öğrenciye özeldir
+            yanit.cache_control.no_cache = True
+            yanit.cache_control.private = True
+            return yanit.make_conditional(request)
+        return sayfa
+    return sarmala
+
+@app.before_request
+def refresh_data():
+    if request.endpoint == 'static':
+        return
+    # Başka bir worker bu öğrencinin verisini değiştirdiyse bu süreçteki kopyayı
+    # tazele; diskten yeniden okunan veride sürümler baştan kurulur, önbellekteki
+    # sayfalarına güvenilmez
+    parca = current_partition()
+    if parca.store.refresh():
+        sayfa_onbellegi_temizle(parca.key)
+
+@app.errorhandler(ConflictError)
+def version_conflict(e):
+    # Eski sürüm üzerinden yapılan değişiklik: güncel değer ve sürümle 409 dön
+    if wants_json():
+        return jsonify({'hata': 'conflict', 'yol': e.path, 'surum': e.version, 'deger': e.value}), 409
+    return render_page('cakisma.html', '''
+    <html><head><meta charset="UTF-8"><title>Çakışma</title></head>
+    <body style="font-family:sans-serif;max-width:600px;margin:40px auto;">
+        <h3>Bu alan siz düzenlerken başka bir cihazdan değiştirildi.</h3>
+        <p>Değişikliğiniz kaydedilmedi. Güncel hali görmek için sayfayı yenileyin.</p>
+        <a href="{{ geri }}">← Geri dön</a>
+    </body></html>
+    ''', geri=request.referrer or url_for('dashboard')), 409
+
+@app.errorhandler(WriteError)
+def write_failed(e):
+    # KOC_DURABILITY=flush iken yazım diske ulaşmadı: başarılı gibi yönlendirme, 503 dön
+    if wants_json():
+        return jsonify({'hata': 'write_failed', 'mesaj': str(e)}), 503
+    return render_page('yazim_hatasi.html', '''
+    <html><head><meta charset="UTF-8"><title>Kaydedilemedi</title></head>
+    <body style="font-family:sans-serif;max-width:600px;margin:40px auto;">
+        <h3>Değişikliğiniz diske kaydedilemedi.</h3>
+        <p>Lütfen biraz sonra tekrar deneyin.</p>
+        <a href="{{ geri }}">← Geri dön</a>
+    </body></html>
+    ''', geri=request.referrer or url_for('dashboard')), 503
+
+@app.after_request
+def remember_student(response):
+    if 'ogrenci' in request.args:
+        response.set_cookie('ogrenci', request.args['ogrenci'], max_age=365 * 24 * 3600, samesite='Lax')
+    return response
+
+# HTTP sıkıştırma: dinamik yanıtlar istemcinin kabul ettiği en iyi kodlamayla
+# (brotli kuruluysa br, yoksa gzip) sıkıştırılır. Eşikten küçük gövdeler
+# olduğu gibi gider; akış (stream) yanıtları parça parça sıkıştırılır. Dosya
+# yanıtları (send_file, static) dokunulmadan geçer; static dosyaların
+# sıkıştırılmış eşleri derleme sırasında static_sikistir.py ile üretilir.
+SIKISTIRMA_ESIGI = int(os.environ.get('KOC_COMPRESS_MIN', '1024'))
+SIKISTIRILABILIR = ('text/', 'application/json', 'application/javascript', 'application/manifest+json',
+                    'image/svg+xml')
+# ETag'li yanıtların sıkıştırılmış gövdeleri; sayfa önbelleğinden gelen aynı
+# gövde her seferinde yeniden sıkıştırılmaz. Anahtar gövdenin özetidir: ETag
+# yalnızca hangi yanıtların saklanacağını seçer, aynı ETag'i taşıyan farklı
+# gövdeler (ör. farklı ?surum= ile istenen deltalar) birbirine karışmaz.
+_sikistirilmis = OrderedDict()
+_sikistirilmis_kilidi = threading.Lock()
+
+def sikistirici(kodlama):
+    # (ekle, boşalt, bitir): boşalt o ana kadarki veriyi akışa yazdırır
+    if kodlama == 'br':
+        c = brotli.Compressor(quality=5)
+        return c.process, c.flush, c.finish
+    c = zlib.compressobj(6, zlib.DEFLATED, 31)
+    return c.compress, lambda: c.flush(zlib.Z_SYNC_FLUSH), c.flush
+
+def akis_sikistir(parcalar, kodlama):
+    ekle, bosalt, bitir = sikistirici(kodlama)
+    for parca in parcalar:
+        if isinstance(parca, str):
+            parca = parca.encode('utf-8')
+        if parca:
+            yield ekle(parca) + bosalt()
+    yield bitir()
+
+def govde_sikistir(govde, kodlama, sakla):
+    anahtar = (hashlib.sha1(govde).digest(), kodlama) if sakla else None
+    if sakla:
+        with _sikistirilmis_kilidi:
+            sonuc = _sikistirilmis.get(anahtar)
+            if sonuc is not None:
+                _sikistirilmis.move_to_end(anahtar)
+                return sonuc
+    ekle, _, bitir = sikistirici(kodlama)
+    sonuc = ekle(govde) + bitir()
+    if sakla:
+        with _sikistirilmis_kilidi:
+            _sikistirilmis[anahtar] = sonuc
+            while len(_sikistirilmis) > SAYFA_ONBELLEGI_BOYUTU:
+                _sikistirilmis.popitem(last=False)
+    return sonuc
+
+@app.after_request
+def sikistir(yanit):
+    if (request.method == 'HEAD' or yanit.direct_passthrough or
+            'Content-Encoding' in yanit.headers or not (yanit.mimetype or '').startswith(SIKISTIRILABILIR)):
+        return yanit
+    # Vary durumdan önce eklenir: önbellekler 304'ü yeniden doğruladığı 200
+    # ile aynı anahtarda tutar
+    yanit.vary.add('Accept-Encoding')
+    if yanit.status_code != 200:
+        return yanit
+    kodlama = request.accept_encodings.best_match(['br', 'gzip'] if brotli else ['gzip'])
+    if kodlama is None:
+        return yanit
+    if not yanit.is_streamed:
+        govde = yanit.get_data()
+        if len(govde) < SIKISTIRMA_ESIGI:
+            return yanit
+    # Sıkıştırılmış gösterim kendi ETag'ini taşır; istemcinin elindeki
+    # sıkıştırılmış kopya hâlâ geçerliyse gövde hiç sıkıştırılmadan 304 döner
+    etag, zayif = yanit.get_etag()
+    if etag:
+        yanit.set_etag(f'{etag}-{kodlama}', weak=zayif)
+        yanit.make_conditional(request)
+        if yanit.status_code == 304:
+            return yanit
+    yanit.headers['Content-Encoding'] = kodlama
+    if yanit.is_streamed:
+        kapat = getattr(yanit.response, 'close', None)
+        yanit.response = ClosingIterator(akis_sikistir(yanit.response, kodlama), [kapat] if kapat else [])
+        yanit.headers.pop('Content-Length', None)
+    else:
+        yanit.set_data(govde_sikistir(govde, kodlama, bool(etag) and not zayif))
+    return yanit
+
+# --- Her değişiklikte record_change() çağrılacak ---
 
 # Menüde aktif sayfa kontrolü için yardımcı fonksiyon
-def menu_html(active):
+@functools.lru_cache(maxsize=None)
+def menu_dugmeleri(active):
+    # Düğmeler yalnızca aktif sayfaya göre değişir; her sayfa için bir kez üretilir
     return f'''
-    <div class="menu-bar">
         <a href="/" style="text-decoration:none;"><button class="menu-btn {'active' if active=='program' else ''}">📅 Haftalık Ders Programı</button></a>
         <a href="/konu-takip" style="text-decoration:none;"><button class="menu-btn {'active' if active=='konu' else ''}">📚 Konu Takibi</button></a>
         <a href="/deneme-takip" style="text-decoration:none;"><button class="menu-btn {'active' if active=='deneme' else ''}">📊 Deneme Takibi</button></a>
         <a href="/kaynak-yonetimi" style="text-decoration:none;"><button class="menu-btn {'active' if active=='kaynak' else ''}">📖 Kaynak Yönetimi</button></a>
-        <a href="/istatistikler" style="text-decoration:none;"><button class="menu-btn {'active' if active=='istatistikler' else ''}">📈 İstatistikler</button></a>
+        <a href="/istatistikler" style="text-decoration:none;"><button class="menu-btn {'active' if active=='istatistikler' else ''}">📈 İstatistikler</button></a>'''
+
+@functools.lru_cache(maxsize=64)
+def ogrenci_secici(liste, secili):
+    # liste: ((id, kullanıcı adı), ...); öğrenci listesi ya da seçim değişmedikçe aynı HTML
+    secenekler = ''.join(
+        f'<option value="{escape(ad)}" {"selected" if kid == secili else ""}>{escape(ad)}</option>'
+        for kid, ad in liste
+    )
+    return f'''
+        <form method="get" style="display:inline;">
+            <select name="ogrenci" class="menu-btn" onchange="this.form.submit()">
+                <option value="">👤 Öğrenci Seç</option>{secenekler}
+            </select>
+        </form>'''
+
+def menu_html(active):
+    # koc.db'de öğrenci varsa menüye öğrenci seçici eklenir
+    liste = ogrenciler()
+    secici = ogrenci_secici(liste, current_partition().key) if liste else ''
+    return f'''
+    <div class="menu-bar">{menu_dugmeleri(active)}{secici}
     </div>
     '''
 
+def iso_hafta(gun):
+    # Tarihin ISO haftası: '2026-W42' (<input type="week"> ile aynı biçim)
+    yil, hafta, _ = gun.isocalendar()
+    return f"{yil}-W{hafta:02d}"
+
+def hafta_gecerli(hafta):
+    try:
+        datetime.strptime(hafta + '-1', '%G-W%V-%u')
+        return True
+    except ValueError:
+        return False
+
+def hafta_kaydir(hafta, fark):
+    # fark hafta ileri (ya da geri) giden haftanın anahtarı
+    pazartesi = datetime.strptime(hafta + '-1', '%G-W%V-%u').date()
+    return iso_hafta(pazartesi + timedelta(weeks=fark))
+
+def aktif_hafta(data):
+    # weekly_plan_table'ın ait olduğu hafta; hiç hafta değiştirilmediyse
+    # programdaki tarihin haftası, o da yoksa bu hafta
+    info = data['program_info']
+    if hafta_gecerli(info.get('hafta') or ''):
+        return info['hafta']
+    try:
+        return iso_hafta(datetime.strptime(info.get('tarih', ''), '%Y-%m-%d').date())
+    except ValueError:
+        return iso_hafta(date.today())
+
 @app.route('/', methods=['GET', 'POST'])
+@sayfa_onbellekli('weekly_plan_table', 'plan_haftalari', 'program_info', 'DERSLER', 'kaynaklar')
 def dashboard():
-    global program_info
     if request.method == 'POST' and 'adsoyad' in request.form and 'tarih' in request.form:
-        program_info['adsoyad'] = request.form['adsoyad']
-        program_info['tarih'] = request.form['tarih']
-        save_data()
-    return render_template_string('''
-    <html>
-    <head>
-        <title>İsmet ÇÜÇEN Eğitim Danışmanlığı</title>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        
+        record_change('update', 'program_info', value={
+            'adsoyad': request.form['adsoyad'],
+            'tarih': request.form['tarih']
+        }, expected=expected_version())
+    # Sürüm veriden önce okunur; sayfadaki veri en az bu sürüm kadar yenidir
+    plan_surumu = path_version('weekly_plan_table')
+    data = current_data()
+    program_info = data['program_info']
+    # ?hafta=2026-W40 başka bir haftanın planını salt okunur gösterir
+    aktif = aktif_hafta(data)
+    hafta = request.args.get('hafta', aktif)
+    if not hafta_gecerli(hafta):
+        hafta = aktif
+    salt_okunur = hafta != aktif
+    if salt_okunur:
+        plan_table = data['plan_haftalari'].get(hafta) or PlanGrid.empty(SAATLER, GUNLER)
+    else:
+        plan_table = data['weekly_plan_table']
+    return render_page('program.html', '''
+    {% extends 'base.html' %}
+    {% block baslik %}İsmet ÇÜÇEN Eğitim Danışmanlığı{% endblock %}
+    {% block head %}
         <!-- PWA Meta Etiketleri -->
         <meta name="theme-color" content="#764ba2">
         <meta name="apple-mobile-web-app-capable" content="yes">
@@ -170,385 +722,9 @@ def dashboard():
         <link rel="icon" type="image/png" sizes="32x32" href="/static/logo.png">
         <link rel="icon" type="image/png" sizes="16x16" href="/static/logo.png">
         
-        <style>
-            * { margin: 0; padding: 0; box-sizing: border-box; }
-            
-            body { 
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-                color: #333;
-            }
-            
-            .container { 
-                max-width: 1200px; 
-                margin: 20px auto; 
-                background: rgba(255, 255, 255, 0.95);
-                backdrop-filter: blur(10px);
-                border-radius: 20px; 
-                box-shadow: 0 20px 40px rgba(0, 0, 0, 0.1);
-                padding: 30px;
-                border: 1px solid rgba(255, 255, 255, 0.2);
-            }
-            
-            .headerbox { 
-                display: flex; 
-                flex-direction: column; 
-                align-items: center; 
-                margin-bottom: 30px;
-                position: relative;
-            }
-            
-            .logo { 
-                margin-bottom: 15px;
-                position: relative;
-            }
-            
-            .logo img { 
-                width: 140px; 
-                height: auto;
-                filter: drop-shadow(0 4px 8px rgba(0, 0, 0, 0.1));
-                transition: transform 0.3s ease;
-            }
-            
-            .logo img:hover {
-                transform: scale(1.05);
-            }
-            
-            h1 { 
-                color: #2d3748; 
-                text-align: center; 
-                font-size: 2.2em; 
-                margin: 0 0 10px 0; 
-                letter-spacing: 1px;
-                font-weight: 700;
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-            }
-            
-            .info-labels { 
-                text-align: center; 
-                font-size: 1.1em; 
-                color: #4a5568; 
-                margin-bottom: 15px;
-                font-weight: 500;
-            }
-            
-            .info-form { 
-                display: flex; 
-                justify-content: center; 
-                gap: 15px; 
-                margin-bottom: 20px;
-                flex-wrap: wrap;
-            }
-            
-            .info-form input[type="text"], 
-            .info-form input[type="date"] { 
-                padding: 12px 16px; 
-                border-radius: 12px; 
-                border: 2px solid #e2e8f0;
-                font-size: 1em;
-                background: rgba(255, 255, 255, 0.9);
-                transition: all 0.3s ease;
-                min-width: 200px;
-            }
-            
-            .info-form input:focus {
-                outline: none;
-                border-color: #667eea;
-                box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-                transform: translateY(-2px);
-            }
-            
-            .info-form button { 
-                padding: 12px 24px; 
-                border-radius: 12px; 
-                border: none; 
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                color: #fff; 
-                font-size: 1em; 
-                cursor: pointer;
-                font-weight: 600;
-                transition: all 0.3s ease;
-                box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
-            }
-            
-            .info-form button:hover { 
-                transform: translateY(-2px);
-                box-shadow: 0 8px 25px rgba(102, 126, 234, 0.4);
-            }
-            
-            .menu-bar { 
-                display: flex; 
-                justify-content: center; 
-                gap: 20px; 
-                margin: 25px 0 30px 0;
-                flex-wrap: wrap;
-            }
-            
-            .menu-btn { 
-                background: linear-gradient(135deg, #f7fafc, #edf2f7);
-                color: #4a5568; 
-                border: none; 
-                border-radius: 12px; 
-                padding: 12px 24px; 
-                font-size: 1em; 
-                cursor: pointer; 
-                transition: all 0.3s ease;
-                font-weight: 600;
-                box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
-                position: relative;
-                overflow: hidden;
-            }
-            
-            .menu-btn::before {
-                content: '';
-                position: absolute;
-                top: 0;
-                left: -100%;
-                width: 100%;
-                height: 100%;
-                background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.4), transparent);
-                transition: left 0.5s;
-            }
-            
-            .menu-btn:hover::before {
-                left: 100%;
-            }
-            
-            .menu-btn.active, 
-            .menu-btn:hover { 
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                color: #fff;
-                transform: translateY(-2px);
-                box-shadow: 0 8px 25px rgba(102, 126, 234, 0.3);
-            }
-            
-            .download-btn { 
-                background: linear-gradient(135deg, #48bb78, #38a169);
-                color: #fff; 
-                border: none; 
-                border-radius: 12px; 
-                padding: 12px 24px; 
-                font-size: 1em; 
-                cursor: pointer; 
-                margin-bottom: 20px; 
-                float: right;
-                font-weight: 600;
-                transition: all 0.3s ease;
-                box-shadow: 0 4px 15px rgba(72, 187, 120, 0.3);
-            }
-            
-            .download-btn:hover { 
-                transform: translateY(-2px);
-                box-shadow: 0 8px 25px rgba(72, 187, 120, 0.4);
-            }
-            
-            .add-lesson-btn { 
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                color: #fff; 
-                border: none; 
-                border-radius: 12px; 
-                padding: 12px 24px; 
-                font-size: 1em; 
-                cursor: pointer; 
-                margin-bottom: 20px;
-                font-weight: 600;
-                transition: all 0.3s ease;
-                box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
-            }
-            
-            .add-lesson-btn:hover { 
-                transform: translateY(-2px);
-                box-shadow: 0 8px 25px rgba(102, 126, 234, 0.4);
-            }
-            
-            .plan-table { 
-                width: 100%; 
-                border-collapse: separate;
-                border-spacing: 0;
-                margin-bottom: 20px; 
-                font-size: 0.95em;
-                border-radius: 15px;
-                overflow: hidden;
-                box-shadow: 0 10px 30px rgba(0, 0, 0, 0.1);
-            }
-            
-            .plan-table th, 
-            .plan-table td { 
-                border: none;
-                padding: 12px 8px; 
-                text-align: center; 
-                min-width: 100px;
-                position: relative;
-            }
-            
-            .plan-table th { 
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                color: white;
-                font-size: 1em;
-                font-weight: 600;
-                text-transform: uppercase;
-                letter-spacing: 0.5px;
-            }
-            
-            .plan-table td { 
-                background: rgba(255, 255, 255, 0.9);
-                font-size: 0.9em; 
-                vertical-align: middle; 
-                cursor: pointer;
-                transition: all 0.3s ease;
-                border-bottom: 1px solid #f1f5f9;
-            }
-            
-            .plan-table tr:nth-child(even) td {
-                background: rgba(248, 250, 252, 0.9);
-            }
-            
-            .plan-table td:hover { 
-                background: linear-gradient(135deg, #e6fffa, #b2f5ea);
-                transform: scale(1.02);
-                box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
-                z-index: 1;
-            }
-            
-            .yt-label { 
-                color: #e53e3e; 
-                font-size: 0.9em;
-                font-weight: 600;
-            }
-            
-            .edit-form { 
-                display: none; 
-                position: fixed; 
-                top: 50%; 
-                left: 50%; 
-                transform: translate(-50%, -50%); 
-                background: rgba(255, 255, 255, 0.95);
-                backdrop-filter: blur(10px);
-                border-radius: 20px; 
-                box-shadow: 0 20px 40px rgba(0, 0, 0, 0.2);
-                padding: 40px; 
-                z-index: 1000;
-                border: 1px solid rgba(255, 255, 255, 0.2);
-                min-width: 400px;
-            }
-            
-            .edit-form label { 
-                display: block; 
-                margin-bottom: 12px;
-                font-weight: 600;
-                color: #2d3748;
-            }
-            
-            .edit-form select, 
-            .edit-form input { 
-                width: 100%; 
-                padding: 12px; 
-                margin-bottom: 20px;
-                border: 2px solid #e2e8f0;
-                border-radius: 10px;
-                font-size: 1em;
-                transition: all 0.3s ease;
-            }
-            
-            .edit-form select:focus,
-            .edit-form input:focus {
-                outline: none;
-                border-color: #667eea;
-                box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-            }
-            
-            .edit-form button { 
-                margin-right: 15px;
-                padding: 10px 20px;
-                border-radius: 10px;
-                border: none;
-                font-weight: 600;
-                cursor: pointer;
-                transition: all 0.3s ease;
-            }
-            
-            .edit-form button[type="submit"] {
-                background: linear-gradient(135deg, #48bb78, #38a169);
-                color: white;
-            }
-            
-            .edit-form button[type="button"] {
-                background: linear-gradient(135deg, #f56565, #e53e3e);
-                color: white;
-            }
-            
-            .edit-form button:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 4px 15px rgba(0, 0, 0, 0.2);
-            }
-            
-            .overlay { 
-                display: none; 
-                position: fixed; 
-                top: 0; 
-                left: 0; 
-                width: 100vw; 
-                height: 100vh; 
-                background: rgba(0, 0, 0, 0.5);
-                backdrop-filter: blur(5px);
-                z-index: 999; 
-            }
-            
-            .add-lesson-form { 
-                display: none; 
-                position: fixed; 
-                top: 50%; 
-                left: 50%; 
-                transform: translate(-50%, -50%); 
-                background: rgba(255, 255, 255, 0.95);
-                backdrop-filter: blur(10px);
-                border-radius: 20px; 
-                box-shadow: 0 20px 40px rgba(0, 0, 0, 0.2);
-                padding: 40px; 
-                z-index: 1001;
-                border: 1px solid rgba(255, 255, 255, 0.2);
-                min-width: 400px;
-            }
-            
-            .add-lesson-form label { 
-                display: block; 
-                margin-bottom: 12px;
-                font-weight: 600;
-                color: #2d3748;
-            }
-            
-            .add-lesson-form input, 
-            .add-lesson-form textarea { 
-                width: 100%; 
-                padding: 12px; 
-                margin-bottom: 20px;
-                border: 2px solid #e2e8f0;
-                border-radius: 10px;
-                font-size: 1em;
-                transition: all 0.3s ease;
-            }
-            
-            .add-lesson-form input:focus,
-            .add-lesson-form textarea:focus {
-                outline: none;
-                border-color: #667eea;
-                box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-            }
-            
-            @media (max-width: 768px) {
-                .container { margin: 10px; padding: 20px; }
-                .info-form { flex-direction: column; align-items: center; }
-                .menu-bar { flex-direction: column; align-items: center; }
-                .plan-table { font-size: 0.8em; }
-                .plan-table th, .plan-table td { padding: 8px 4px; }
-            }
-        </style>
-    </head>
-    <body>
+        <link rel="stylesheet" href="{{ asset_url('css/program.css') }}">
+    {% endblock %}
+    {% block body %}
         <div class="container">
             <div class="headerbox">
                 <div class="logo">
@@ -564,6 +740,7 @@ def dashboard():
                 <form class="info-form" method="post" action="/">
                     <input type="text" name="adsoyad" placeholder="Öğrenci Ad Soyad" value="{{ program_info['adsoyad'] }}" required>
                     <input type="date" name="tarih" value="{{ program_info['tarih'] }}" required>
+                    <input type="hidden" name="surum" value="{{ bilgi_surumu }}">
                     <button type="submit">Kaydet</button>
                 </form>
             </div>
@@ -572,39 +749,57 @@ def dashboard():
                 <button class="download-btn" type="submit">📄 PDF Olarak İndir</button>
             </form>
             <button class="add-lesson-btn" onclick="openAddLessonForm()">➕ Ders/Konu Ekle</button>
+            <a href="/plan-oner"><button class="add-lesson-btn" type="button">🧠 Plan Öner</button></a>
             <div class="tab">
                 <h2 style="font-size:1.3em; margin: 15px 0 20px 0; color: #2d3748; text-align: center;">Haftalık Ders Programı</h2>
-                <table class="plan-table">
+                <div class="hafta-bar">
+                    <a href="/?hafta={{ onceki_hafta }}">◀</a>
+                    <b>{{ hafta }}</b>{% if salt_okunur %} (salt okunur){% endif %}
+                    <a href="/?hafta={{ sonraki_hafta }}">▶</a>
+                    {% if salt_okunur %}
+                    <form method="post" action="/hafta">
+                        <input type="hidden" name="hafta" value="{{ hafta }}">
+                        <button type="submit">✏️ Bu haftayı düzenle</button>
+                    </form>
+                    <a href="/">Aktif haftaya dön ({{ aktif }})</a>
+                    {% else %}
+                    <form method="post" action="/gecen-haftayi-kopyala"
+                          onsubmit="return confirm('Bu haftanın planı geçen haftanınkiyle değiştirilsin mi?')">
+                        <button type="submit" {% if onceki_hafta not in plan_haftalari %}disabled{% endif %}>📋 Geçen haftayı kopyala</button>
+                    </form>
+                    {% endif %}
+                    <form method="get" action="/">
+                        <input type="week" name="hafta" value="{{ hafta }}">
+                        <button type="submit">Göster</button>
+                    </form>
+                </div>
+                <table class="plan-table" id="planTablosu">
                     <tr>
                         <th>Saat</th>
                         {% for g in gunler %}<th>{{g}}</th>{% endfor %}
                     </tr>
-                    {% for s in saatler %}
+                    {% for s, hucreler in plan_gorunumu.satirlar %}
                     <tr>
                         <td><b>{{s}}</b></td>
-                        {% for g in gunler %}
-                        <td onclick="openEditForm('{{s}}','{{g}}')">
-                            {% set cell = plan_table[s][g] %}
-                            {% if cell.ders %}
-                                <b>{{cell.ders}}</b><br>
-                                <span style="font-size:0.9em;color:#555">{{cell.konu}}</span>
-                                {% if cell.soru_tipi %}<br><span style="font-size:0.9em;color:#667eea">{{cell.soru_tipi}}</span>{% endif %}
-                                {% if cell.soru_adedi %}<br><span style="font-size:0.9em;color:#e53e3e">{{cell.soru_adedi}} soru</span>{% endif %}
-                                {% if cell.youtube %}<br><span class="yt-label">🎬 {{cell.youtube}}</span>{% endif %}
-                                {% if cell.kaynak %}<br><span style="font-size:0.8em;color:#059669;background:#dcfce7;padding:2px 6px;border-radius:6px;">📚 {{cell.kaynak}}</span>{% endif %}
-                            {% else %}-{% endif %}
-                        </td>
+                        {% for g, cell in hucreler %}
+                        {% if salt_okunur %}
+                        <td>
+                        {% else %}
+                        <td data-hour="{{s}}" data-day="{{g}}"{% if cell.dolu %} draggable="true"{% endif %}>
+                        {% endif %}{{ cell.html }}</td>
                         {% endfor %}
                     </tr>
                     {% endfor %}
                 </table>
             </div>
         </div>
+        <button class="toplu-kaydet" id="topluKaydet" onclick="topluKaydet()"></button>
         <div class="overlay" id="overlay" onclick="closeEditForm();closeAddLessonForm();"></div>
         <form class="edit-form" id="editForm" method="post" action="/edit-cell" onsubmit="return submitEditForm()">
             <h3>Ders/Konu ve Soru Ekle</h3>
             <input type="hidden" name="hour" id="form-hour">
             <input type="hidden" name="day" id="form-day">
+            <input type="hidden" name="surum" id="form-surum">
             <label>Ders:
                 <select name="lesson" id="form-lesson" onchange="updateFormTopics()">
                     {% for d in dersler.keys() %}
@@ -651,6 +846,7 @@ def dashboard():
         // Dinamik konu güncelleme (tablo formu için)
         const dersler = {{ dersler|tojson }};
         const kaynaklar = {{ kaynaklar|tojson }};
+        const hucreSurumleri = {{ hucre_surumleri|tojson }};
         function updateFormTopics() {
             var lesson = document.getElementById('form-lesson').value;
             var topicSelect = document.getElementById('form-topic');
@@ -680,6 +876,7 @@ def dashboard():
         function openEditForm(hour, day) {
             document.getElementById('form-hour').value = hour;
             document.getElementById('form-day').value = day;
+            document.getElementById('form-surum').value = hucreSurumleri[hour][day];
             document.getElementById('editForm').style.display = 'block';
             document.getElementById('overlay').style.display = 'block';
         }
@@ -703,6 +900,122 @@ def dashboard():
             closeAddLessonForm();
             return true;
         }
+        // Sürükle-bırak: dolu hücreler boş hücrelere taşınır; taşımalar biriktirilip
+        // tek istekle /edit-cells'e gönderilir. Tıklama ve sürükleme olayları
+        // hücre başına değil, tabloya bağlı tek dinleyici setiyle yakalanır.
+        var bekleyenTasimalar = [];
+        var surukleneHucre = null;
+        function olayHucresi(e) {
+            return e.target.closest ? e.target.closest('td[data-hour]') : null;
+        }
+        function bosHedef(hedef) {
+            return hedef && surukleneHucre && hedef !== surukleneHucre && hedef.getAttribute('draggable') !== 'true';
+        }
+        function hucreSurukle(e) {
+            surukleneHucre = olayHucresi(e);
+            if (surukleneHucre) e.dataTransfer.effectAllowed = 'move';
+        }
+        function hucreUzerinde(e) {
+            var hedef = olayHucresi(e);
+            if (bosHedef(hedef)) {
+                e.preventDefault();
+                hedef.classList.add('drop-hedef');
+            }
+        }
+        function hucreAyrildi(e) {
+            var hedef = olayHucresi(e);
+            if (hedef) hedef.classList.remove('drop-hedef');
+        }
+        function hucreBirak(e) {
+            e.preventDefault();
+            var hedef = olayHucresi(e);
+            if (!hedef) return;
+            hedef.classList.remove('drop-hedef');
+            if (!bosHedef(hedef)) return;
+            var kaynak = surukleneHucre;
+            var h = kaynak.dataset.hour, d = kaynak.dataset.day;
+            var th = hedef.dataset.hour, td = hedef.dataset.day;
+            bekleyenTasimalar.push({op: 'move', hour: h, day: d, to_hour: th, to_day: td,
+                                    surum: hucreSurumleri[h][d], to_surum: hucreSurumleri[th][td]});
+            hedef.innerHTML = kaynak.innerHTML;
+            kaynak.innerHTML = '-';
+            hedef.setAttribute('draggable', 'true');
+            kaynak.removeAttribute('draggable');
+            hedef.classList.add('tasindi');
+            surukleneHucre = null;
+            var buton = document.getElementById('topluKaydet');
+            buton.textContent = '💾 Değişiklikleri kaydet (' + bekleyenTasimalar.length + ')';
+            buton.style.display = 'block';
+        }
+        {% if not salt_okunur %}
+        var planTablosu = document.getElementById('planTablosu');
+        planTablosu.addEventListener('click', function(e) {
+            var td = olayHucresi(e);
+            if (td) openEditForm(td.dataset.hour, td.dataset.day);
+        });
+        planTablosu.addEventListener('dragstart', hucreSurukle);
+        planTablosu.addEventListener('dragover', hucreUzerinde);
+        planTablosu.addEventListener('dragleave', hucreAyrildi);
+        planTablosu.addEventListener('drop', hucreBirak);
+        {% endif %}
+        function topluKaydet() {
+            fetch('/edit-cells', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json', 'Accept': 'application/json'},
+                body: JSON.stringify({edits: bekleyenTasimalar})
+            }).then(function(yanit) {
+                if (yanit.status === 409) {
+                    alert('Bazı hücreler başka bir cihazdan değiştirildi; sayfa yenileniyor.');
+                } else if (!yanit.ok) {
+                    return yanit.json().then(function(j) { alert('Kaydedilemedi: ' + j.hata); });
+                }
+                window.location.reload();
+            });
+        }
+        // Sayfa service worker önbelleğinden gelmiş olabilir; yalnızca gördüğümüz
+        // sürümden sonra değişen hücreler /plan-delta'dan alınıp tabloya işlenir
+        var planSurumu = {{ plan_surumu }};
+        var aktifHafta = {{ aktif|tojson }};
+        function hucreYaz(td, hucre) {
+            td.innerHTML = '';
+            if (!hucre.ders) { td.removeAttribute('draggable'); td.textContent = '-'; return; }
+            td.setAttribute('draggable', 'true');
+            function ekle(etiket, metin, stil, sinif) {
+                var el = document.createElement(etiket);
+                el.textContent = metin;
+                if (stil) el.style.cssText = stil;
+                if (sinif) el.className = sinif;
+                if (td.childNodes.length) td.appendChild(document.createElement('br'));
+                td.appendChild(el);
+            }
+            ekle('b', hucre.ders);
+            ekle('span', hucre.konu || '', '', 'hucre-konu');
+            if (hucre.soru_tipi) ekle('span', hucre.soru_tipi, '', 'hucre-soru-tipi');
+            if (hucre.soru_adedi) ekle('span', hucre.soru_adedi + ' soru', '', 'hucre-soru-adedi');
+            if (hucre.youtube) ekle('span', '🎬 ' + hucre.youtube, '', 'yt-label');
+            if (hucre.kaynak) ekle('span', '📚 ' + hucre.kaynak, '', 'hucre-kaynak');
+        }
+        function planTazele() {
+            if (bekleyenTasimalar.length) return;
+            fetch('/plan-delta?surum=' + planSurumu, {headers: {'Accept': 'application/json'}}).then(function(yanit) {
+                if (yanit.status !== 200) return;
+                return yanit.json().then(function(j) {
+                    if (j.hafta !== aktifHafta) { window.location.reload(); return; }
+                    j.hucreler.forEach(function(h) {
+                        var td = document.querySelector('td[data-hour="' + h[0] + '"][data-day="' + h[1] + '"]');
+                        if (td) hucreYaz(td, h[2]);
+                        if (hucreSurumleri[h[0]]) hucreSurumleri[h[0]][h[1]] = h[3];
+                    });
+                    planSurumu = j.surum;
+                });
+            }).catch(function() {});
+        }
+        {% if not salt_okunur %}
+        planTazele();
+        document.addEventListener('visibilitychange', function() {
+            if (document.visibilityState === 'visible') planTazele();
+        });
+        {% endif %}
         
         // PWA Service Worker Kaydı
         if ('serviceWorker' in navigator) {
@@ -753,18 +1066,252 @@ def dashboard():
             document.body.appendChild(installButton);
         });
         </script>
-    </body>
-    </html>
+    {% endblock %}
     ''',
-    dersler=DERSLER,
+    dersler=data['DERSLER'],
     gunler=GUNLER,
     saatler=SAATLER,
-    plan_table=weekly_plan_table,
+    plan_gorunumu=plan_gorunumu(plan_table, aktif=not salt_okunur),
     program_info=program_info,
-    kaynaklar=kaynaklar,
+    hafta=hafta,
+    aktif=aktif,
+    salt_okunur=salt_okunur,
+    onceki_hafta=hafta_kaydir(hafta, -1),
+    sonraki_hafta=hafta_kaydir(hafta, 1),
+    plan_haftalari=data['plan_haftalari'],
+    kaynaklar=data['kaynaklar'],
+    bilgi_surumu=path_version('program_info'),
+    hucre_surumleri={s: {gun: path_version('weekly_plan_table', s, gun) for gun in GUNLER} for s in SAATLER},
+    plan_surumu=plan_surumu,
     menu_html=menu_html('program')
     )
 
+@app.route('/plan-delta')
+def plan_delta():
+    # Planın ?surum=N'den sonra değişen hücreleri: [saat, gün, hücre, hücre sürümü].
+    # Plan bütünüyle yeniden yazıldıysa (hafta değişimi, geçen haftayı kopyalama)
+    # tüm hücreler 'tam' ile döner. Değişiklik yoksa 304.
+    store = current_partition().store
+    data = current_data()
+    surum = path_version('weekly_plan_table')
+    gorulen = request.args.get('surum', '')
+    gorulen = int(gorulen) if gorulen.isdigit() else -1
+    # Gövde istemcinin gördüğü sürüme de bağlıdır; ETag onu ve haftayı içermezse
+    # farklı ?surum= ile istenen deltalar aynı gösterim sayılır
+    etag = f'plan-{current_partition().key}-{aktif_hafta(data)}-{gorulen}-{surum}'
+    # İstemcinin sürümü bu verinin sürümünden büyükse başka bir kopyayı görmüştür
+    if surum <= gorulen <= store.seq or request.if_none_match.contains(etag):
+        yanit = app.response_class(status=304)
+        yanit.set_etag(etag)
+        return yanit
+    gorunum = plan_gorunumu(data['weekly_plan_table'])
+    yollar = None
+    if 0 <= gorulen <= store.seq:
+        yollar = store.versions.changed_since(['weekly_plan_table'], gorulen)
+    if yollar is None:
+        hucreler = [(s, gun) for s in SAATLER for gun in GUNLER]
+    else:
+        # Satır yazımı ([saat]) satırın tüm günlerini, alan yazımı hücreyi kapsar
+        hucreler = list(dict.fromkeys(
+            (yol[1], gun) for yol in yollar for gun in (GUNLER if len(yol) == 2 else [yol[2]])))
+    yanit = jsonify({
+        'surum': surum,
+        'hafta': aktif_hafta(data),
+        'tam': yollar is None,
+        'hucreler': [[s, gun, gorunum[s, gun].json, path_version('weekly_plan_table', s, gun)]
+                     for s, gun in hucreler if (s, gun) in gorunum],
+    })
+    yanit.set_etag(etag)
+    yanit.headers['Cache-Control'] = 'no-cache'
+    return yanit
+
+@app.route('/hafta', methods=['POST'])
+def hafta_degistir():
+    # Aktif haftayı değiştir: mevcut plan kendi haftasına kaldırılır, istenen
+    # haftanın planı (yoksa boş plan) weekly_plan_table'a gelir. Izgaralar
+    # kopyalanmaz, aynı nesneler yer değiştirir.
+    hedef = request.form.get('hafta', '')
+    if not hafta_gecerli(hedef):
+        return "Geçersiz hafta", 400
+    data = current_data()
+    aktif = aktif_hafta(data)
+    if hedef != aktif:
+        plan = data['weekly_plan_table']
+        gecmis = data['plan_haftalari']
+        record_changes([
+            ('set', ('plan_haftalari', aktif), plan) if next(plan.filled(), None)
+            else ('del', ('plan_haftalari', aktif), None),
+            ('set', ('weekly_plan_table',), gecmis.get(hedef) or PlanGrid.empty(SAATLER, GUNLER)),
+            ('del', ('plan_haftalari', hedef), None),
+            ('update', ('program_info',), {'hafta': hedef}),
+        ])
+    return redirect(url_for('dashboard'))
+
+@app.route('/gecen-haftayi-kopyala', methods=['POST'])
+def gecen_haftayi_kopyala():
+    # Geçen haftanın ızgarası aynen paylaşılır; düzenlenen hücreler yalnızca
+    # bu haftanın kopyasını değiştirir
+    data = current_data()
+    onceki = data['plan_haftalari'].get(hafta_kaydir(aktif_hafta(data), -1))
+    if onceki is not None:
+        record_change('set', 'weekly_plan_table', value=onceki)
+    return redirect(url_for('dashboard'))
+
+# Plan önerisi ayarlarının varsayılanları (saat aralıkları iki uç dahil)
+ONERI_VARSAYILAN = {'hafta_ici_bas': '17:00', 'hafta_ici_bit': '21:00',
+                    'hafta_sonu_bas': '10:00', 'hafta_sonu_bit': '17:00'}
+
+def oneri_ayarlari(form):
+    # Formdan saat aralıkları, "yalnızca boş hücreler" ve ders ağırlıkları
+    ayar = {k: form.get(k) if form.get(k) in SAATLER else v for k, v in ONERI_VARSAYILAN.items()}
+    ayar['sadece_bos'] = form.get('sadece_bos', 'on' if not form else '') == 'on'
+    agirliklar = {}
+    for anahtar, deger in form.items():
+        if anahtar.startswith('agirlik_'):
+            try:
+                agirliklar[anahtar[len('agirlik_'):]] = max(0.0, float(deger))
+            except ValueError:
+                pass
+    ayar['agirliklar'] = agirliklar
+    return ayar
+
+def oneri_isi(data, ayar):
+    # Bir öğrenci için generate_plan argümanları
+    dolu = {(s, g): h.get('ders') for s, g, h in data['weekly_plan_table'].filled()}
+    yuvalar = []
+    for gun in GUNLER:
+        hafta_sonu = gun in ('Cumartesi', 'Pazar')
+        bas = ayar['hafta_sonu_bas' if hafta_sonu else 'hafta_ici_bas']
+        bit = ayar['hafta_sonu_bit' if hafta_sonu else 'hafta_ici_bit']
+        yuvalar += [(saat, gun) for saat in SAATLER
+                    if bas <= saat <= bit and not (ayar['sadece_bos'] and (saat, gun) in dolu)]
+    return dict(saatler=SAATLER, gunler=GUNLER, yuvalar=yuvalar, dolu=dolu,
+                konu_takip=data['konu_takip'], dersler=data['DERSLER'], agirliklar=ayar['agirliklar'])
+
+def oneri_degisiklikleri(is_, oneri, surumler):
+    # Öneriyi hücre değişikliklerine çevir; her hücre önerinin hesaplandığı
+    # sürümde olmalı, arada elle düzenlenen hücrenin üzerine yazılmaz
+    changes = []
+    expected = []
+    for saat, gun in is_['yuvalar']:
+        path = ('weekly_plan_table', saat, gun)
+        if (saat, gun) in oneri:
+            changes.append(('set', path, oneri[(saat, gun)]))
+        elif (saat, gun) in is_['dolu']:
+            changes.append(('del', path, None))
+        else:
+            continue
+        expected.append((path, surumler.get(path)))
+    return changes, expected
+
+@app.route('/plan-oner', methods=['GET', 'POST'])
+def plan_oner():
+    # Konu takibindeki bitmemiş konulardan haftalık plan önerisi: önizle ya da
+    # uygula. Tüm öğrenciler için toplu üretim plan-oner-toplu komutundadır.
+    ayar = oneri_ayarlari(request.form)
+    islem = request.form.get('islem', 'onizle')
+    data = current_data()
+    is_ = oneri_isi(data, ayar)
+    oneri = generate_plan(**is_)
+    changes, expected = oneri_degisiklikleri(is_, oneri, current_partition().store.versions)
+    if islem == 'uygula':
+        record_changes(changes, expected)
+        return redirect(url_for('dashboard'))
+    onizleme = data['weekly_plan_table']
+    for op, path, value in changes:
+        onizleme = onizleme.with_change(op, list(path[1:]), value)
+    return render_page('plan_oner.html', '''
+    {% extends 'base.html' %}
+    {% block baslik %}Plan Önerisi - İsmet ÇÜÇEN Eğitim Danışmanlığı{% endblock %}
+    {% block head %}
+        <link rel="stylesheet" href="{{ asset_url('css/plan_oner.css') }}">
+    {% endblock %}
+    {% block body %}
+        <div class="container">
+            {{ menu_html | safe }}
+            <h2>🧠 Plan Önerisi</h2>
+            <form method="post" action="/plan-oner">
+                <div class="ayarlar">
+                    <fieldset>
+                        <legend>Çalışma saatleri</legend>
+                        {% for etiket, bas, bit in [('Hafta içi', 'hafta_ici_bas', 'hafta_ici_bit'), ('Hafta sonu', 'hafta_sonu_bas', 'hafta_sonu_bit')] %}
+                        <label>{{ etiket }}:
+                            <select name="{{ bas }}">{% for s in saatler %}<option {% if s == ayar[bas] %}selected{% endif %}>{{ s }}</option>{% endfor %}</select>
+                            –
+                            <select name="{{ bit }}">{% for s in saatler %}<option {% if s == ayar[bit] %}selected{% endif %}>{{ s }}</option>{% endfor %}</select>
+                        </label>
+                        {% endfor %}
+                        <label><input type="checkbox" name="sadece_bos" {% if ayar['sadece_bos'] %}checked{% endif %}> Yalnızca boş hücreleri doldur</label>
+                    </fieldset>
+                    <fieldset>
+                        <legend>Ders ağırlıkları</legend>
+                        {% for ders in dersler %}
+                        <label>{{ ders }} <input type="number" name="agirlik_{{ ders }}" min="0" step="0.5" value="{{ ayar['agirliklar'].get(ders, 1) }}"></label>
+                        {% endfor %}
+                    </fieldset>
+                </div>
+                <div class="islemler">
+                    <button type="submit" name="islem" value="onizle">🔍 Önizle</button>
+                    <button type="submit" name="islem" value="uygula">✅ Bu öğrenciye uygula</button>
+                </div>
+            </form>
+            <table class="plan-table">
+                <tr><th>Saat</th>{% for g in gunler %}<th>{{ g }}</th>{% endfor %}</tr>
+                {% for s in saatler %}
+                <tr>
+                    <td><b>{{ s }}</b></td>
+                    {% for g in gunler %}
+                    {% set cell = plan_table[s][g] %}
+                    <td class="{{ 'yeni' if (s, g) in oneri else '' }}">
+                        {% if cell.ders %}<b>{{ cell.ders }}</b><br><span style="color:#555">{{ cell.konu }}</span>
+                        {% if cell.kaynak %}<br><span style="font-size:0.85em;color:#059669">📚 {{ cell.kaynak }}</span>{% endif %}
+                        {% else %}-{% endif %}
+                    </td>
+                    {% endfor %}
+                </tr>
+                {% endfor %}
+            </table>
+        </div>
+    {% endblock %}
+    ''',
+    ayar=ayar,
+    dersler=data['DERSLER'],
+    saatler=SAATLER,
+    gunler=GUNLER,
+    plan_table=onizleme,
+    oneri=oneri,
+    menu_html=menu_html('program')
+    )
+
+@app.cli.command('plan-oner-toplu')
+@click.option('--ayar', multiple=True, metavar='ANAHTAR=DEGER',
+              help="Öneri ayarı, ör. hafta_ici_bas=18:00, sadece_bos=on, agirlik_Matematik=2")
+@click.option('--parti', default=32, show_default=True, help='Aynı anda yüklenen öğrenci sayısı')
+def plan_oner_toplu(ayar, parti):
+    # Öneriyi tüm öğrencilerin planlarına uygula. Web isteği yerine ayrı bir
+    # süreçte çalışır; öğrenciler partiler halinde açılır, yazılır ve bırakılır,
+    # böylece çalışan worker'ların LRU'su ve bellek bütçesi etkilenmez. Diğer
+    # worker'lar değişiklikleri dosya/veritabanı damgasından görür.
+    ayar = oneri_ayarlari(dict(a.split('=', 1) for a in ayar if '=' in a))
+    liste = [kid for kid, _ in ogrenciler()]
+    uygulanan = cakisan = 0
+    with cohort_pool() as havuz:
+        for bas in range(0, len(liste), max(1, parti)):
+            parcalar = [open_partition(kid) for kid in liste[bas:bas + parti]]
+            isler = [oneri_isi(p.snapshot(), ayar) for p in parcalar]
+            for parca, is_, oneri in zip(parcalar, isler, generate_cohort(isler, havuz)):
+                changes, expected = oneri_degisiklikleri(is_, oneri, parca.store.versions)
+                try:
+                    parca.record_many(changes, expected)
+                    uygulanan += 1
+                except ConflictError:
+                    cakisan += 1
+            for parca in parcalar:
+                parca.store.flush()
+    click.echo(f'{uygulanan} öğrencinin planı oluşturuldu.')
+    if cakisan:
+        click.echo(f'{cakisan} öğrencinin planı bu sırada değiştiği için atlandı.')
+
 @app.route('/edit-cell', methods=['POST'])
 def edit_cell():
     hour = request.form['hour']
@@ -775,29 +1322,127 @@ def edit_cell():
     soru_adedi = request.form.get('soru_adedi', '')
     youtube = request.form.get('youtube', '')
     kaynak = request.form.get('kaynak', '')
-    weekly_plan_table[hour][day] = {
+    record_change('set', 'weekly_plan_table', hour, day, value={
         'ders': lesson,
         'konu': topic,
         'soru_tipi': soru_tipi,
         'soru_adedi': soru_adedi,
         'youtube': youtube,
         'kaynak': kaynak
-    }
-    save_data()
+    }, expected=expected_version())
     return redirect(url_for('dashboard'))
 
+# Toplu düzenlemede kabul edilen alanlar (form gönderiminde her alan düzenleme
+# sayısı kadar tekrarlanır)
+TOPLU_ALANLAR = ('op', 'hour', 'day', 'lesson', 'topic', 'soru_tipi', 'soru_adedi', 'youtube', 'kaynak',
+                 'to_hour', 'to_day', 'surum', 'to_surum')
+
+def parse_version(deger):
+    # JSON'da sayı, formda metin gelir; boşsa sürüm kontrolü yapılmaz
+    if deger is None or deger == '':
+        return None
+    if isinstance(deger, int) or (isinstance(deger, str) and deger.isdigit()):
+        return int(deger)
+    raise ValueError(f"Geçersiz sürüm: {deger}")
+
+@app.route('/edit-cells', methods=['POST'])
+def edit_cells():
+    # Toplu hücre düzenleme. Gövde JSON {"edits": [...]} ya da alanları tekrarlanan
+    # bir form olabilir. Her düzenleme:
+    #   {"op": "set", "hour", "day", "lesson", "topic", "soru_tipi", ...}
+    #   {"op": "clear", "hour", "day"}
+    #   {"op": "move", "hour", "day", "to_hour", "to_day"}
+    # surum / to_surum verilirse hücrenin düzenleme öncesi sürümü kontrol edilir.
+    # Düzenlemeler sırayla doğrulanır ve tek kayıtta uygulanır; biri geçersizse ya
+    # da sürümü tutmazsa hiçbiri uygulanmaz.
+    if request.is_json:
+        edits = (request.get_json(silent=True) or {}).get('edits')
+    else:
+        listeler = {alan: request.form.getlist(alan) for alan in TOPLU_ALANLAR}
+        edits = [{alan: listeler[alan][i] for alan in TOPLU_ALANLAR if i < len(listeler[alan])}
+                 for i in range(len(listeler['op']))]
+    if not isinstance(edits, list) or not edits:
+        return jsonify({'hata': 'Düzenleme listesi boş'}), 400
+
+    # Taşımalar önceki düzenlemelerin sonucunu görsün diye bir çalışma kopyası tutulur
+    calisma = {'weekly_plan_table': current_data()['weekly_plan_table']}
+    changes = []
+    expected = {}
+    dokunulan = []
+    for sira, edit in enumerate(edits):
+        try:
+            if not isinstance(edit, dict):
+                raise ValueError('Düzenleme bir nesne olmalı')
+            op = edit.get('op')
+            hucreler = [(edit.get('hour'), edit.get('day'), edit.get('surum'))]
+            if op == 'move':
+                hucreler.append((edit.get('to_hour'), edit.get('to_day'), edit.get('to_surum')))
+            elif op not in ('set', 'clear'):
+                raise ValueError(f"Bilinmeyen işlem: {op}")
+            for hour, day, surum in hucreler:
+                if hour not in SAATLER or day not in GUNLER:
+                    raise ValueError(f"Geçersiz hücre: {hour} {day}")
+                surum = parse_version(surum)
+                if surum is not None:
+                    # Aynı hücre birden çok kez geçerse ilk (düzenleme öncesi) sürümü geçerli
+                    expected.setdefault(('weekly_plan_table', hour, day), surum)
+            hour, day = hucreler[0][0], hucreler[0][1]
+            if op == 'set':
+                alan = lambda ad: str(edit.get(ad) or '')
+                if not alan('lesson').strip():
+                    raise ValueError('Ders boş olamaz')
+                yeni = [('set', ('weekly_plan_table', hour, day), {
+                    'ders': alan('lesson'),
+                    'konu': alan('topic'),
+                    'soru_tipi': alan('soru_tipi'),
+                    'soru_adedi': alan('soru_adedi'),
+                    'youtube': alan('youtube'),
+                    'kaynak': alan('kaynak')
+                })]
+            elif op == 'clear':
+                yeni = [('del', ('weekly_plan_table', hour, day), None)]
+            else:
+                hucre = calisma['weekly_plan_table'][hour][day]
+                if not hucre.get('ders'):
+                    raise ValueError(f"Taşınacak hücre boş: {hour} {day}")
+                to_hour, to_day = hucreler[1][0], hucreler[1][1]
+                yeni = [('set', ('weekly_plan_table', to_hour, to_day), dict(hucre)),
+                        ('del', ('weekly_plan_table', hour, day), None)]
+        except ValueError as e:
+            return jsonify({'hata': str(e), 'sira': sira}), 400
+        for degisiklik in yeni:
+            apply_change(calisma, *degisiklik)
+            changes.append(degisiklik)
+            dokunulan.append(degisiklik[1][1:])
+    record_changes(changes, list(expected.items()))
+    if not wants_json():
+        return redirect(url_for('dashboard'))
+    # Dokunulan hücrelerin yeni sürümleri: istemci sonraki düzenlemede bunları gönderir
+    surumler = {}
+    for hour, day in dokunulan:
+        surumler.setdefault(hour, {})[day] = path_version('weekly_plan_table', hour, day)
+    return jsonify({'ok': True, 'uygulanan': len(changes), 'surum': surumler})
+
 @app.route('/add-lesson', methods=['POST'])
 def add_lesson():
     lesson_name = request.form['lesson_name'].strip()
     topics = [t.strip() for t in request.form['topics'].split('\n') if t.strip()]
     if lesson_name and topics:
-        DERSLER[lesson_name] = topics
-        konu_takip[lesson_name] = {k: [{"ad": "", "tik": False} for _ in range(3)] for k in topics}
-        save_data()
+        record_change('set', 'DERSLER', lesson_name, value=topics)
+        record_change('set', 'konu_takip', lesson_name, value={k: [{"ad": "", "tik": False} for _ in range(3)] for k in topics})
     return redirect(url_for('dashboard'))
 
 @app.route('/download-pdf', methods=['GET'])
 def download_pdf():
+    pdf_hazirla()
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+    data = current_data()
+    program_info = data['program_info']
+    gorunum = plan_gorunumu(data['weekly_plan_table'])
     # PDF oluştur
     pdf_io = BytesIO()
     doc = SimpleDocTemplate(pdf_io, pagesize=A4, leftMargin=20, rightMargin=20, topMargin=30, bottomMargin=30)
@@ -861,24 +1506,8 @@ def download_pdf():
     table_data.append(header_row)
     
     # Veri satırları
-    for saat in SAATLER:
-        row = [saat]
-        for gun in GUNLER:
-            cell = weekly_plan_table[saat][gun]
-            if cell.get('ders'):
-                cell_text = f"{cell['ders']}\n{cell.get('konu', '')}"
-                if cell.get('soru_tipi'):
-                    cell_text += f"\n{cell['soru_tipi']}"
-                if cell.get('soru_adedi'):
-                    cell_text += f"\n{cell['soru_adedi']} soru"
-                if cell.get('youtube'):
-                    cell_text += f"\n🎬 {cell['youtube']}"
-                if cell.get('kaynak'):
-                    cell_text += f"\n📚 {cell['kaynak']}"
-            else:
-                cell_text = "-"
-            row.append(cell_text)
-        table_data.append(row)
+    for saat, hucreler in gorunum.satirlar:
+        table_data.append([saat] + [cell.metin for _, cell in hucreler])
     
     # Tablo oluştur - Sayfa genişliğine uygun sütun genişlikleri
     available_width = A4[0] - 40  # Sayfa genişliği - kenar boşlukları
@@ -912,8 +1541,11 @@ def download_pdf():
     return send_file(pdf_io, mimetype='application/pdf', as_attachment=True, download_name='haftalik_program.pdf')
 
 @app.route('/konu-takip', methods=['GET', 'POST'])
+@sayfa_onbellekli('DERSLER', 'konu_takip')
 def konu_takip_sayfa():
-    global konu_takip, DERSLER
+    data = current_data()
+    DERSLER = data['DERSLER']
+    konu_takip = data['konu_takip']
     secili_ders = request.args.get('ders', list(DERSLER.keys())[0] if DERSLER else '')
     mesaj = ""
     
@@ -921,298 +1553,66 @@ def konu_takip_sayfa():
     if request.method == 'POST' and 'yeni_ders' in request.form:
         yeni_ders = request.form['yeni_ders'].strip()
         if yeni_ders and yeni_ders not in DERSLER:
-            DERSLER[yeni_ders] = []
-            konu_takip[yeni_ders] = {}
+            record_change('set', 'DERSLER', yeni_ders, value=[])
+            record_change('set', 'konu_takip', yeni_ders, value={})
             mesaj = f"'{yeni_ders}' dersi eklendi."
-            save_data()
     
     # Yeni konu ekleme
-    if request.method == 'POST' and 'yeni_konu' in request.form:
-        yeni_konu = request.form['yeni_konu'].strip()
-        ders_for_konu = request.form.get('ders_for_konu', secili_ders)
-        if yeni_konu and ders_for_konu in DERSLER and yeni_konu not in DERSLER[ders_for_konu]:
-            DERSLER[ders_for_konu].append(yeni_konu)
-            konu_takip[ders_for_konu][yeni_konu] = [{"ad": "", "tik": False} for _ in range(3)]
-            mesaj = f"'{yeni_konu}' konusu eklendi."
-            save_data()
-    
-    # Yayın silme
-    if request.method == 'POST' and 'sil_yayin' in request.form:
-        ders = request.form['sil_ders']
-        konu = request.form['sil_konu']
-        yayin_index = int(request.form['sil_index'])
-        if ders in konu_takip and konu in konu_takip[ders]:
-            konu_takip[ders][konu][yayin_index] = {"ad": "", "tik": False}
-            mesaj = "Yayın silindi."
-            save_data()
-    
-    # Konu silme
-    if request.method == 'POST' and 'sil_konu' in request.form:
-        ders = request.form['sil_ders']
-        konu = request.form['sil_konu_adi']
-        if ders in DERSLER and konu in DERSLER[ders]:
-            DERSLER[ders].remove(konu)
-            if ders in konu_takip and konu in konu_takip[ders]:
-                del konu_takip[ders][konu]
-            mesaj = f"'{konu}' konusu silindi."
-            save_data()
-    
-    # Yayın adları ve tikler
-    if request.method == 'POST' and 'ders' in request.form and 'yeni_ders' not in request.form and 'yeni_konu' not in request.form and 'sil_yayin' not in request.form:
-        secili_ders = request.form['ders']
-        for idx, konu in enumerate(DERSLER[secili_ders]):
-            for j in range(3):
-                ad = request.form.get(f"ad_{idx}_{j}", "")
-                tik = request.form.get(f"tik_{idx}_{j}") == "on"
-                konu_takip[secili_ders][konu][j]['ad'] = ad
-                konu_takip[secili_ders][konu][j]['tik'] = tik
-        save_data()
-    return render_template_string('''
-    <html>
-    <head>
-        <title>Konu Takibi - İsmet ÇÜÇEN Eğitim Danışmanlığı</title>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <style>
-            * { margin: 0; padding: 0; box-sizing: border-box; }
-            
-            body { 
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-                color: #333;
-            }
-            
-            .container { 
-                max-width: 1200px; 
-                margin: 20px auto; 
-                background: rgba(255, 255, 255, 0.95);
-                backdrop-filter: blur(10px);
-                border-radius: 20px; 
-                box-shadow: 0 20px 40px rgba(0, 0, 0, 0.1);
-                padding: 30px;
-                border: 1px solid rgba(255, 255, 255, 0.2);
-            }
-            
-            h2 { 
-                text-align: center; 
-                color: #2d3748; 
-                margin-bottom: 25px;
-                font-size: 2em;
-                font-weight: 700;
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-            }
-            
-            .ders-sec { 
-                display: flex; 
-                justify-content: center; 
-                margin-bottom: 25px;
-                align-items: center;
-                gap: 15px;
-            }
-            
-            .ders-sec select { 
-                font-size: 1em; 
-                padding: 12px 20px; 
-                border-radius: 12px; 
-                border: 2px solid #e2e8f0;
-                background: rgba(255, 255, 255, 0.9);
-                transition: all 0.3s ease;
-                min-width: 200px;
-            }
-            
-            .ders-sec select:focus {
-                outline: none;
-                border-color: #667eea;
-                box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-            }
-            
-            .ders-sec label {
-                font-weight: 600;
-                color: #4a5568;
-            }
-            
-            table { 
-                width: 100%; 
-                border-collapse: separate;
-                border-spacing: 0;
-                font-size: 0.95em;
-                border-radius: 15px;
-                overflow: hidden;
-                box-shadow: 0 10px 30px rgba(0, 0, 0, 0.1);
-                margin-bottom: 20px;
-            }
-            
-            th, td { 
-                border: none;
-                padding: 12px 8px; 
-                text-align: center;
-                position: relative;
-            }
-            
-            th { 
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                color: white;
-                font-weight: 600;
-                text-transform: uppercase;
-                letter-spacing: 0.5px;
-            }
-            
-            td { 
-                background: rgba(255, 255, 255, 0.9);
-                border-bottom: 1px solid #f1f5f9;
-            }
-            
-            tr:nth-child(even) td {
-                background: rgba(248, 250, 252, 0.9);
-            }
-            
-            input[type='text'] { 
-                width: 120px; 
-                padding: 8px 12px; 
-                border-radius: 8px; 
-                border: 2px solid #e2e8f0;
-                font-size: 0.9em;
-                transition: all 0.3s ease;
-            }
-            
-            input[type='text']:focus {
-                outline: none;
-                border-color: #667eea;
-                box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-            }
-            
-            input[type='checkbox'] { 
-                width: 20px; 
-                height: 20px;
-                accent-color: #667eea;
-                cursor: pointer;
-            }
-            
-            .save-btn { 
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                color: #fff; 
-                border: none; 
-                border-radius: 12px; 
-                padding: 12px 30px; 
-                font-size: 1em; 
-                cursor: pointer; 
-                margin-top: 20px;
-                font-weight: 600;
-                transition: all 0.3s ease;
-                box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
-            }
-            
-            .save-btn:hover { 
-                transform: translateY(-2px);
-                box-shadow: 0 8px 25px rgba(102, 126, 234, 0.4);
-            }
-            
-            .ekle-btn { 
-                background: linear-gradient(135deg, #48bb78, #38a169);
-                color: #fff; 
-                border: none; 
-                border-radius: 10px; 
-                padding: 8px 20px; 
-                font-size: 0.95em; 
-                cursor: pointer; 
-                margin-left: 10px;
-                font-weight: 600;
-                transition: all 0.3s ease;
-                box-shadow: 0 4px 15px rgba(72, 187, 120, 0.3);
-            }
-            
-            .ekle-btn:hover { 
-                transform: translateY(-2px);
-                box-shadow: 0 8px 25px rgba(72, 187, 120, 0.4);
-            }
-            
-            .sil-btn { 
-                background: linear-gradient(135deg, #f56565, #e53e3e);
-                color: #fff; 
-                border: none; 
-                border-radius: 8px; 
-                padding: 6px 12px; 
-                font-size: 0.85em; 
-                cursor: pointer;
-                font-weight: 600;
-                transition: all 0.3s ease;
-                box-shadow: 0 2px 10px rgba(245, 101, 101, 0.3);
-            }
-            
-            .sil-btn:hover { 
-                transform: translateY(-1px);
-                box-shadow: 0 4px 15px rgba(245, 101, 101, 0.4);
-            }
-            
-            .ekle-form { 
-                display: inline-block; 
-                margin-bottom: 15px;
-                background: rgba(255, 255, 255, 0.8);
-                padding: 15px;
-                border-radius: 12px;
-                box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
-            }
-            
-            .ekle-form input[type="text"] {
-                width: 200px;
-                padding: 10px 15px;
-                border-radius: 10px;
-                border: 2px solid #e2e8f0;
-                font-size: 1em;
-                transition: all 0.3s ease;
-            }
-            
-            .ekle-form input[type="text"]:focus {
-                outline: none;
-                border-color: #667eea;
-                box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-            }
-            
-            .mesaj { 
-                text-align: center; 
-                color: #667eea; 
-                margin-bottom: 15px;
-                padding: 10px;
-                background: rgba(102, 126, 234, 0.1);
-                border-radius: 10px;
-                font-weight: 600;
-            }
-            
-            .back-link {
-                text-align: center;
-                margin-top: 25px;
-            }
-            
-            .back-link a {
-                color: #667eea;
-                text-decoration: none;
-                font-weight: 600;
-                padding: 10px 20px;
-                border-radius: 10px;
-                background: rgba(102, 126, 234, 0.1);
-                transition: all 0.3s ease;
-            }
-            
-            .back-link a:hover {
-                background: rgba(102, 126, 234, 0.2);
-                transform: translateY(-2px);
-            }
-            
-            @media (max-width: 768px) {
-                .container { margin: 10px; padding: 20px; }
-                .ders-sec { flex-direction: column; }
-                .ekle-form { display: block; margin-bottom: 20px; }
-                .ekle-form input[type="text"] { width: 100%; margin-bottom: 10px; }
-                table { font-size: 0.8em; }
-                th, td { padding: 8px 4px; }
-            }
-        </style>
-    </head>
-    <body>
+    if request.method == 'POST' and 'yeni_konu' in request.form:
+        yeni_konu = request.form['yeni_konu'].strip()
+        ders_for_konu = request.form.get('ders_for_konu', secili_ders)
+        if yeni_konu and ders_for_konu in DERSLER and yeni_konu not in DERSLER[ders_for_konu]:
+            record_change('append', 'DERSLER', ders_for_konu, value=yeni_konu)
+            record_change('set', 'konu_takip', ders_for_konu, yeni_konu, value=[{"ad": "", "tik": False} for _ in range(3)])
+            mesaj = f"'{yeni_konu}' konusu eklendi."
+    
+    # Yayın silme
+    if request.method == 'POST' and 'sil_yayin' in request.form:
+        ders = request.form['sil_ders']
+        konu = request.form['sil_konu']
+        yayin_index = int(request.form['sil_index'])
+        if ders in konu_takip and konu in konu_takip[ders]:
+            record_change('set', 'konu_takip', ders, konu, yayin_index, value={"ad": "", "tik": False})
+            mesaj = "Yayın silindi."
+    
+    # Konu silme
+    if request.method == 'POST' and 'sil_konu' in request.form:
+        ders = request.form['sil_ders']
+        konu = request.form['sil_konu_adi']
+        # Konu listede sırasıyla silinir. Sıra, sürümü okunduktan sonra alınan
+        # anlık görüntüde ada göre bulunur; yazım anında liste o sürümde
+        # değilse (arada başka bir silme) ConflictError ile 409 döner.
+        surum = path_version('DERSLER', ders)
+        guncel = current_partition().snapshot()
+        konular = guncel['DERSLER'].get(ders, [])
+        if konu in konular:
+            changes = [('del', ('DERSLER', ders, konular.index(konu)), None)]
+            if konu in guncel['konu_takip'].get(ders, {}):
+                changes.append(('del', ('konu_takip', ders, konu), None))
+            record_changes(changes, [(('DERSLER', ders), surum)])
+            mesaj = f"'{konu}' konusu silindi."
+    
+    # Yayın adları ve tikler
+    if request.method == 'POST' and 'ders' in request.form and 'yeni_ders' not in request.form and 'yeni_konu' not in request.form and 'sil_yayin' not in request.form:
+        secili_ders = request.form['ders']
+        yeni_takip = {}
+        for idx, konu in enumerate(DERSLER[secili_ders]):
+            yeni_takip[konu] = []
+            for j in range(3):
+                ad = request.form.get(f"ad_{idx}_{j}", "")
+                tik = request.form.get(f"tik_{idx}_{j}") == "on"
+                yeni_takip[konu].append({'ad': ad, 'tik': tik})
+        record_change('update', 'konu_takip', secili_ders, value=yeni_takip)
+    data = current_data()
+    DERSLER = data['DERSLER']
+    konu_takip = data['konu_takip']
+    return render_page('konu_takip.html', '''
+    {% extends 'base.html' %}
+    {% block baslik %}Konu Takibi - İsmet ÇÜÇEN Eğitim Danışmanlığı{% endblock %}
+    {% block head %}
+        <link rel="stylesheet" href="{{ asset_url('css/konu_takip.css') }}">
+    {% endblock %}
+    {% block body %}
         <div class="container">
             <h2>📚 Konu Takibi</h2>
             {{ menu_html | safe }}
@@ -1280,21 +1680,126 @@ def konu_takip_sayfa():
                 <a href="/">← Ana Sayfa</a>
             </div>
         </div>
-    </body>
-    </html>
+    {% endblock %}
     ''', dersler=DERSLER, secili_ders=secili_ders, konu_takip=konu_takip, mesaj=mesaj, menu_html=menu_html('konu'))
 
+# Deneme puan grafiği: sayfalar SVG kullanır (svg_charts); matplotlib ile
+# çizilen PNG yalnızca PDF çıktısına girer. Son çizilenler (grafikte görünen
+# alanların özeti, dpi) anahtarıyla bellekte tutulur; aynı veriyle tekrar
+# alınan PDF grafiği yeniden çizmez.
+GRAFIK_DPI = 150
+GRAFIK_ONBELLEGI_BOYUTU = int(os.environ.get('KOC_CHART_CACHE', '64'))
+_grafikler = OrderedDict()
+_grafik_onbellek_kilidi = threading.Lock()
+
+def grafik_ozeti(deneme_sinavlari):
+    # Grafikte yalnızca tür, tarih ve puan görünür; ad ya da net değişince
+    # görüntü aynı kalır
+    ozet = json.dumps([[d['tur'], d['tarih'], d['puan']] for d in deneme_sinavlari], ensure_ascii=False)
+    return hashlib.sha1(ozet.encode('utf-8')).hexdigest()[:16]
+
+def deneme_grafigi(deneme_sinavlari, dpi):
+    # (özet, PNG baytları)
+    ozet = grafik_ozeti(deneme_sinavlari)
+    anahtar = (ozet, dpi)
+    with _grafik_onbellek_kilidi:
+        png = _grafikler.get(anahtar)
+        if png is not None:
+            _grafikler.move_to_end(anahtar)
+            return ozet, png
+    png = charts_modulu().puan_grafigi([d['puan'] for d in deneme_sinavlari],
+                                       [f"{d['tur']}\n{d['tarih']}" for d in deneme_sinavlari], dpi)
+    with _grafik_onbellek_kilidi:
+        _grafikler[anahtar] = png
+        while len(_grafikler) > GRAFIK_ONBELLEGI_BOYUTU:
+            _grafikler.popitem(last=False)
+    return ozet, png
+
+# Puan serisi JSON'u: uzun geçmişler istenen piksel genişliğine LTTB ile
+# indirilir. Seri (tür süzgeciyle) ve hareketli ortalama için önek toplamları
+# veri özeti başına bir kez hazırlanır; her istek yalnızca seçim yapar.
+SERI_PIKSEL_ARALIGI = 2  # nokta başına en az piksel
+SERI_GENISLIK_SINIRI = (50, 4000)
+SERI_PENCERE_SINIRI = 50
+SVG_NOKTA_SINIRI = 200
+TARIH_BICIMI = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_seriler = OrderedDict()
+
+def puan_serisi(deneme_sinavlari, tur=''):
+    # {'sira', 'tarih', 'tur', 'puan', 'toplamlar'}; sira denemenin tüm listedeki yeri
+    anahtar = (grafik_ozeti(deneme_sinavlari), tur)
+    with _grafik_onbellek_kilidi:
+        seri = _seriler.get(anahtar)
+        if seri is not None:
+            _seriler.move_to_end(anahtar)
+            return seri
+    secilen = [(i, d) for i, d in enumerate(deneme_sinavlari) if not tur or d['tur'] == tur]
+    puanlar = [d['puan'] for _, d in secilen]
+    seri = {'sira': [i for i, _ in secilen], 'tarih': [d['tarih'] for _, d in secilen],
+            'tur': [d['tur'] for _, d in secilen], 'puan': puanlar, 'toplamlar': onek_toplamlari(puanlar)}
+    with _grafik_onbellek_kilidi:
+        _seriler[anahtar] = seri
+        while len(_seriler) > GRAFIK_ONBELLEGI_BOYUTU:
+            _seriler.popitem(last=False)
+    return seri
+
+@app.route('/deneme-grafik.json')
+def deneme_grafik_verisi():
+    # ?genislik=<piksel>&bas=<YYYY-AA-GG>&bit=<YYYY-AA-GG>&tur=TYT|AYT&pencere=<n>
+    # Sütun sütun seri: sira, tarih, tur, puan ve son `pencere` denemenin
+    # ortalaması. Ortalama tarih aralığından önceki denemeleri de sayar.
+    genislik = request.args.get('genislik', 600, type=int)
+    genislik = min(max(genislik, SERI_GENISLIK_SINIRI[0]), SERI_GENISLIK_SINIRI[1])
+    pencere = min(max(request.args.get('pencere', 5, type=int), 1), SERI_PENCERE_SINIRI)
+    bas, bit = request.args.get('bas', ''), request.args.get('bit', '')
+    tur = request.args.get('tur', '')
+    if any(t and not TARIH_BICIMI.match(t) for t in (bas, bit)):
+        return jsonify({'hata': 'tarih YYYY-AA-GG biçiminde olmalı'}), 400
+    if tur not in ('', 'TYT', 'AYT'):
+        return jsonify({'hata': 'tur TYT ya da AYT olmalı'}), 400
+    deneme_sinavlari = current_data()['deneme_sinavlari']
+    etag = '{}-{}'.format(grafik_ozeti(deneme_sinavlari),
+                          hashlib.sha1(repr((genislik, pencere, bas, bit, tur)).encode()).hexdigest()[:8])
+    if request.if_none_match.contains(etag):
+        yanit = app.response_class(status=304)
+        yanit.set_etag(etag)
+        return yanit
+    seri = puan_serisi(deneme_sinavlari, tur)
+    aralik = [k for k, t in enumerate(seri['tarih']) if (not bas or t >= bas) and (not bit or t <= bit)]
+    secilen = [aralik[k] for k in lttb(aralik, [seri['puan'][k] for k in aralik],
+                                       max(3, genislik // SERI_PIKSEL_ARALIGI))]
+    yanit = jsonify({
+        'toplam': len(aralik),
+        'pencere': pencere,
+        'sira': [seri['sira'][k] for k in secilen],
+        'tarih': [seri['tarih'][k] for k in secilen],
+        'tur': [seri['tur'][k] for k in secilen],
+        'puan': [seri['puan'][k] for k in secilen],
+        'ortalama': [round(hareketli_ortalama(seri['toplamlar'], k, pencere), 2) for k in secilen],
+    })
+    yanit.set_etag(etag)
+    yanit.cache_control.private = True
+    yanit.cache_control.no_cache = True
+    return yanit
+
 @app.route('/deneme-takip', methods=['GET', 'POST'])
+@sayfa_onbellekli('deneme_sinavlari')
 def deneme_takip_sayfa():
-    global deneme_sinavlari
     mesaj = ""
     
     # Deneme sınavı silme
     if request.method == 'POST' and 'sil_sinav' in request.form:
+        # Sıra, formun listelendiği sürüme aittir; liste o sürümde değilse
+        # ConflictError ile 409 döner. Sürüm gönderilmemişse sıra, sürümü
+        # okunduktan sonra alınan anlık görüntüye göre denetlenir.
         sil_index = int(request.form['sil_index'])
-        if 0 <= sil_index < len(deneme_sinavlari):
-            silinen_sinav = deneme_sinavlari.pop(sil_index)
-            save_data()
+        surum = expected_version()
+        if surum is None:
+            surum = path_version('deneme_sinavlari')
+        guncel = current_partition().snapshot()['deneme_sinavlari']
+        if 0 <= sil_index < len(guncel):
+            silinen_sinav = guncel[sil_index]
+            record_change('pop', 'deneme_sinavlari', value=sil_index, expected=surum)
             mesaj = f"'{silinen_sinav['ad']}' deneme sınavı silindi."
     
     # Deneme sınavı ekleme
@@ -1305,271 +1810,34 @@ def deneme_takip_sayfa():
         net = request.form['net']
         puan = request.form['puan']
         if ad and tarih and net and puan:
-            deneme_sinavlari.append({
+            record_change('append', 'deneme_sinavlari', value={
                 'tur': tur,
                 'ad': ad,
                 'tarih': tarih,
                 'net': float(net),
                 'puan': float(puan)
             })
-            save_data()
             mesaj = f"'{ad}' deneme sınavı eklendi."
+    # Silme formlarındaki sıralar bu sürüme aittir: sürüm listeden önce okunur
+    deneme_surumu = path_version('deneme_sinavlari')
+    deneme_sinavlari = current_partition().snapshot()['deneme_sinavlari']
     
-    # Grafik oluştur
-    grafik_base64 = ""
+    # Grafik sayfanın içinde SVG olarak gelir; PNG yalnızca PDF için çizilir.
+    # Uzun geçmiş şekli korunarak SVG_NOKTA_SINIRI noktaya indirilir.
+    grafik_svg = ''
     if deneme_sinavlari:
-        puanlar = [d['puan'] for d in deneme_sinavlari]
-        tarih_labels = [d['tarih'] for d in deneme_sinavlari]
-        plt.figure(figsize=(8, 4))
-        plt.plot(range(len(puanlar)), puanlar, marker='o', color='#2563eb', linewidth=2, markersize=6)
-        plt.title('Deneme Sınavı Puanları', fontsize=14, fontweight='bold')
-        plt.xlabel('Deneme Sırası', fontsize=12)
-        plt.ylabel('Puan', fontsize=12)
-        plt.grid(True, alpha=0.3)
-        plt.xticks(range(len(tarih_labels)), [f"{d['tur']}\n{d['tarih']}" for d in deneme_sinavlari], rotation=45, ha='right')
-        plt.tight_layout()
-        
-        # Grafiği base64'e çevir
-        buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-        buf.seek(0)
-        grafik_base64 = base64.b64encode(buf.read()).decode('utf-8')
-        plt.close()
+        seri = puan_serisi(deneme_sinavlari)
+        secilen = lttb(seri['sira'], seri['puan'], SVG_NOKTA_SINIRI)
+        grafik_svg = puan_svg([seri['puan'][k] for k in secilen],
+                              [f"{seri['tur'][k]}\n{seri['tarih'][k]}" for k in secilen])
     
-    return render_template_string('''
-    <html>
-    <head>
-        <title>Deneme Takibi - İsmet ÇÜÇEN Eğitim Danışmanlığı</title>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <style>
-            * { margin: 0; padding: 0; box-sizing: border-box; }
-            
-            body { 
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-                color: #333;
-            }
-            
-            .container { 
-                max-width: 1200px; 
-                margin: 20px auto; 
-                background: rgba(255, 255, 255, 0.95);
-                backdrop-filter: blur(10px);
-                border-radius: 20px; 
-                box-shadow: 0 20px 40px rgba(0, 0, 0, 0.1);
-                padding: 30px;
-                border: 1px solid rgba(255, 255, 255, 0.2);
-            }
-            
-            h2 { 
-                text-align: center; 
-                color: #2d3748; 
-                margin-bottom: 25px;
-                font-size: 2em;
-                font-weight: 700;
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-            }
-            
-            .sinav-form { 
-                background: rgba(255, 255, 255, 0.8);
-                padding: 25px;
-                border-radius: 15px;
-                margin-bottom: 25px;
-                box-shadow: 0 8px 25px rgba(0, 0, 0, 0.1);
-            }
-            
-            .form-row {
-                display: flex;
-                gap: 15px;
-                margin-bottom: 15px;
-                flex-wrap: wrap;
-                align-items: center;
-            }
-            
-            .form-group {
-                flex: 1;
-                min-width: 150px;
-            }
-            
-            .form-group label {
-                display: block;
-                margin-bottom: 8px;
-                font-weight: 600;
-                color: #4a5568;
-            }
-            
-            .form-group input, .form-group select {
-                width: 100%;
-                padding: 12px 15px;
-                border-radius: 10px;
-                border: 2px solid #e2e8f0;
-                font-size: 1em;
-                background: rgba(255, 255, 255, 0.9);
-                transition: all 0.3s ease;
-            }
-            
-            .form-group input:focus, .form-group select:focus {
-                outline: none;
-                border-color: #667eea;
-                box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-                transform: translateY(-2px);
-            }
-            
-            .ekle-btn { 
-                background: linear-gradient(135deg, #48bb78, #38a169);
-                color: #fff; 
-                border: none; 
-                border-radius: 12px; 
-                padding: 12px 30px; 
-                font-size: 1em; 
-                cursor: pointer;
-                font-weight: 600;
-                transition: all 0.3s ease;
-                box-shadow: 0 4px 15px rgba(72, 187, 120, 0.3);
-                margin-top: 10px;
-            }
-            
-            .ekle-btn:hover { 
-                transform: translateY(-2px);
-                box-shadow: 0 8px 25px rgba(72, 187, 120, 0.4);
-            }
-            
-            table { 
-                width: 100%; 
-                border-collapse: separate;
-                border-spacing: 0;
-                font-size: 0.95em;
-                border-radius: 15px;
-                overflow: hidden;
-                box-shadow: 0 10px 30px rgba(0, 0, 0, 0.1);
-                margin-bottom: 25px;
-            }
-            
-            th, td { 
-                border: none;
-                padding: 12px 8px; 
-                text-align: center;
-                position: relative;
-            }
-            
-            th { 
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                color: white;
-                font-weight: 600;
-                text-transform: uppercase;
-                letter-spacing: 0.5px;
-            }
-            
-            td { 
-                background: rgba(255, 255, 255, 0.9);
-                border-bottom: 1px solid #f1f5f9;
-            }
-            
-            tr:nth-child(even) td {
-                background: rgba(248, 250, 252, 0.9);
-            }
-            
-            .sil-btn { 
-                background: linear-gradient(135deg, #f56565, #e53e3e);
-                color: #fff; 
-                border: none; 
-                border-radius: 8px; 
-                padding: 8px 15px; 
-                font-size: 0.9em; 
-                cursor: pointer;
-                font-weight: 600;
-                transition: all 0.3s ease;
-                box-shadow: 0 2px 10px rgba(245, 101, 101, 0.3);
-            }
-            
-            .sil-btn:hover { 
-                transform: translateY(-1px);
-                box-shadow: 0 4px 15px rgba(245, 101, 101, 0.4);
-            }
-            
-            .mesaj { 
-                text-align: center; 
-                color: #667eea; 
-                margin-bottom: 20px;
-                padding: 15px;
-                background: rgba(102, 126, 234, 0.1);
-                border-radius: 12px;
-                font-weight: 600;
-            }
-            
-            .grafik-container {
-                background: rgba(255, 255, 255, 0.8);
-                padding: 25px;
-                border-radius: 15px;
-                margin-top: 25px;
-                box-shadow: 0 8px 25px rgba(0, 0, 0, 0.1);
-                text-align: center;
-            }
-            
-            .grafik-container img {
-                max-width: 100%;
-                height: auto;
-                border-radius: 10px;
-                box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
-            }
-            
-            .back-link {
-                text-align: center;
-                margin-top: 25px;
-            }
-            
-            .back-link a {
-                color: #667eea;
-                text-decoration: none;
-                font-weight: 600;
-                padding: 12px 25px;
-                border-radius: 12px;
-                background: rgba(102, 126, 234, 0.1);
-                transition: all 0.3s ease;
-                display: inline-block;
-            }
-            
-            .back-link a:hover {
-                background: rgba(102, 126, 234, 0.2);
-                transform: translateY(-2px);
-            }
-            
-            .pdf-btn {
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                color: #fff;
-                border: none;
-                border-radius: 12px;
-                padding: 12px 25px;
-                font-size: 1em;
-                cursor: pointer;
-                font-weight: 600;
-                transition: all 0.3s ease;
-                box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
-                text-decoration: none;
-                display: inline-block;
-                margin-top: 15px;
-            }
-            
-            .pdf-btn:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 8px 25px rgba(102, 126, 234, 0.4);
-            }
-            
-            @media (max-width: 768px) {
-                .container { margin: 10px; padding: 20px; }
-                .form-row { flex-direction: column; }
-                .form-group { min-width: auto; }
-                table { font-size: 0.8em; }
-                th, td { padding: 8px 4px; }
-            }
-        </style>
-    </head>
-    <body>
+    return render_page('deneme_takip.html', '''
+    {% extends 'base.html' %}
+    {% block baslik %}Deneme Takibi - İsmet ÇÜÇEN Eğitim Danışmanlığı{% endblock %}
+    {% block head %}
+        <link rel="stylesheet" href="{{ asset_url('css/deneme_takip.css') }}">
+    {% endblock %}
+    {% block body %}
         <div class="container">
             <h2>📊 Deneme Takibi</h2>
             {{ menu_html | safe }}
@@ -1630,6 +1898,7 @@ def deneme_takip_sayfa():
                         <form method="post" action="/deneme-takip" style="display:inline;">
                             <input type="hidden" name="sil_sinav" value="1">
                             <input type="hidden" name="sil_index" value="{{loop.index0}}">
+                            <input type="hidden" name="surum" value="{{ deneme_surumu }}">
                             <button class="sil-btn" type="submit" onclick="return confirm('Bu deneme sınavını silmek istediğinizden emin misiniz?')">🗑️</button>
                         </form>
                     </td>
@@ -1637,10 +1906,10 @@ def deneme_takip_sayfa():
                 {% endfor %}
             </table>
             
-            {% if grafik_base64 %}
+            {% if grafik_svg %}
             <div class="grafik-container">
                 <h3 style="margin-bottom: 20px; color: #2d3748;">📈 Deneme Sınavı Grafiği</h3>
-                <img src="data:image/png;base64,{{grafik_base64}}" alt="Deneme Sınavı Grafiği">
+                {{ grafik_svg }}
             </div>
             {% endif %}
             
@@ -1658,12 +1927,18 @@ def deneme_takip_sayfa():
                 <a href="/">← Ana Sayfa</a>
             </div>
         </div>
-    </body>
-    </html>
-    ''', deneme_sinavlari=deneme_sinavlari, grafik_base64=grafik_base64, mesaj=mesaj, menu_html=menu_html('deneme'))
+    {% endblock %}
+    ''', deneme_sinavlari=deneme_sinavlari, grafik_svg=grafik_svg, mesaj=mesaj,
+       deneme_surumu=deneme_surumu, menu_html=menu_html('deneme'))
 
 @app.route('/istatistikler')
+@sayfa_onbellekli('DERSLER', 'deneme_sinavlari', 'konu_takip', 'weekly_plan_table')
 def istatistikler_sayfa():
+    data = current_data()
+    DERSLER = data['DERSLER']
+    konu_takip = data['konu_takip']
+    deneme_sinavlari = data['deneme_sinavlari']
+    weekly_plan_table = data['weekly_plan_table']
     # İstatistikleri hesapla
     stats = {}
     
@@ -1686,8 +1961,20 @@ def istatistikler_sayfa():
     stats['toplam_yayinlar'] = toplam_yayinlar
     stats['tamamlanma_orani'] = round((tamamlanan_yayinlar / toplam_yayinlar * 100) if toplam_yayinlar > 0 else 0, 1)
     
+    # Ders bazında tamamlanan / toplam yayın (adı yazılmış yayınlar)
+    ilerleme = []
+    for ders in DERSLER:
+        yayinlar = [y for konu in konu_takip.get(ders, {}).values() for y in konu if y['ad']]
+        if yayinlar:
+            ilerleme.append((ders, sum(1 for y in yayinlar if y['tik']), len(yayinlar)))
+    ilerleme_grafigi = ilerleme_svg(ilerleme) if ilerleme else ''
+    
     # Deneme sınavı istatistikleri
     stats['toplam_deneme'] = len(deneme_sinavlari)
+    # Yeni öğrencinin henüz denemesi yok; sayfa puan kutularını 0 ile gizler
+    stats['ortalama_puan'] = 0
+    stats['en_yuksek_puan'] = 0
+    dagilim_grafigi = ''
     if deneme_sinavlari:
         puanlar = [d['puan'] for d in deneme_sinavlari]
         stats['ortalama_puan'] = round(sum(puanlar) / len(puanlar), 1)
@@ -1699,6 +1986,7 @@ def istatistikler_sayfa():
         ayt_sayisi = len([d for d in deneme_sinavlari if d['tur'] == 'AYT'])
         stats['tyt_sayisi'] = tyt_sayisi
         stats['ayt_sayisi'] = ayt_sayisi
+        dagilim_grafigi = dagilim_svg({'TYT': tyt_sayisi, 'AYT': ayt_sayisi})
     
     # Haftalık program istatistikleri
     dolu_hucreler = 0
@@ -1712,202 +2000,13 @@ def istatistikler_sayfa():
     stats['toplam_hucreler'] = toplam_hucreler
     stats['doluluk_orani'] = round((dolu_hucreler / toplam_hucreler * 100), 1)
     
-    return render_template_string('''
-    <html>
-    <head>
-        <title>İstatistikler - İsmet ÇÜÇEN Eğitim Danışmanlığı</title>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <style>
-            * { margin: 0; padding: 0; box-sizing: border-box; }
-            
-            body { 
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-                color: #333;
-            }
-            
-            .container { 
-                max-width: 1200px; 
-                margin: 20px auto; 
-                background: rgba(255, 255, 255, 0.95);
-                backdrop-filter: blur(10px);
-                border-radius: 20px; 
-                box-shadow: 0 20px 40px rgba(0, 0, 0, 0.1);
-                padding: 30px;
-                border: 1px solid rgba(255, 255, 255, 0.2);
-            }
-            
-            h2 { 
-                text-align: center; 
-                color: #2d3748; 
-                margin-bottom: 25px;
-                font-size: 2em;
-                font-weight: 700;
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-            }
-            
-            .stats-grid {
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-                gap: 25px;
-                margin-bottom: 30px;
-            }
-            
-            .stat-card {
-                background: rgba(255, 255, 255, 0.8);
-                padding: 25px;
-                border-radius: 15px;
-                box-shadow: 0 8px 25px rgba(0, 0, 0, 0.1);
-                text-align: center;
-                transition: all 0.3s ease;
-            }
-            
-            .stat-card:hover {
-                transform: translateY(-5px);
-                box-shadow: 0 15px 35px rgba(0, 0, 0, 0.15);
-            }
-            
-            .stat-card h3 {
-                color: #2d3748;
-                margin-bottom: 15px;
-                font-size: 1.3em;
-                font-weight: 600;
-            }
-            
-            .stat-value {
-                font-size: 2.5em;
-                font-weight: 700;
-                margin-bottom: 10px;
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-            }
-            
-            .stat-label {
-                color: #718096;
-                font-size: 1em;
-                font-weight: 500;
-            }
-            
-            .progress-container {
-                background: rgba(255, 255, 255, 0.8);
-                padding: 25px;
-                border-radius: 15px;
-                margin-bottom: 25px;
-                box-shadow: 0 8px 25px rgba(0, 0, 0, 0.1);
-            }
-            
-            .progress-item {
-                margin-bottom: 20px;
-                padding: 15px;
-                background: rgba(255, 255, 255, 0.9);
-                border-radius: 10px;
-                border-left: 4px solid #667eea;
-            }
-            
-            .progress-header {
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                margin-bottom: 10px;
-            }
-            
-            .progress-title {
-                font-weight: 600;
-                color: #2d3748;
-                font-size: 1.1em;
-            }
-            
-            .progress-percentage {
-                font-weight: 700;
-                color: #667eea;
-                font-size: 1.2em;
-            }
-            
-            .progress-bar {
-                width: 100%;
-                height: 12px;
-                background: #e2e8f0;
-                border-radius: 6px;
-                overflow: hidden;
-            }
-            
-            .progress-fill {
-                height: 100%;
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                border-radius: 6px;
-                transition: width 0.8s ease;
-            }
-            
-            .pdf-btn {
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                color: #fff;
-                border: none;
-                border-radius: 12px;
-                padding: 15px 30px;
-                font-size: 1.1em;
-                cursor: pointer;
-                font-weight: 600;
-                transition: all 0.3s ease;
-                box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
-                text-decoration: none;
-                display: inline-block;
-                margin: 20px 0;
-            }
-            
-            .pdf-btn:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 8px 25px rgba(102, 126, 234, 0.4);
-            }
-            
-            .back-link {
-                text-align: center;
-                margin-top: 25px;
-            }
-            
-            .back-link a {
-                color: #667eea;
-                text-decoration: none;
-                font-weight: 600;
-                padding: 12px 25px;
-                border-radius: 12px;
-                background: rgba(102, 126, 234, 0.1);
-                transition: all 0.3s ease;
-                display: inline-block;
-            }
-            
-            .back-link a:hover {
-                background: rgba(102, 126, 234, 0.2);
-                transform: translateY(-2px);
-            }
-            
-            .empty-state {
-                text-align: center;
-                padding: 60px 20px;
-                color: #718096;
-            }
-            
-            .empty-state h3 {
-                margin-bottom: 15px;
-                font-size: 1.5em;
-                color: #4a5568;
-            }
-            
-            @media (max-width: 768px) {
-                .container { margin: 10px; padding: 20px; }
-                .stats-grid { grid-template-columns: 1fr; }
-                .stat-card { padding: 20px; }
-                .progress-container { padding: 20px; }
-            }
-        </style>
-    </head>
-    <body>
+    return render_page('istatistikler.html', '''
+    {% extends 'base.html' %}
+    {% block baslik %}İstatistikler - İsmet ÇÜÇEN Eğitim Danışmanlığı{% endblock %}
+    {% block head %}
+        <link rel="stylesheet" href="{{ asset_url('css/istatistikler.css') }}">
+    {% endblock %}
+    {% block body %}
         <div class="container">
             <h2>📈 İstatistikler</h2>
             {{ menu_html | safe }}
@@ -1955,25 +2054,19 @@ def istatistikler_sayfa():
                 {% endif %}
             </div>
             
-            {% if ders_istatistikleri %}
+            {% if ilerleme_grafigi %}
             <div class="progress-container">
                 <h3 style="margin-bottom: 20px; color: #2d3748; text-align: center;">📊 Ders Bazında İlerleme</h3>
-                {% for ders, istatistik in ders_istatistikleri.items() %}
-                <div class="progress-item">
-                    <div class="progress-header">
-                        <span class="progress-title">{{ders}}</span>
-                        <span class="progress-percentage">%{{istatistik.yuzde}}</span>
-                    </div>
-                    <div class="progress-bar">
-                        <div class="progress-fill" style="width: {{istatistik.yuzde}}%"></div>
-                    </div>
-                    <div style="margin-top: 8px; font-size: 0.9em; color: #718096;">
-                        {{istatistik.tamamlanan}} / {{istatistik.toplam}} konu tamamlandı
-                </div>
-                </div>
-                {% endfor %}
-                </div>
-                {% endif %}
+                {{ ilerleme_grafigi }}
+            </div>
+            {% endif %}
+            
+            {% if dagilim_grafigi %}
+            <div class="progress-container">
+                <h3 style="margin-bottom: 20px; color: #2d3748; text-align: center;">📝 TYT / AYT Dağılımı</h3>
+                {{ dagilim_grafigi }}
+            </div>
+            {% endif %}
             
             <div style="text-align: center;">
                 <a href="/istatistikler-pdf" class="pdf-btn">📄 PDF İndir</a>
@@ -1990,14 +2083,25 @@ def istatistikler_sayfa():
                 <a href="/">← Ana Sayfa</a>
             </div>
         </div>
-    </body>
-    </html>
+    {% endblock %}
     ''', toplam_konu=stats['toplam_konu'], tamamlanan_konu=stats['tamamlanan_yayinlar'], tamamlanma_orani=stats['tamamlanma_orani'], 
          toplam_deneme=stats['toplam_deneme'], ortalama_puan=stats['ortalama_puan'], en_yuksek_puan=stats['en_yuksek_puan'], 
-         ders_istatistikleri=stats, menu_html=menu_html('istatistikler'))
+         ilerleme_grafigi=ilerleme_grafigi, dagilim_grafigi=dagilim_grafigi, menu_html=menu_html('istatistikler'))
 
 @app.route('/istatistikler-pdf')
 def istatistikler_pdf():
+    pdf_hazirla()
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+    data = current_data()
+    DERSLER = data['DERSLER']
+    konu_takip = data['konu_takip']
+    deneme_sinavlari = data['deneme_sinavlari']
+    weekly_plan_table = data['weekly_plan_table']
+    program_info = data['program_info']
     # İstatistikleri hesapla
     stats = {}
     
@@ -2214,6 +2318,15 @@ def istatistikler_pdf():
 
 @app.route('/deneme-pdf')
 def deneme_pdf():
+    pdf_hazirla()
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+    data = current_data()
+    deneme_sinavlari = data['deneme_sinavlari']
+    program_info = data['program_info']
     # PDF oluştur
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=30, rightMargin=30, topMargin=30, bottomMargin=30)
@@ -2337,28 +2450,11 @@ def deneme_pdf():
         elements.append(Spacer(1, 15))
         elements.append(Paragraph("Puan Grafiği", heading_style))
         
-        # Grafik oluştur
-        puanlar = [d['puan'] for d in deneme_sinavlari]
-        plt.figure(figsize=(8, 4))
-        plt.plot(range(len(puanlar)), puanlar, marker='o', color='#2563eb', linewidth=2, markersize=6)
-        plt.title('Deneme Sınavı Puanları', fontsize=14, fontweight='bold')
-        plt.xlabel('Deneme Sırası', fontsize=12)
-        plt.ylabel('Puan', fontsize=12)
-        plt.grid(True, alpha=0.3)
-        plt.xticks(range(len(puanlar)), [f"{d['tur']}\n{d['tarih']}" for d in deneme_sinavlari], rotation=45, ha='right')
-        plt.tight_layout()
-        
-        # Grafiği PDF'e ekle
-        buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        
-        # ReportLab ile grafik ekle
-        img = Image(buf)
+        _, png = deneme_grafigi(deneme_sinavlari, GRAFIK_DPI)
+        img = Image(BytesIO(png))
         img.drawHeight = 180
         img.drawWidth = 360
         elements.append(img)
-        plt.close()
     
     # PDF'i oluştur
     doc.build(elements)
@@ -2379,8 +2475,11 @@ def deneme_pdf():
     )
 
 @app.route('/kaynak-yonetimi', methods=['GET', 'POST'])
+@sayfa_onbellekli('DERSLER', 'kaynaklar')
 def kaynak_yonetimi_sayfa():
-    global kaynaklar
+    data = current_data()
+    DERSLER = data['DERSLER']
+    kaynaklar = data['kaynaklar']
     secili_ders = request.args.get('ders', list(DERSLER.keys())[0] if DERSLER else '')
     mesaj = ""
     
@@ -2393,14 +2492,11 @@ def kaynak_yonetimi_sayfa():
         link = request.form['link'].strip()
         
         if kaynak_adi and ders:
-            if ders not in kaynaklar:
-                kaynaklar[ders] = {}
-            kaynaklar[ders][kaynak_adi] = {
+            record_change('set', 'kaynaklar', ders, kaynak_adi, value={
                 'tur': tur,
                 'aciklama': aciklama,
                 'link': link
-            }
-            save_data()
+            })
             mesaj = f"'{kaynak_adi}' kaynağı eklendi."
     
     # Kaynak silme
@@ -2408,285 +2504,17 @@ def kaynak_yonetimi_sayfa():
         ders = request.form['sil_ders']
         kaynak_adi = request.form['sil_kaynak_adi']
         if ders in kaynaklar and kaynak_adi in kaynaklar[ders]:
-            del kaynaklar[ders][kaynak_adi]
-            save_data()
+            record_change('del', 'kaynaklar', ders, kaynak_adi)
             mesaj = f"'{kaynak_adi}' kaynağı silindi."
+    kaynaklar = current_data()['kaynaklar']
     
-    return render_template_string('''
-    <html>
-    <head>
-        <title>Kaynak Yönetimi - İsmet ÇÜÇEN Eğitim Danışmanlığı</title>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <style>
-            * { margin: 0; padding: 0; box-sizing: border-box; }
-            
-            body { 
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-                color: #333;
-            }
-            
-            .container { 
-                max-width: 1200px; 
-                margin: 20px auto; 
-                background: rgba(255, 255, 255, 0.95);
-                backdrop-filter: blur(10px);
-                border-radius: 20px; 
-                box-shadow: 0 20px 40px rgba(0, 0, 0, 0.1);
-                padding: 30px;
-                border: 1px solid rgba(255, 255, 255, 0.2);
-            }
-            
-            h2 { 
-                text-align: center; 
-                color: #2d3748; 
-                margin-bottom: 25px;
-                font-size: 2em;
-                font-weight: 700;
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-            }
-            
-            .kaynak-form { 
-                background: rgba(255, 255, 255, 0.8);
-                padding: 25px;
-                border-radius: 15px;
-                margin-bottom: 25px;
-                box-shadow: 0 8px 25px rgba(0, 0, 0, 0.1);
-            }
-            
-            .form-row {
-                display: flex;
-                gap: 15px;
-                margin-bottom: 15px;
-                flex-wrap: wrap;
-                align-items: center;
-            }
-            
-            .form-group {
-                flex: 1;
-                min-width: 200px;
-            }
-            
-            .form-group label {
-                display: block;
-                margin-bottom: 8px;
-                font-weight: 600;
-                color: #4a5568;
-            }
-            
-            .form-group input, .form-group select, .form-group textarea {
-                width: 100%;
-                padding: 12px 15px;
-                border-radius: 10px;
-                border: 2px solid #e2e8f0;
-                font-size: 1em;
-                background: rgba(255, 255, 255, 0.9);
-                transition: all 0.3s ease;
-                font-family: inherit;
-            }
-            
-            .form-group textarea {
-                resize: vertical;
-                min-height: 80px;
-            }
-            
-            .form-group input:focus, .form-group select:focus, .form-group textarea:focus {
-                outline: none;
-                border-color: #667eea;
-                box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-                transform: translateY(-2px);
-            }
-            
-            .ekle-btn { 
-                background: linear-gradient(135deg, #48bb78, #38a169);
-                color: #fff; 
-                border: none; 
-                border-radius: 12px; 
-                padding: 12px 30px; 
-                font-size: 1em; 
-                cursor: pointer;
-                font-weight: 600;
-                transition: all 0.3s ease;
-                box-shadow: 0 4px 15px rgba(72, 187, 120, 0.3);
-                margin-top: 10px;
-            }
-            
-            .ekle-btn:hover { 
-                transform: translateY(-2px);
-                box-shadow: 0 8px 25px rgba(72, 187, 120, 0.4);
-            }
-            
-            .ders-sec { 
-                display: flex; 
-                justify-content: center; 
-                margin-bottom: 25px;
-                align-items: center;
-                gap: 15px;
-            }
-            
-            .ders-sec select { 
-                font-size: 1em; 
-                padding: 12px 20px; 
-                border-radius: 12px; 
-                border: 2px solid #e2e8f0;
-                background: rgba(255, 255, 255, 0.9);
-                transition: all 0.3s ease;
-                min-width: 200px;
-            }
-            
-            .ders-sec select:focus {
-                outline: none;
-                border-color: #667eea;
-                box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-            }
-            
-            .ders-sec label {
-                font-weight: 600;
-                color: #4a5568;
-            }
-            
-            .kaynak-grid {
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
-                gap: 20px;
-                margin-bottom: 25px;
-            }
-            
-            .kaynak-card {
-                background: rgba(255, 255, 255, 0.8);
-                padding: 20px;
-                border-radius: 15px;
-                box-shadow: 0 8px 25px rgba(0, 0, 0, 0.1);
-                transition: all 0.3s ease;
-                border-left: 4px solid #667eea;
-            }
-            
-            .kaynak-card:hover {
-                transform: translateY(-5px);
-                box-shadow: 0 15px 35px rgba(0, 0, 0, 0.15);
-            }
-            
-            .kaynak-header {
-                display: flex;
-                justify-content: space-between;
-                align-items: flex-start;
-                margin-bottom: 15px;
-            }
-            
-            .kaynak-title {
-                font-size: 1.2em;
-                font-weight: 700;
-                color: #2d3748;
-                margin-bottom: 5px;
-            }
-            
-            .kaynak-tur {
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                color: white;
-                padding: 4px 12px;
-                border-radius: 20px;
-                font-size: 0.8em;
-                font-weight: 600;
-                text-transform: uppercase;
-            }
-            
-            .kaynak-aciklama {
-                color: #4a5568;
-                margin-bottom: 15px;
-                line-height: 1.5;
-            }
-            
-            .kaynak-link {
-                color: #667eea;
-                text-decoration: none;
-                font-weight: 600;
-                display: inline-block;
-                margin-bottom: 15px;
-                transition: all 0.3s ease;
-            }
-            
-            .kaynak-link:hover {
-                color: #764ba2;
-                transform: translateX(5px);
-            }
-            
-            .sil-btn { 
-                background: linear-gradient(135deg, #f56565, #e53e3e);
-                color: #fff; 
-                border: none; 
-                border-radius: 8px; 
-                padding: 8px 15px; 
-                font-size: 0.9em; 
-                cursor: pointer;
-                font-weight: 600;
-                transition: all 0.3s ease;
-                box-shadow: 0 2px 10px rgba(245, 101, 101, 0.3);
-            }
-            
-            .sil-btn:hover { 
-                transform: translateY(-1px);
-                box-shadow: 0 4px 15px rgba(245, 101, 101, 0.4);
-            }
-            
-            .mesaj { 
-                text-align: center; 
-                color: #667eea; 
-                margin-bottom: 20px;
-                padding: 15px;
-                background: rgba(102, 126, 234, 0.1);
-                border-radius: 12px;
-                font-weight: 600;
-            }
-            
-            .back-link {
-                text-align: center;
-                margin-top: 25px;
-            }
-            
-            .back-link a {
-                color: #667eea;
-                text-decoration: none;
-                font-weight: 600;
-                padding: 12px 25px;
-                border-radius: 12px;
-                background: rgba(102, 126, 234, 0.1);
-                transition: all 0.3s ease;
-                display: inline-block;
-            }
-            
-            .back-link a:hover {
-                background: rgba(102, 126, 234, 0.2);
-                transform: translateY(-2px);
-            }
-            
-            .empty-state {
-                text-align: center;
-                padding: 60px 20px;
-                color: #718096;
-            }
-            
-            .empty-state h3 {
-                margin-bottom: 15px;
-                font-size: 1.5em;
-                color: #4a5568;
-            }
-            
-            @media (max-width: 768px) {
-                .container { margin: 10px; padding: 20px; }
-                .form-row { flex-direction: column; }
-                .form-group { min-width: auto; }
-                .ders-sec { flex-direction: column; }
-                .kaynak-grid { grid-template-columns: 1fr; }
-                .kaynak-card { padding: 15px; }
-            }
-        </style>
-    </head>
-    <body>
+    return render_page('kaynak_yonetimi.html', '''
+    {% extends 'base.html' %}
+    {% block baslik %}Kaynak Yönetimi - İsmet ÇÜÇEN Eğitim Danışmanlığı{% endblock %}
+    {% block head %}
+        <link rel="stylesheet" href="{{ asset_url('css/kaynak_yonetimi.css') }}">
+    {% endblock %}
+    {% block body %}
         <div class="container">
             <h2>📖 Kaynak Yönetimi</h2>
             {{ menu_html | safe }}
@@ -2779,9 +2607,37 @@ def kaynak_yonetimi_sayfa():
                 <a href="/">← Ana Sayfa</a>
             </div>
         </div>
-    </body>
-    </html>
+    {% endblock %}
     ''', dersler=DERSLER, secili_ders=secili_ders, kaynaklar=kaynaklar, mesaj=mesaj, menu_html=menu_html('kaynak'))
+
+@app.route('/veri-indir')
+def veri_indir():
+    # Disk biçimi (JSON ya da ikili) ne olursa olsun dışa aktarım JSON'dur
+    buffer = BytesIO(json.dumps(current_data(), ensure_ascii=False, indent=2, default=json_default).encode('utf-8'))
+    return send_file(buffer, mimetype='application/json', as_attachment=True, download_name='koc_verileri.json')
+
+# KOC_WARMUP=1: worker ilk isteği aldıktan sonra (yani trafik kabul etmeye
+# başlamışken) PDF ve grafik kütüphaneleri arka planda yüklenir; ilk PDF
+# isteği bu yüklemeyi beklemez
+ISINMA = os.environ.get('KOC_WARMUP') == '1'
+_isinma_basladi = False
+
+def kutuphaneleri_isit():
+    pdf_hazirla()
+    charts_modulu()
+
+@app.before_request
+def isinma_baslat():
+    global _isinma_basladi
+    if ISINMA and not _isinma_basladi:
+        _isinma_basladi = True
+        threading.Thread(target=kutuphaneleri_isit, name='isinma', daemon=True).start()
+
+asama_bitti('rotalar ve şablonlar')
+print("Başlangıç süresi: {:.0f} ms ({})".format(
+    (time.perf_counter() - _baslangic) * 1000,
+    ', '.join(f'{ad} {sure:.0f}' for ad, sure in BASLANGIC_SURELERI)))
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 3000))
     app.run(host="0.0.0.0", port=port, debug=False)
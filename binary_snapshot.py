@@ -0,0 +1,123 @@
+# İkili anlık görüntü biçimi
+# Haftalık plan hücreleri ve deneme sınavları için sabit düzenli kayıtlar.
+# Tüm metinler tek bir dize tablosunda bir kez saklanır ve kayıtlar bu tabloya
+# indeksle başvurur; okurken dizeler sys.intern ile paylaşılır, dosya mmap ile
+# açılıp kopyalanmadan çözülür. JSON değişim/dışa aktarım biçimi olarak kalır.
+#
+# Dosya düzeni (little-endian):
+#   başlık : magic 'KOCB', sürüm u16, tür u8, boş u8, dize sayısı u32, kayıt sayısı u32
+#   dizeler: dize sayısı x (başlangıç u32, uzunluk u32), ardından UTF-8 baytları
+#   kayıtlar: plan   -> saat, gun, ders, konu, soru_tipi, soru_adedi, youtube, kaynak (8 x u32)
+#             deneme -> tur, ad, tarih (3 x u32), net f64, puan f64
+import mmap
+import struct
+import sys
+
+MAGIC = b'KOCB'
+SURUM = 1
+TUR_PLAN = 1
+TUR_DENEME = 2
+
+BASLIK = struct.Struct('<4sHBBII')
+DIZE = struct.Struct('<II')
+PLAN_KAYDI = struct.Struct('<8I')
+DENEME_KAYDI = struct.Struct('<3Idd')
+
+PLAN_ALANLARI = ('ders', 'konu', 'soru_tipi', 'soru_adedi', 'youtube', 'kaynak')
+DENEME_ALANLARI = ('tur', 'ad', 'tarih', 'net', 'puan')
+
+# İkili biçimde saklanabilen bölümler
+BINARY_SECTIONS = ('weekly_plan_table', 'deneme_sinavlari')
+
+
+class _DizeTablosu:
+    def __init__(self):
+        self.dizeler = []
+        self._indeks = {}
+
+    def ekle(self, dize):
+        i = self._indeks.get(dize)
+        if i is None:
+            i = self._indeks[dize] = len(self.dizeler)
+            self.dizeler.append(dize)
+        return i
+
+    def baytlar(self):
+        kodlu = [d.encode('utf-8') for d in self.dizeler]
+        tablo = bytearray()
+        konum = 0
+        for b in kodlu:
+            tablo += DIZE.pack(konum, len(b))
+            konum += len(b)
+        return bytes(tablo) + b''.join(kodlu)
+
+
+def encode_section(bolum, deger):
+    # Bölümü ikili biçime çevir; sabit düzene uymuyorsa None döner ve
+    # bölüm JSON olarak yazılır
+    tablo = _DizeTablosu()
+    kayitlar = []
+    if bolum == 'weekly_plan_table':
+        tur = TUR_PLAN
+        for saat, gunler in deger.items():
+            for gun, hucre in gunler.items():
+                if not hucre:
+                    continue
+                if set(hucre) - set(PLAN_ALANLARI) or not all(isinstance(v, str) for v in hucre.values()):
+                    return None
+                kayitlar.append(PLAN_KAYDI.pack(
+                    tablo.ekle(saat), tablo.ekle(gun),
+                    *(tablo.ekle(hucre.get(alan, '')) for alan in PLAN_ALANLARI)))
+    elif bolum == 'deneme_sinavlari':
+        tur = TUR_DENEME
+        for sinav in deger:
+            if (not isinstance(sinav, dict) or set(sinav) != set(DENEME_ALANLARI) or
+                    not all(isinstance(sinav[a], str) for a in ('tur', 'ad', 'tarih')) or
+                    not all(isinstance(sinav[a], float) for a in ('net', 'puan'))):
+                return None
+            kayitlar.append(DENEME_KAYDI.pack(
+                tablo.ekle(sinav['tur']), tablo.ekle(sinav['ad']), tablo.ekle(sinav['tarih']),
+                sinav['net'], sinav['puan']))
+    else:
+        return None
+    return (BASLIK.pack(MAGIC, SURUM, tur, 0, len(tablo.dizeler), len(kayitlar)) +
+            tablo.baytlar() + b''.join(kayitlar))
+
+
+def decode_section(buf):
+    magic, surum, tur, _, dize_sayisi, kayit_sayisi = BASLIK.unpack_from(buf, 0)
+    if magic != MAGIC or surum != SURUM:
+        raise ValueError('Geçersiz ikili anlık görüntü')
+    veri_baslangic = BASLIK.size + dize_sayisi * DIZE.size
+    dizeler = []
+    konum = veri_baslangic
+    for bas, uzunluk in DIZE.iter_unpack(buf[BASLIK.size:veri_baslangic]):
+        bas += veri_baslangic
+        dizeler.append(sys.intern(str(buf[bas:bas + uzunluk], 'utf-8')))
+        konum = bas + uzunluk
+    if tur == TUR_PLAN:
+        plan = {}
+        son = konum + kayit_sayisi * PLAN_KAYDI.size
+        for kayit in PLAN_KAYDI.iter_unpack(buf[konum:son]):
+            plan.setdefault(dizeler[kayit[0]], {})[dizeler[kayit[1]]] = {
+                alan: dizeler[i] for alan, i in zip(PLAN_ALANLARI, kayit[2:])
+            }
+        return plan
+    if tur == TUR_DENEME:
+        son = konum + kayit_sayisi * DENEME_KAYDI.size
+        return [
+            {'tur': dizeler[t], 'ad': dizeler[a], 'tarih': dizeler[d], 'net': net, 'puan': puan}
+            for t, a, d, net, puan in DENEME_KAYDI.iter_unpack(buf[konum:son])
+        ]
+    raise ValueError(f'Bilinmeyen ikili bölüm türü: {tur}')
+
+
+def load_section(path):
+    # Dosyayı belleğe eşleyerek (mmap) çöz; boş dosyalar mmap ile açılamaz
+    with open(path, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return decode_section(f.read())
+        with buf:
+            return decode_section(memoryview(buf))
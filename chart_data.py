@@ -0,0 +1,53 @@
+# Grafik verisi hazırlama
+# Uzun deneme geçmişlerinde her noktayı çizmek hem okunaksız hem de pahalıdır.
+# lttb() seriyi şeklini koruyarak istenen nokta sayısına indirir
+# (Largest-Triangle-Three-Buckets: her kovadan, bir önceki seçilen nokta ve
+# sonraki kovanın ortalamasıyla en büyük üçgeni kuran nokta seçilir; tepe ve
+# dipler korunur). Hareketli ortalamalar önek toplamlarıyla her nokta için
+# sabit sürede hesaplanır.
+
+
+def lttb(x, y, esik):
+    # Seçilen noktaların indeksleri (artan sırada); ilk ve son nokta hep kalır
+    n = len(x)
+    if esik >= n or esik < 3:
+        return list(range(n))
+    secilen = [0]
+    kova = (n - 2) / (esik - 2)
+    a = 0
+    for i in range(esik - 2):
+        # Sonraki kovanın ortalama noktası
+        bas = int((i + 1) * kova) + 1
+        son = min(int((i + 2) * kova) + 1, n)
+        ort_x = sum(x[bas:son]) / (son - bas)
+        ort_y = sum(y[bas:son]) / (son - bas)
+        # Bu kovada üçgeni en büyük yapan nokta
+        ax, ay = x[a], y[a]
+        en_iyi, en_alan = -1, -1.0
+        for j in range(int(i * kova) + 1, int((i + 1) * kova) + 1):
+            alan = abs((ax - ort_x) * (y[j] - ay) - (ax - x[j]) * (ort_y - ay))
+            if alan > en_alan:
+                en_iyi, en_alan = j, alan
+        secilen.append(en_iyi)
+        a = en_iyi
+    secilen.append(n - 1)
+    return secilen
+
+
+def onek_toplamlari(degerler):
+    # toplamlar[i] = degerler[:i] toplamı
+    toplamlar = [0.0]
+    for deger in degerler:
+        toplamlar.append(toplamlar[-1] + deger)
+    return toplamlar
+
+
+def hareketli_ortalama(toplamlar, i, pencere):
+    # i. noktada biten son `pencere` değerin ortalaması (başta daha az değer)
+    bas = max(0, i + 1 - pencere)
+    return (toplamlar[i + 1] - toplamlar[bas]) / (i + 1 - bas)
+
+
+def etiket_adimi(nokta_sayisi, sinir=20):
+    # x ekseninde en fazla `sinir` etiket kalacak şekilde kaç noktada bir yazılacağı
+    return max(1, -(-nokta_sayisi // sinir))
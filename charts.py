@@ -0,0 +1,74 @@
+# Grafik çizimi
+# pyplot süreç genelinde tek bir "geçerli figür" tutar; aynı anda iki thread
+# çizerse birbirinin figürüne yazar. Burada her çizim kendi Figure nesnesi
+# üzerinde FigureCanvasAgg ile yapılır, ortak durum yoktur.
+#
+# Figür kurmak (eksenler, başlık, ızgara, çizgi stili) çizimin önemli bir
+# kısmıdır. Kurulmuş figürler havuzda tutulur ve yeniden kullanılır; bir
+# çizimde yalnızca çizginin verisi ve eksen etiketleri değişir. Havuzdan
+# alınan figürü o an yalnızca alan thread kullanır.
+import threading
+from io import BytesIO
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from chart_data import etiket_adimi
+
+# Havuzda bekleyen en fazla figür sayısı; aynı anda daha çok çizim olursa
+# fazlası için yeni figür kurulur ve iş bitince bırakılır
+HAVUZ_BOYUTU = 4
+
+
+class _PuanFiguru:
+    # Deneme puanları çizgi grafiği: figür, eksen ve güncellenecek çizgi
+    __slots__ = ('figur', 'eksen', 'cizgi')
+
+    def __init__(self):
+        self.figur = Figure(figsize=(8, 4))
+        FigureCanvasAgg(self.figur)
+        self.eksen = self.figur.add_subplot()
+        self.cizgi, = self.eksen.plot([], [], marker='o', color='#2563eb', linewidth=2, markersize=6)
+        self.eksen.set_title('Deneme Sınavı Puanları', fontsize=14, fontweight='bold')
+        self.eksen.set_xlabel('Deneme Sırası', fontsize=12)
+        self.eksen.set_ylabel('Puan', fontsize=12)
+        self.eksen.grid(True, alpha=0.3)
+
+    def ciz(self, puanlar, etiketler, dpi):
+        x = range(len(puanlar))
+        self.cizgi.set_data(x, puanlar)
+        # Uzun geçmişte her noktaya etiket yazılırsa okunmaz
+        adim = etiket_adimi(len(puanlar))
+        self.eksen.set_xticks(x[::adim], etiketler[::adim], rotation=45, ha='right')
+        self.eksen.relim()
+        self.eksen.autoscale_view()
+        self.figur.tight_layout()
+        buf = BytesIO()
+        self.figur.savefig(buf, format='png', dpi=dpi, bbox_inches='tight')
+        return buf.getvalue()
+
+
+_havuz = []
+_havuz_kilidi = threading.Lock()
+
+
+def _figur_al():
+    with _havuz_kilidi:
+        if _havuz:
+            return _havuz.pop()
+    return _PuanFiguru()
+
+
+def _figur_birak(figur):
+    with _havuz_kilidi:
+        if len(_havuz) < HAVUZ_BOYUTU:
+            _havuz.append(figur)
+
+
+def puan_grafigi(puanlar, etiketler, dpi=100):
+    # PNG baytları; etiketler x ekseninde her noktanın altına yazılır
+    figur = _figur_al()
+    png = figur.ciz(puanlar, etiketler, dpi)
+    # Hata olursa figür havuza dönmez; yarım kalmış durum taşınmaz
+    _figur_birak(figur)
+    return png
@@ -0,0 +1,171 @@
+# Haftalık plan önerisi
+# Konu takibinde bitmemiş konulardan, seçilen boş saatlere bir plan önerisi
+# üretir. Önce saatler derslere ağırlıklarıyla orantılı paylaştırılır, sonra
+# saatler sırayla açgözlü (greedy) doldurulur ve kısıtı bozan hücreler
+# takaslarla onarılır. Bir öğrenci birkaç milisaniye sürer; tüm öğrenciler için
+# generate_cohort işi süreç havuzunda çekirdeklere dağıtır. Toplu üretim web
+# isteğinde değil, `flask --app app plan-oner-toplu` komutuyla çalışır.
+#
+# Kısıtlar (mevcut dolu hücreler de sayılır):
+#   - aynı gün aynı ders art arda en fazla ARDISIK_SINIR saat
+#   - bir ders bir günde en fazla GUNLUK_SINIR saat
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+ARDISIK_SINIR = 2
+GUNLUK_SINIR = 3
+ONARIM_TURU = 3
+
+
+def bekleyen_gorevler(konu_takip, dersler):
+    # ders -> [(konu, yayın adı)]. Adı yazılmış yayınları olan konuda tik
+    # atılmamış her yayın ayrı bir görevdir; yayın adı yoksa hiç tik atılmamış
+    # konu tek görevdir. Sıra DERSLER'deki konu sırasıdır.
+    gorevler = {}
+    for ders, konular in dersler.items():
+        takip = konu_takip.get(ders, {})
+        liste = gorevler[ders] = []
+        for konu in konular:
+            yayinlar = takip.get(konu, [])
+            adli = [y for y in yayinlar if y.get('ad')]
+            if adli:
+                liste += [(konu, y['ad']) for y in adli if not y.get('tik')]
+            elif not any(y.get('tik') for y in yayinlar):
+                liste.append((konu, ''))
+    return gorevler
+
+
+def _paylar(toplam, agirliklar, gorev_sayilari):
+    # Saatleri ağırlıkla orantılı dağıt (en büyük kalan yöntemi). Görevi
+    # biten dersin artan payı sonraki turda diğer derslere geçer.
+    pay = {d: 0 for d in agirliklar}
+    acik = [d for d, w in agirliklar.items() if w > 0 and gorev_sayilari.get(d)]
+    kalan = toplam
+    while kalan and acik:
+        w_toplam = sum(agirliklar[d] for d in acik)
+        oran = {d: kalan * agirliklar[d] / w_toplam for d in acik}
+        ek = {d: min(int(oran[d]), gorev_sayilari[d] - pay[d]) for d in acik}
+        dagitilan = sum(ek.values())
+        for d in sorted(acik, key=lambda d: int(oran[d]) - oran[d]):
+            if dagitilan >= kalan:
+                break
+            if pay[d] + ek[d] < gorev_sayilari[d]:
+                ek[d] += 1
+                dagitilan += 1
+        if not dagitilan:
+            break
+        for d in acik:
+            pay[d] += ek[d]
+        kalan -= dagitilan
+        acik = [d for d in acik if pay[d] < gorev_sayilari[d]]
+    return pay
+
+
+def _ihlal(tablo, konum):
+    # konum'daki ders bir kısıtı bozuyor mu? tablo: (saat no, gün no) -> ders
+    ders = tablo.get(konum)
+    if ders is None:
+        return False
+    saat_no, gun_no = konum
+    ust = 0
+    while tablo.get((saat_no - ust - 1, gun_no)) == ders:
+        ust += 1
+    alt = 0
+    while tablo.get((saat_no + alt + 1, gun_no)) == ders:
+        alt += 1
+    if ust + alt + 1 > ARDISIK_SINIR:
+        return True
+    gunluk = sum(1 for (s, g), d in tablo.items() if g == gun_no and d == ders)
+    return gunluk > GUNLUK_SINIR
+
+
+def generate_plan(saatler, gunler, yuvalar, dolu, konu_takip, dersler, agirliklar=None):
+    # saatler, gunler: ızgara eksenleri; yuvalar: doldurulacak [(saat, gün)];
+    # dolu: korunan hücrelerin dersleri {(saat, gün): ders};
+    # agirliklar: ders -> ağırlık (verilmeyen ders 1, 0 olan ders planlanmaz).
+    # Dönüş: {(saat, gün): hücre}; görev yetmezse bazı yuvalar boş kalır.
+    saat_no = {s: i for i, s in enumerate(saatler)}
+    gun_no = {g: i for i, g in enumerate(gunler)}
+    agirliklar = {d: (agirliklar or {}).get(d, 1) for d in dersler}
+    gorevler = bekleyen_gorevler(konu_takip, dersler)
+    konumlar = sorted((gun_no[g], saat_no[s]) for s, g in yuvalar)
+    konumlar = [(s, g) for g, s in konumlar]
+    tablo = {(saat_no[s], gun_no[g]): d for (s, g), d in dolu.items() if s in saat_no and g in gun_no}
+    for konum in konumlar:
+        tablo.pop(konum, None)
+
+    # Bir ders günlük sınırdan fazla saat alamaz; artanı diğer derslere kalır
+    kapasite = GUNLUK_SINIR * len({g for _, g in konumlar})
+    pay = _paylar(len(konumlar), agirliklar, {d: min(len(g), kapasite) for d, g in gorevler.items()})
+    kalan = dict(pay)
+    sira = {d: i for i, d in enumerate(dersler)}
+    atanan = []
+    for konum in konumlar:
+        adaylar = sorted((d for d in kalan if kalan[d] > 0),
+                         key=lambda d: (-kalan[d] / pay[d], sira[d]))
+        if not adaylar:
+            break
+        # Kısıtı bozmayan ilk aday; hiçbiri uymuyorsa en gerideki ders
+        # yerleşir ve onarım aşamasına kalır
+        secilen = adaylar[0]
+        for d in adaylar:
+            tablo[konum] = d
+            if not _ihlal(tablo, konum):
+                secilen = d
+                break
+        tablo[konum] = secilen
+        kalan[secilen] -= 1
+        atanan.append(konum)
+
+    # Onarım: kısıtı bozan hücreyi, iki taraf da kısıta uyacak şekilde başka
+    # bir dersin hücresiyle takas et
+    for _ in range(ONARIM_TURU):
+        bozuk = [k for k in atanan if _ihlal(tablo, k)]
+        if not bozuk:
+            break
+        for k in bozuk:
+            if not _ihlal(tablo, k):
+                continue
+            for diger in atanan:
+                if tablo[diger] == tablo[k]:
+                    continue
+                tablo[k], tablo[diger] = tablo[diger], tablo[k]
+                if not _ihlal(tablo, k) and not _ihlal(tablo, diger):
+                    break
+                tablo[k], tablo[diger] = tablo[diger], tablo[k]
+
+    # Konular her dersin saatlerine zaman sırasıyla dağıtılır
+    sonraki = {d: iter(g) for d, g in gorevler.items()}
+    oneri = {}
+    for konum in sorted(atanan, key=lambda k: (k[1], k[0])):
+        ders = tablo[konum]
+        konu, kaynak = next(sonraki[ders])
+        oneri[(saatler[konum[0]], gunler[konum[1]])] = {
+            'ders': ders, 'konu': konu, 'soru_tipi': '', 'soru_adedi': '', 'youtube': '', 'kaynak': kaynak,
+        }
+    return oneri
+
+
+def _calistir(is_):
+    return generate_plan(**is_)
+
+
+def cohort_pool(islem_sayisi=None):
+    # Alt süreçler spawn ile açılır: fork, yazıcı thread'i ve bağlantı havuzu
+    # olan süreçte tutulan kilitleri kopyalayıp alt süreci kilitleyebilir. Bu
+    # modül yalnızca standart kütüphaneyi içe aktarır; spawn ucuzdur.
+    return ProcessPoolExecutor(max_workers=islem_sayisi or os.cpu_count() or 1,
+                               mp_context=multiprocessing.get_context('spawn'))
+
+
+def generate_cohort(isler, havuz=None):
+    # Her öğrenci için generate_plan; isler generate_plan'ın anahtar kelime
+    # argümanlarıdır. Partiler halinde çağrılacaksa aynı havuz verilmeli.
+    if len(isler) < 2:
+        return [generate_plan(**is_) for is_ in isler]
+    if havuz is None:
+        with cohort_pool(min(os.cpu_count() or 1, len(isler))) as havuz:
+            return generate_cohort(isler, havuz)
+    parca = max(1, len(isler) // (4 * (os.cpu_count() or 1)))
+    return list(havuz.map(_calistir, isler, chunksize=parca))
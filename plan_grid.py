@@ -0,0 +1,328 @@
+# Haftalık plan ızgarası
+# weekly_plan_table eskiden saat -> gün -> hücre sözlüğüydü; 17 x 7 hücrenin
+# çoğu boş {} idi ve dolu her hücre altı anahtarı tekrar tekrar taşıyordu.
+# Burada ızgara seyrek tutulur: yalnızca dolu hücreler, (saat, gün) yuva
+# numarasıyla bir sözlükte saklanır. Hücreler __slots__ kullanan küçük
+# nesnelerdir ve tekrar eden metinler (ders, konu, ...) sys.intern ile paylaşılır.
+#
+# Izgara, satırlar ve hücreler salt okunur eşleme (Mapping) gibi davranır:
+# şablonlardaki plan_table[s][g], cell.ders ve kodun geri kalanındaki
+# hucre.get('ders') değişmeden çalışır; to_json() eski JSON biçimini üretir.
+# Değişiklikler with_change() ile yeni bir ızgara döndürür (kopyala-yaz).
+#
+# Aynı içerikli hücreler tek bir nesnedir (_hucre_havuzu); PlanHistory'deki
+# haftalar, öğrenciler ve kopyalanan planlar aynı hücre nesnelerini paylaşır.
+import sys
+import weakref
+from collections.abc import Mapping
+
+PLAN_ALANLARI = ('ders', 'konu', 'soru_tipi', 'soru_adedi', 'youtube', 'kaynak')
+# Öğrenciler arasında çok tekrar eden alanlar
+_PAYLASILAN = ('ders', 'konu', 'soru_tipi', 'soru_adedi', 'kaynak')
+
+
+def _intern(alan, deger):
+    if alan in _PAYLASILAN and type(deger) is str:
+        return sys.intern(deger)
+    return deger
+
+
+class PlanCell(Mapping):
+    # Tek bir plan hücresi; None olan alanlar hücrede yok sayılır
+    __slots__ = PLAN_ALANLARI + ('__weakref__',)
+
+    def __init__(self, degerler=()):
+        for alan in PLAN_ALANLARI:
+            object.__setattr__(self, alan, None)
+        for alan, deger in dict(degerler).items():
+            if alan not in PLAN_ALANLARI:
+                raise KeyError(f"Bilinmeyen plan alanı: {alan}")
+            object.__setattr__(self, alan, _intern(alan, deger))
+
+    def __setattr__(self, alan, deger):
+        raise AttributeError('PlanCell değiştirilemez; with_change kullanın')
+
+    def __getitem__(self, alan):
+        deger = getattr(self, alan, None) if alan in PLAN_ALANLARI else None
+        if deger is None:
+            raise KeyError(alan)
+        return deger
+
+    def __iter__(self):
+        return (alan for alan in PLAN_ALANLARI if getattr(self, alan) is not None)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f'PlanCell({dict(self)!r})'
+
+    def to_json(self):
+        return dict(self)
+
+
+BOS_HUCRE = PlanCell()
+
+# İçerik -> hücre; hiçbir ızgaranın kullanmadığı hücreler kendiliğinden düşer
+_hucre_havuzu = weakref.WeakValueDictionary()
+
+
+def _hucre(degerler):
+    # Aynı içerikli hücre zaten varsa onu döndür, yoksa oluşturup havuza koy
+    if isinstance(degerler, PlanCell):
+        return degerler
+    degerler = dict(degerler)
+    try:
+        anahtar = tuple(degerler.get(alan) for alan in PLAN_ALANLARI)
+        hucre = _hucre_havuzu.get(anahtar)
+    except TypeError:
+        # Sözlük ya da liste gibi değerler paylaşılmaz
+        return PlanCell(degerler)
+    if hucre is None or len(hucre) != len(degerler):
+        hucre = PlanCell(degerler)
+        _hucre_havuzu[anahtar] = hucre
+    return hucre
+
+
+class _Eksen:
+    # Saat ve gün listeleri ile indeksleri; aynı eksenli ızgaralar paylaşır
+    __slots__ = ('saatler', 'gunler', 'saat_no', 'gun_no')
+    _onbellek = {}
+
+    def __init__(self, saatler, gunler):
+        self.saatler = saatler
+        self.gunler = gunler
+        self.saat_no = {s: i for i, s in enumerate(saatler)}
+        self.gun_no = {g: i for i, g in enumerate(gunler)}
+
+    @classmethod
+    def al(cls, saatler, gunler):
+        anahtar = (tuple(saatler), tuple(gunler))
+        eksen = cls._onbellek.get(anahtar)
+        if eksen is None:
+            eksen = cls._onbellek[anahtar] = cls(*anahtar)
+        return eksen
+
+
+class PlanRow(Mapping):
+    # Izgaranın bir saat satırı (gün -> hücre); ayrı veri tutmaz
+    __slots__ = ('_grid', '_saat_no')
+
+    def __init__(self, grid, saat_no):
+        self._grid = grid
+        self._saat_no = saat_no
+
+    def __getitem__(self, gun):
+        eksen = self._grid._eksen
+        yuva = self._saat_no * len(eksen.gunler) + eksen.gun_no[gun]
+        return self._grid._cells.get(yuva, BOS_HUCRE)
+
+    def __iter__(self):
+        return iter(self._grid._eksen.gunler)
+
+    def __len__(self):
+        return len(self._grid._eksen.gunler)
+
+    def to_json(self):
+        return {gun: hucre.to_json() for gun, hucre in self.items()}
+
+
+class PlanGrid(Mapping):
+    # saat -> gün -> hücre; yalnızca dolu hücreler _cells'te (yuva -> PlanCell)
+    __slots__ = ('_eksen', '_cells')
+
+    def __init__(self, eksen, cells):
+        self._eksen = eksen
+        self._cells = cells
+
+    @classmethod
+    def empty(cls, saatler, gunler):
+        return cls(_Eksen.al(saatler, gunler), {})
+
+    @classmethod
+    def from_dict(cls, plan, saatler, gunler):
+        # Eski sözlük biçiminden kur; listede olmayan saat/günler eksene eklenir
+        saatler = list(saatler) + [s for s in plan if s not in saatler]
+        gunler = list(gunler)
+        for satir in plan.values():
+            gunler += [g for g in satir if g not in gunler]
+        grid = cls.empty(saatler, gunler)
+        for saat, satir in plan.items():
+            for gun, hucre in satir.items():
+                if hucre:
+                    grid._cells[grid._yuva(saat, gun)] = _hucre(hucre)
+        return grid
+
+    def _yuva(self, saat, gun):
+        return self._eksen.saat_no[saat] * len(self._eksen.gunler) + self._eksen.gun_no[gun]
+
+    def __getitem__(self, saat):
+        return PlanRow(self, self._eksen.saat_no[saat])
+
+    def __iter__(self):
+        return iter(self._eksen.saatler)
+
+    def __len__(self):
+        return len(self._eksen.saatler)
+
+    def filled(self):
+        # Dolu hücreler: (saat, gün, hücre)
+        gun_sayisi = len(self._eksen.gunler)
+        for yuva in sorted(self._cells):
+            saat_no, gun_no = divmod(yuva, gun_sayisi)
+            yield self._eksen.saatler[saat_no], self._eksen.gunler[gun_no], self._cells[yuva]
+
+    def to_json(self):
+        return {saat: satir.to_json() for saat, satir in self.items()}
+
+    def changed_cells(self, eski):
+        # eski ızgaradan bu yana hücre nesnesi değişen yuvalar: (saat, gün, hücre).
+        # Aynı içerikli hücreler tek nesne olduğundan karşılaştırma kimlikle yapılır;
+        # eksen farklıysa tüm hücreler döner.
+        if eski is self:
+            return
+        eksen = self._eksen
+        gun_sayisi = len(eksen.gunler)
+        if eski._eksen is not eksen:
+            yuvalar = range(len(eksen.saatler) * gun_sayisi)
+        else:
+            yuvalar = sorted(y for y in self._cells.keys() | eski._cells.keys()
+                             if self._cells.get(y) is not eski._cells.get(y))
+        for yuva in yuvalar:
+            saat_no, gun_no = divmod(yuva, gun_sayisi)
+            yield eksen.saatler[saat_no], eksen.gunler[gun_no], self._cells.get(yuva, BOS_HUCRE)
+
+    def with_change(self, op, path, value):
+        # path ızgaranın altındaki yol: [] (tüm ızgara), [saat], [saat, gün]
+        # ya da [saat, gün, alan]
+        if not path:
+            if op != 'set':
+                raise ValueError(f"Plan için desteklenmeyen değişiklik: {op}")
+            # Başka bir ızgara olduğu gibi paylaşılır (ör. geçen haftanın planı)
+            if isinstance(value, PlanGrid):
+                return value
+            return PlanGrid.from_dict(value, self._eksen.saatler, self._eksen.gunler)
+        cells = dict(self._cells)
+        if len(path) == 1:
+            if op != 'set':
+                raise ValueError(f"Plan satırı için desteklenmeyen değişiklik: {op}")
+            for gun in self._eksen.gunler:
+                cells.pop(self._yuva(path[0], gun), None)
+            for gun, hucre in value.items():
+                if hucre:
+                    cells[self._yuva(path[0], gun)] = _hucre(hucre)
+            return PlanGrid(self._eksen, cells)
+        yuva = self._yuva(path[0], path[1])
+        eski = dict(cells.get(yuva, BOS_HUCRE))
+        if len(path) == 2:
+            if op == 'set':
+                yeni = value
+            elif op == 'del':
+                yeni = {}
+            elif op == 'update':
+                yeni = dict(eski, **value)
+            else:
+                raise ValueError(f"Plan hücresi için desteklenmeyen değişiklik: {op}")
+        elif len(path) == 3 and op in ('set', 'del'):
+            yeni = eski
+            if op == 'set':
+                yeni[path[2]] = value
+            else:
+                yeni.pop(path[2], None)
+        else:
+            raise ValueError(f"Desteklenmeyen plan yolu: {path}")
+        if yeni:
+            cells[yuva] = _hucre(yeni)
+        else:
+            cells.pop(yuva, None)
+        return PlanGrid(self._eksen, cells)
+
+
+class PlanHistory(Mapping):
+    # Haftalık plan geçmişi: ISO hafta ('2026-W42') -> PlanGrid.
+    # Izgaralar değişmez olduğundan bir haftayı kopyalamak aynı ızgara nesnesini
+    # paylaşmaktır; kopyadaki bir düzenleme with_change ile yalnızca o haftanın
+    # yuva sözlüğünü kopyalar, hücreler yine ortaktır. Değişmeyen bir hafta
+    # neredeyse yer tutmaz; yıllarca biriken haftalar yalnızca birbirinden
+    # farklı yuva sözlükleri kadar bellek kullanır.
+    __slots__ = ('_eksen', '_haftalar')
+
+    def __init__(self, eksen, haftalar):
+        self._eksen = eksen
+        self._haftalar = haftalar
+
+    @classmethod
+    def empty(cls, saatler, gunler):
+        return cls(_Eksen.al(saatler, gunler), {})
+
+    @classmethod
+    def from_dict(cls, veri, saatler, gunler):
+        # İki biçim okunur: to_json()'un paylaşımlı biçimi
+        # ({'hucreler': [...], 'haftalar': {hafta: [[saat, gün, hücre no], ...]}})
+        # ve hafta -> saat -> gün -> hücre sözlüğü (SQLite). İçeriği aynı haftalar
+        # okunurken tek ızgarada birleştirilir.
+        if 'haftalar' in veri:
+            hucreler = veri.get('hucreler', [])
+            haftalar = {}
+            for hafta, kayitlar in veri['haftalar'].items():
+                plan = haftalar[hafta] = {}
+                for saat, gun, no in kayitlar:
+                    plan.setdefault(saat, {})[gun] = hucreler[no]
+        else:
+            haftalar = veri
+        gecmis = cls.empty(saatler, gunler)
+        ayni = {}
+        for hafta, plan in haftalar.items():
+            grid = plan if isinstance(plan, PlanGrid) else PlanGrid.from_dict(plan, saatler, gunler)
+            anahtar = tuple((s, g, id(h)) for s, g, h in grid.filled())
+            gecmis._haftalar[hafta] = ayni.setdefault(anahtar, grid)
+        return gecmis
+
+    def __getitem__(self, hafta):
+        return self._haftalar[hafta]
+
+    def __iter__(self):
+        return iter(sorted(self._haftalar))
+
+    def __len__(self):
+        return len(self._haftalar)
+
+    def to_json(self):
+        # Her farklı hücre bir kez yazılır; haftalar hücrelere numarayla başvurur
+        hucreler = []
+        numaralar = {}
+        haftalar = {}
+        for hafta in self:
+            kayitlar = haftalar[hafta] = []
+            for saat, gun, hucre in self._haftalar[hafta].filled():
+                no = numaralar.get(id(hucre))
+                if no is None:
+                    no = numaralar[id(hucre)] = len(hucreler)
+                    hucreler.append(hucre.to_json())
+                kayitlar.append([saat, gun, no])
+        return {'hucreler': hucreler, 'haftalar': haftalar}
+
+    def with_change(self, op, path, value):
+        # path geçmişin altındaki yol: [] (tüm geçmiş), [hafta] ya da
+        # [hafta, saat, ...] (haftanın ızgarasına iletilir)
+        if not path:
+            if op != 'set':
+                raise ValueError(f"Plan geçmişi için desteklenmeyen değişiklik: {op}")
+            if isinstance(value, PlanHistory):
+                return value
+            return PlanHistory.from_dict(value, self._eksen.saatler, self._eksen.gunler)
+        hafta = path[0]
+        haftalar = dict(self._haftalar)
+        if len(path) == 1:
+            if op == 'del':
+                haftalar.pop(hafta, None)
+                return PlanHistory(self._eksen, haftalar)
+            if op != 'set':
+                raise ValueError(f"Plan haftası için desteklenmeyen değişiklik: {op}")
+            grid = PlanGrid(self._eksen, {})
+        else:
+            grid = haftalar.get(hafta)
+            if grid is None:
+                grid = PlanGrid(self._eksen, {})
+        haftalar[hafta] = grid.with_change(op, path[1:], value)
+        return PlanHistory(self._eksen, haftalar)
@@ -0,0 +1,72 @@
+# Planın görüntülenmeye hazır hali
+# Pano (HTML), PDF ve JSON aynı hücre biçimlendirmesini kullanır. Her hücrenin
+# görünümü (HTML parçası, PDF metni, JSON sözlüğü) bir kez üretilir; ızgara
+# değiştiğinde yalnızca hücre nesnesi değişen yuvalar yeniden biçimlenir
+# (PlanGrid.changed_cells). Görünümler ızgaralar gibi değişmezdir: updated()
+# yeni bir PlanView döndürür, eskisini okuyan istekler etkilenmez.
+from markupsafe import Markup
+
+# (alan, CSS sınıfı, ön ek, son ek); ders ve konu her dolu hücrede yazılır
+EK_SATIRLAR = (
+    ('soru_tipi', 'hucre-soru-tipi', '', ''),
+    ('soru_adedi', 'hucre-soru-adedi', '', ' soru'),
+    ('youtube', 'yt-label', '🎬 ', ''),
+    ('kaynak', 'hucre-kaynak', '📚 ', ''),
+)
+
+
+class CellView:
+    # html: <td> içeriği, metin: PDF hücresi, json: hücre sözlüğü,
+    # dolu: ders yazılı mı (sürüklenebilirlik)
+    __slots__ = ('html', 'metin', 'json', 'dolu')
+
+    def __init__(self, hucre):
+        self.json = hucre.to_json()
+        self.dolu = bool(hucre.get('ders'))
+        if not self.dolu:
+            self.html = Markup('-')
+            self.metin = '-'
+            return
+        html = [Markup('<b>%s</b><br><span class="hucre-konu">%s</span>') % (hucre['ders'], hucre.get('konu', ''))]
+        metin = [hucre['ders'], hucre.get('konu', '')]
+        for alan, sinif, on, son in EK_SATIRLAR:
+            if hucre.get(alan):
+                deger = f'{on}{hucre[alan]}{son}'
+                html.append(Markup('<br><span class="%s">%s</span>') % (sinif, deger))
+                metin.append(deger)
+        self.html = Markup('').join(html)
+        self.metin = '\n'.join(metin)
+
+
+class PlanView:
+    # satirlar: [(saat, [(gün, CellView), ...]), ...] ızgara sırasıyla
+    __slots__ = ('grid', 'satirlar', '_hucreler')
+
+    def __init__(self, grid, hucreler):
+        self.grid = grid
+        self._hucreler = hucreler
+        self.satirlar = [(saat, [(gun, hucreler[saat, gun]) for gun in grid[saat]]) for saat in grid]
+
+    @classmethod
+    def from_grid(cls, grid):
+        return cls(grid, {(saat, gun): CellView(hucre) for saat, satir in grid.items()
+                          for gun, hucre in satir.items()})
+
+    def updated(self, grid):
+        # grid için görünüm; değişmeyen hücrelerin görünümü paylaşılır
+        if grid is self.grid:
+            return self
+        hucreler = dict(self._hucreler)
+        for saat, gun, hucre in grid.changed_cells(self.grid):
+            hucreler[saat, gun] = CellView(hucre)
+        if len(hucreler) != len(self._hucreler):
+            # Eksen değişti; eski eksende kalan yuvalar atılır
+            hucreler = {(saat, gun): hucreler[saat, gun] for saat in grid for gun in grid[saat]}
+        return PlanView(grid, hucreler)
+
+    def __getitem__(self, yuva):
+        # view[saat, gün] -> CellView
+        return self._hucreler[yuva]
+
+    def __contains__(self, yuva):
+        return yuva in self._hucreler
@@ -21,6 +21,11 @@ self.addEventListener('install', event => {
 
 // Fetch olaylarını yakala
 self.addEventListener('fetch', event => {
+  // Plan değişiklik akışı ve grafik verisi önbelleğe alınmaz, her zaman ağdan gelir
+  const yol = new URL(event.request.url).pathname;
+  if (yol === '/plan-delta' || yol === '/deneme-grafik.json') {
+    return;
+  }
   event.respondWith(
     caches.match(event.request)
       .then(response => {
@@ -0,0 +1,57 @@
+# Static dosyaların sıkıştırılmış eşleri
+# Derleme (deploy) adımında çalıştırılır: static/ altındaki her dosya için en
+# yüksek sıkıştırma düzeyinde .gz ve (brotli kuruluysa) .br eşi yazar. Uygulama
+# isteğe uygun eşi diskten olduğu gibi gönderir, istek sırasında sıkıştırma
+# yapılmaz. Eş kaynaktan eskiyse kullanılmaz; dosya değişince yeniden çalıştırın.
+#
+#   python static_sikistir.py [dizin]
+import gzip
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# (Content-Encoding, dosya uzantısı); tercih sırası istemcinin kabulüne göre belirlenir
+STATIC_ESLERI = (('br', '.br'), ('gzip', '.gz'))
+# Kullanıcı yüklemeleri derleme sırasında bilinmez
+ATLANAN_DIZINLER = {'uploads'}
+# Eş kaynağın en az %10 altında değilse yazılmaz (png gibi zaten sıkışık dosyalar)
+KAZANC_ORANI = 0.9
+
+
+def sikistir_dosya(yol):
+    with open(yol, 'rb') as f:
+        veri = f.read()
+    esler = {'.gz': gzip.compress(veri, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        esler['.br'] = brotli.compress(veri, quality=11)
+    yazilan = []
+    for uzanti, sikismis in esler.items():
+        if len(sikismis) <= len(veri) * KAZANC_ORANI:
+            with open(yol + uzanti, 'wb') as f:
+                f.write(sikismis)
+            yazilan.append((uzanti, len(sikismis)))
+        elif os.path.exists(yol + uzanti):
+            # Artık kazanç sağlamayan eski eş sunulmasın
+            os.remove(yol + uzanti)
+    return len(veri), yazilan
+
+
+def sikistir_dizin(kok):
+    uzantilar = tuple(uzanti for _, uzanti in STATIC_ESLERI)
+    for dizin, alt_dizinler, dosyalar in os.walk(kok):
+        alt_dizinler[:] = [d for d in alt_dizinler if d not in ATLANAN_DIZINLER]
+        for ad in sorted(dosyalar):
+            if ad.endswith(uzantilar):
+                continue
+            yol = os.path.join(dizin, ad)
+            boyut, yazilan = sikistir_dosya(yol)
+            ozet = ', '.join(f'{u} {b}' for u, b in yazilan) or 'sıkıştırılmadı'
+            print(f'{yol}: {boyut} bayt -> {ozet}')
+
+
+if __name__ == '__main__':
+    sikistir_dizin(sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'))
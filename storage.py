@@ -0,0 +1,1261 @@
+# Kalıcı veri katmanı
+# data.json anlık görüntüsü + her değişikliği tek satır olarak ekleyen günlük (journal).
+# Bir hücre değiştiğinde tüm veri yeniden yazılmaz; günlüğe küçük bir kayıt eklenir.
+# Günlük belli bir boyutu geçince arka planda anlık görüntüye katlanır (compaction).
+# KOC_STORAGE=sqlite ile aynı veri koc.db içindeki tablolarda tutulur.
+import contextlib
+import json
+from collections import OrderedDict
+import os
+import queue
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+
+import binary_snapshot
+
+try:
+    import fcntl
+except ImportError:  # Windows: süreçler arası kilit yok, tek worker varsayılır
+    fcntl = None
+# Günlük bu boyutu (bayt) geçince anlık görüntüye katlanır
+JOURNAL_COMPACT_BYTES = int(os.environ.get('KOC_JOURNAL_COMPACT_BYTES', 256 * 1024))
+# Bu süre (ms) içinde gelen kaydetme istekleri tek bir disk yazımında birleştirilir
+SAVE_WINDOW = float(os.environ.get('KOC_SAVE_WINDOW_MS', 20)) / 1000
+# Yazıcı kuyruğunun kapasitesi; dolunca yeni değişiklikler yer açılana kadar bekler
+WRITE_QUEUE_SIZE = int(os.environ.get('KOC_WRITE_QUEUE', 1024))
+# async: istek bellekteki değişiklik uygulanıp yazım kuyruğa alınınca döner
+# flush: istek, değişikliği içeren yazım diske fsync edilene kadar bekler
+DURABILITY = os.environ.get('KOC_DURABILITY', 'async')
+# KOC_BINARY_SNAPSHOT=1 ile plan ve deneme bölümleri ikili biçimde (.bin) yazılır;
+# okurken dosya uzantısına bakılır, iki biçim bir arada bulunabilir
+BINARY_SNAPSHOT = os.environ.get('KOC_BINARY_SNAPSHOT', '0') == '1'
+
+
+def apply_change(data, op, path, value=None):
+    # Tek bir değişiklik kaydını bellekteki veriye uygula.
+    # path: ['weekly_plan_table', '08:00', 'Pazartesi'] gibi anahtar listesi.
+    # Kopyala-yaz (copy-on-write): yol üzerindeki kaplar (bölüm, satır, hücre ...)
+    # kopyalanır, değişiklik kopyaya uygulanır ve bölüm tek bir atamayla yenisiyle
+    # değiştirilir. Yayımlanmış nesneler hiç değişmez; onları okuyan istekler
+    # kilit almadan tutarlı bir anlık görüntü görür.
+    yeni = _changed_copy(data, op, path, value)
+    if path[0] in yeni:
+        data[path[0]] = yeni[path[0]]
+    else:
+        data.pop(path[0], None)
+
+
+def _changed_copy(node, op, path, value):
+    # node'un, değişikliğin uygulandığı sığ kopyasını döndür. Eksik ara sözlükler
+    # oluşturulur; böylece "yoksa önce boş ekle" için ayrı bir kayıt gerekmez
+    # (o kayıt başka bir worker'ın eklediklerini silebilirdi).
+    # Kendi kopyala-yaz yöntemi olan nesneler (PlanGrid) değişikliği kendileri uygular.
+    if hasattr(node, 'with_change'):
+        return node.with_change(op, path, value)
+    node = list(node) if isinstance(node, list) else dict(node)
+    son = path[0]
+    if len(path) > 1:
+        alt = node.get(son, {}) if isinstance(node, dict) else node[son]
+        node[son] = _changed_copy(alt, op, path[1:], value)
+    elif op == 'set':
+        eski = node.get(son) if isinstance(node, dict) else None
+        # Izgaranın tamamı değiştirilirken de türü korunur (sözlük -> PlanGrid)
+        node[son] = eski.with_change('set', [], value) if hasattr(eski, 'with_change') else value
+    elif op == 'del':
+        if isinstance(node, list):
+            del node[son]
+        else:
+            node.pop(son, None)
+    elif op == 'append':
+        node[son] = node[son] + [value]
+    elif op == 'pop':
+        liste = list(node[son])
+        liste.pop(value)
+        node[son] = liste
+    elif op == 'update':
+        yeni = dict(node[son])
+        yeni.update(value)
+        node[son] = yeni
+    else:
+        raise ValueError(f"Bilinmeyen değişiklik türü: {op}")
+    return node
+
+
+def json_default(value):
+    # json.dumps için: kendi JSON biçimini bilen nesneler (PlanGrid, PlanCell)
+    if hasattr(value, 'to_json'):
+        return value.to_json()
+    raise TypeError(f"{type(value).__name__} JSON'a çevrilemez")
+
+
+def lookup(data, path):
+    # path'teki değeri döndür; yol artık yoksa None
+    hedef = data
+    for key in path:
+        try:
+            hedef = hedef[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return hedef
+
+
+class ConflictError(Exception):
+    # Beklenen sürümle yazılmak istenen yol bu arada başkası tarafından değişmiş
+    def __init__(self, path, version, value):
+        super().__init__(f"{'/'.join(map(str, path))} değişmiş (güncel sürüm {version})")
+        self.path = list(path)
+        self.version = version
+        self.value = value.to_json() if hasattr(value, 'to_json') else value
+
+
+class WriteError(Exception):
+    # Yazıcı thread'in diske yazamadığı iş; flush modunda bekleyen isteğe iletilir
+    pass
+
+
+class VersionMap:
+    # Her yol (bölüm, satır, hücre ...) için sürüm numarası: onu değiştiren son
+    # kaydın seq değeri. Bir değişiklik yolun tüm öneklerinin alt ağaç sürümünü
+    # günceller; bir yolun sürümü kendi alt ağaç sürümü ile atalarından birinin
+    # bütünüyle yeniden yazıldığı sürümün en büyüğüdür. Böylece bir hücre
+    # değişince bölümün sürümü artar ama komşu hücrelerin sürümü değişmez.
+
+    def __init__(self, items=()):
+        self._subtree = {}
+        self._written = {}
+        for yol, agac, yazim in items:
+            self._subtree[tuple(yol)] = agac
+            if yazim:
+                self._written[tuple(yol)] = yazim
+
+    def bump(self, path, seq):
+        path = tuple(path)
+        for i in range(1, len(path) + 1):
+            self._subtree[path[:i]] = seq
+        self._written[path] = seq
+
+    def get(self, path):
+        path = tuple(path)
+        surum = self._subtree.get(path, 0)
+        for i in range(1, len(path)):
+            surum = max(surum, self._written.get(path[:i], 0))
+        return surum
+
+    def changed_since(self, prefix, since):
+        # prefix altında since'ten sonra bütünüyle yazılmış yollar. prefix'in
+        # kendisi ya da bir atası since'ten sonra yeniden yazıldıysa None döner:
+        # alt ağacın tamamı değişmiş sayılır.
+        prefix = tuple(prefix)
+        if any(self._written.get(prefix[:i], 0) > since for i in range(1, len(prefix) + 1)):
+            return None
+        n = len(prefix)
+        return [list(yol) for yol, surum in list(self._written.items())
+                if surum > since and len(yol) > n and yol[:n] == prefix]
+
+    def prune(self, data):
+        # Artık var olmayan yolları unut; silinen yolun sürümü atasında kalır
+        for yol in [y for y in self._subtree if lookup(data, y) is None]:
+            del self._subtree[yol]
+            self._written.pop(yol, None)
+
+    def items(self):
+        return [[list(yol), agac, self._written.get(yol, 0)] for yol, agac in self._subtree.items()]
+
+
+def load_snapshot(path):
+    # Dosya yoksa boş veri; bozuksa sessizce {} döndürmek yerine hata ver,
+    # aksi halde bir sonraki kayıt tüm veriyi varsayılanlarla ezerdi
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        raise RuntimeError(f"{path} okunamadı, dosya bozuk: {e}") from e
+
+
+def load_section(path):
+    # Bölüm dosyasını uzantısına göre ikili ya da JSON olarak oku
+    if not path.endswith('.bin'):
+        return load_snapshot(path)
+    try:
+        return binary_snapshot.load_section(path)
+    except (ValueError, struct.error, UnicodeDecodeError, IndexError) as e:
+        raise RuntimeError(f"{path} okunamadı, dosya bozuk: {e}") from e
+
+
+def atomic_write(path, text):
+    # Geçici dosyaya yaz, fsync et ve tek adımda yerine koy.
+    # Çökme anında ya eski ya da yeni dosya kalır, yarım dosya kalmaz.
+    # text bytes ise dosya ikili kipte yazılır.
+    dizin = os.path.dirname(os.path.abspath(path))
+    fd, gecici = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', dir=dizin)
+    try:
+        kip = ('wb', None) if isinstance(text, bytes) else ('w', 'utf-8')
+        with os.fdopen(fd, kip[0], encoding=kip[1]) as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(gecici, path)
+    except BaseException:
+        if os.path.exists(gecici):
+            os.remove(gecici)
+        raise
+    try:
+        # Yeniden adlandırmanın kendisi de kalıcı olsun
+        dir_fd = os.open(dizin, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass  # Windows dizin fsync desteklemiyor
+
+
+@contextlib.contextmanager
+def file_lock(path, exclusive=True):
+    # Süreçler (gunicorn worker'ları) arası kilit. flock kilidi açık dosya
+    # başına tutulur; aynı süreçte iç içe alınmamalıdır.
+    if fcntl is None:
+        yield
+        return
+    with open(path, 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class BackgroundWriter:
+    # Disk yazımlarını (fsync, anlık görüntü, katlama) istek thread'lerinden alan
+    # tek yazıcı thread. Her iş bir bilet numarası alır; yazıcı kuyruktakileri
+    # toplu olarak alıp depo başına tek bir yazım yapar ve tamamlanan son bileti
+    # duyurur. Kuyruk doluysa submit() bekler (backpressure).
+    # track=True ile verilen biletlerin yazım hatası saklanır ve wait(bilet)
+    # WriteError olarak fırlatır; izlenmeyen biletlerin hataları yalnızca loglanır.
+
+    def __init__(self, maxsize=WRITE_QUEUE_SIZE):
+        self.maxsize = maxsize
+        self._pid = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        # gunicorn --preload ile fork edilen worker'larda thread yoktur; her
+        # süreç kendi yazıcısını ilk işte başlatır
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(self.maxsize)
+            self._submit_lock = threading.Lock()
+            self._cond = threading.Condition()
+            self._submitted = 0
+            self._done = 0
+            self._tracked = set()
+            self._errors = {}
+            self._thread = threading.Thread(target=self._run, name='koc-writer', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def submit(self, store, job, track=False):
+        # job: 'sync' (günlüğü fsync et), 'save' (anlık görüntü yaz) ya da 'compact'
+        self._ensure_started()
+        # Biletler kuyruğa verildikleri sırayla artmalı; aksi halde yazıcı daha
+        # büyük bir bileti bitirip küçüğünü bekleyeni erken uyandırabilir
+        with self._submit_lock:
+            self._submitted += 1
+            bilet = self._submitted
+            if track:
+                with self._cond:
+                    self._tracked.add(bilet)
+            self._queue.put((bilet, store, job))
+        return bilet
+
+    def wait(self, bilet=None):
+        # bilet verilmezse o ana kadar kuyruğa alınan tüm işleri bekle.
+        # İzlenen bir biletin yazımı başarısız olduysa WriteError fırlatılır.
+        if self._pid != os.getpid():
+            return
+        tek = bilet is not None
+        if bilet is None:
+            bilet = self._submitted
+        with self._cond:
+            while self._done < bilet:
+                self._cond.wait()
+            hata = self._errors.pop(bilet, None) if tek else None
+        if hata is not None:
+            raise WriteError(f"Değişiklik diske yazılamadı: {hata}") from hata
+
+    def _run(self):
+        while True:
+            isler = [self._queue.get()]
+            # Kısa bir süre bekleyip biriken işleri tek seferde yaz
+            time.sleep(SAVE_WINDOW)
+            while True:
+                try:
+                    isler.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            depolar = OrderedDict()
+            for _, store, job in isler:
+                depolar.setdefault(store, set()).add(job)
+            hatalar = {}
+            for store, jobs in depolar.items():
+                try:
+                    store.write_pending(jobs)
+                except Exception as e:
+                    # Yazılamayan değişiklikler bellekte kalır, sonraki işte tekrar denenir
+                    print(f"Arka plan yazımı başarısız: {e}")
+                    hatalar[store] = e
+            with self._cond:
+                for bilet, store, _ in isler:
+                    if bilet in self._tracked:
+                        self._tracked.discard(bilet)
+                        if store in hatalar:
+                            self._errors[bilet] = hatalar[store]
+                self._done = isler[-1][0]
+                self._cond.notify_all()
+
+
+writer = BackgroundWriter()
+
+
+class JournalStore:
+    # snapshot_path: data.json, journal: data.journal (her satır bir JSON kaydı)
+    # Her kayıt artan bir 'seq' taşır; anlık görüntü en son katlanan seq'i
+    # 'journal_seq' olarak saklar. Yeniden oynatmada bu seq'e kadar olan
+    # kayıtlar atlanır, böylece yarıda kalan bir katlama iki kez uygulanmaz.
+    #
+    # Birden fazla worker aynı dosyaları paylaşabilir: her istekte dosyaların
+    # (inode, boyut, mtime) damgasına bakılır, başka bir worker yazdıysa yalnızca
+    # o zaman yeniden yüklenir. Yazmalar data.json.lock üzerinde özel kilitle yapılır.
+    # journal=False ise her değişiklikte günlük yerine anlık görüntü yazılır.
+    #
+    # Yavaş disk işleri (günlüğün fsync'i, anlık görüntü, katlama) arka plandaki
+    # yazıcıya (writer) bırakılır. journal=False iken değişiklik önce bellekte
+    # uygulanır ve _unsaved listesinde tutulur; yazıcı kilit altında diski tazeler,
+    # başka bir worker yazdıysa bu değişiklikleri güncel verinin üstüne yeniden
+    # uygular ve tek bir anlık görüntü yazar.
+    #
+    # Anlık görüntü bölüm bölüm saklanır: her bölüm (weekly_plan_table,
+    # deneme_sinavlari, ...) data.sections/ altında kendi dosyasındadır ve
+    # data.manifest.json hangi dosyanın güncel olduğunu söyler. Yalnızca son
+    # anlık görüntüden beri değişen (kirli) bölümler yeniden yazılır; manifestin
+    # atomik olarak değiştirilmesi yazımı tamamlar. Manifest yoksa eski tek
+    # dosyalık data.json okunur ve ilk yazımda bölümlere ayrılır.
+
+    def __init__(self, snapshot_path, journal=True, compact_bytes=JOURNAL_COMPACT_BYTES):
+        base = os.path.splitext(snapshot_path)[0]
+        self.snapshot_path = snapshot_path
+        self.manifest_path = base + '.manifest.json'
+        self.sections_dir = base + '.sections'
+        self.journal = journal
+        self.journal_path = base + '.journal'
+        self.lock_path = snapshot_path + '.lock'
+        self.compact_bytes = compact_bytes
+        self.lock = threading.RLock()
+        self.seq = 0
+        self._file = None
+        self._compacting = False
+        self._snapshot = None
+        self._reload = None
+        # En son görülen dosya damgaları ve günlükte okunan konum
+        self._snapshot_stamp = None
+        self._journal_stamp = None
+        self._journal_pos = 0
+        # Manifestteki bölüm dosyaları, manifest kuşağı ve kirli bölümler
+        self._sections = {}
+        self._gen = 0
+        self._dirty = set()
+        self.versions = VersionMap()
+        # Bellekte uygulanmış ama henüz anlık görüntüye yazılmamış değişiklikler
+        # (yalnızca journal=False)
+        self._unsaved = []
+
+    def bind(self, snapshot, reload):
+        # snapshot(): bellekteki tüm bölümleri döndürür
+        # reload(data): diskten okunan veriyi belleğe yerleştirir
+        self._snapshot = snapshot
+        self._reload = reload
+
+    @property
+    def version(self):
+        # Verinin o anki sürümünü temsil eden ucuz damga
+        return (self._snapshot_stamp, self._journal_stamp)
+
+    def exists(self):
+        return os.path.exists(self.manifest_path) or os.path.exists(self.snapshot_path)
+
+    def _snapshot_file_stamp(self):
+        return _file_stamp(self.manifest_path) or _file_stamp(self.snapshot_path)
+
+    # --- Okuma ---
+    def load(self):
+        # Anlık görüntüyü oku ve ardından günlüğü oynat
+        with self.lock, file_lock(self.lock_path, exclusive=False):
+            self._load_locked()
+
+    def _load_locked(self):
+        if self._file is not None:
+            # Günlük başka bir worker tarafından döndürülmüş olabilir
+            self._file.close()
+            self._file = None
+        self._snapshot_stamp = self._snapshot_file_stamp()
+        manifest = load_snapshot(self.manifest_path)
+        if manifest:
+            # Yalnızca dosyası değişen bölümleri oku; diğerleri bellekte zaten güncel.
+            # Yazılmamış değişiklik varsa tüm bölümler okunur: aşağıda yeniden
+            # uygulanırlar ve okunmayan bölümler onları zaten içerir.
+            data = {}
+            for bolum, dosya in manifest['sections'].items():
+                if self._unsaved or self._sections.get(bolum) != dosya:
+                    data[bolum] = load_section(os.path.join(self.sections_dir, dosya))
+            self._sections = dict(manifest['sections'])
+            self._gen = manifest['gen']
+            self.seq = manifest['journal_seq']
+            self.versions = VersionMap(manifest.get('versions', []))
+            self._dirty = set()
+        else:
+            data = load_snapshot(self.snapshot_path)
+            self.seq = data.pop('journal_seq', 0) if data else 0
+            self.versions = VersionMap()
+            self._sections = {}
+            self._dirty = set(data)
+        self._reload(data)
+        self._journal_pos = 0
+        self._journal_stamp = None
+        self._replay(self.journal_path + '.old', 0)
+        self._replay_journal()
+        # Diskten okunan veri henüz yazılmamış değişikliklerimizi içermez
+        for changes in self._unsaved:
+            self._apply(changes)
+
+    def _replay_journal(self):
+        stamp = _file_stamp(self.journal_path)
+        if stamp is None:
+            self._journal_pos = 0
+        else:
+            self._journal_pos = self._replay(self.journal_path, self._journal_pos)
+            stamp = _file_stamp(self.journal_path)
+        self._journal_stamp = stamp
+
+    def _replay(self, path, pos):
+        # path dosyasını pos baytından itibaren oynat; okunan son konumu döndür
+        if not os.path.exists(path):
+            return pos
+        data = self._snapshot()
+        with open(path, 'rb') as f:
+            f.seek(pos)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Başka bir worker henüz yazmakta ya da çökme anında yarım kalmış satır
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print(f"Günlükte bozuk kayıt atlandı: {path}")
+                    break
+                pos += len(line)
+                if record['seq'] <= self.seq:
+                    continue
+                if 'batch' in record:
+                    changes = record['batch']
+                else:
+                    changes = [(record['op'], record['path'], record.get('value'))]
+                for op, yol, value in changes:
+                    apply_change(data, op, yol, value)
+                    self._dirty.add(yol[0])
+                    self.versions.bump(yol, record['seq'])
+                self.seq = record['seq']
+        return pos
+
+    def changed(self):
+        return (self._snapshot_file_stamp() != self._snapshot_stamp or
+                (self.journal and _file_stamp(self.journal_path) != self._journal_stamp))
+
+    def refresh(self):
+        # Her istekte çağrılır; başka bir worker yazmadıysa iki stat() maliyetindedir
+        if not self.changed():
+            return False
+        with self.lock, file_lock(self.lock_path, exclusive=False):
+            self._refresh_locked()
+        return True
+
+    def _refresh_locked(self):
+        if self._snapshot_file_stamp() != self._snapshot_stamp:
+            self._load_locked()
+        elif self.journal and _file_stamp(self.journal_path) != self._journal_stamp:
+            yeni = _file_stamp(self.journal_path)
+            if yeni is None or (self._journal_stamp and yeni[0] != self._journal_stamp[0]):
+                # Günlük döndürülmüş (katlama); baştan yükle
+                self._load_locked()
+            else:
+                self._replay_journal()
+
+    def check_versions(self, expected):
+        # expected: [(yol, sürüm)]; yollardan biri bu arada değişmişse yazımı reddet
+        for path, surum in expected:
+            if self.versions.get(path) != surum:
+                raise ConflictError(path, self.versions.get(path), lookup(self._snapshot(), path))
+
+    # --- Yazma ---
+    def _apply(self, changes):
+        # Toplu değişiklik tek seq alır. Bölümler önce bir kopyada hazırlanıp
+        # tek adımda yerleştirilir; okuyucular yarım uygulanmış bir toplu
+        # değişiklik görmez.
+        data = self._snapshot()
+        yeni = dict(data)
+        self.seq += 1
+        for op, path, value in changes:
+            apply_change(yeni, op, path, value)
+            self._dirty.add(path[0])
+        data.update(yeni)
+        # Sürümler veriden sonra artar: bir sürümü gören okuyucu, o sürümün
+        # verisini de görür (plan-delta buna güvenir)
+        for _, path, _ in changes:
+            self.versions.bump(path, self.seq)
+
+    def record(self, op, path, value=None, expected=None):
+        # expected: istemcinin gördüğü sürüm; None ise koşulsuz yazılır
+        self.record_many([(op, path, value)], [] if expected is None else [(path, expected)])
+
+    def record_many(self, changes, expected=()):
+        # changes: [(op, path, value)]. Önce tüm sürümler kontrol edilir; biri
+        # tutmazsa hiçbir değişiklik uygulanmaz.
+        if not self.journal:
+            self._record_snapshot(changes, expected)
+            return
+        # Değişikliği belleğe uygula ve günlüğe tek satır olarak ekle.
+        # Kilit altında önce diğer worker'ların kayıtları oynatılır, böylece
+        # seq numaraları ve sürüm kontrolü süreçler arasında da tutarlı kalır.
+        # Satır işletim sistemine hemen verilir (diğer worker'lar görsün); fsync
+        # yazıcı thread'de yapılır. Toplu değişiklik tek satırdır; yarım satır
+        # oynatılmadığından ya hepsi ya hiçbiri geri gelir.
+        with self.lock, file_lock(self.lock_path):
+            self._refresh_locked()
+            self.check_versions(expected)
+            self._apply(changes)
+            if len(changes) == 1:
+                op, path, value = changes[0]
+                kayit = {'seq': self.seq, 'op': op, 'path': list(path)}
+                if value is not None:
+                    kayit['value'] = value
+            else:
+                kayit = {'seq': self.seq, 'batch': [[op, list(path), value] for op, path, value in changes]}
+            if self._file is None:
+                self._file = open(self.journal_path, 'ab')
+            self._file.write(json.dumps(kayit, ensure_ascii=False, separators=(',', ':'), default=json_default).encode('utf-8') + b'\n')
+            self._file.flush()
+            self._journal_pos = self._file.tell()
+            self._journal_stamp = _file_stamp(self.journal_path)
+            buyuk = self._journal_pos >= self.compact_bytes
+        self._submit('sync')
+        if buyuk:
+            self.compact_async()
+
+    def _record_snapshot(self, changes, expected):
+        # Tam anlık görüntü (günlük modu kapalıyken): değişiklik bellekte uygulanır,
+        # yazımı yazıcı thread yapar. Aynı anda gelen değişiklikler tek yazımda birleşir.
+        with self.lock:
+            with file_lock(self.lock_path, exclusive=False):
+                self._refresh_locked()
+            self.check_versions(expected)
+            self._apply(changes)
+            self._unsaved.append(changes)
+        self._submit('save')
+
+    def _submit(self, job):
+        # flush modunda yazım başarısız olursa WriteError isteğe kadar çıkar
+        bilet = writer.submit(self, job, track=DURABILITY == 'flush')
+        if DURABILITY == 'flush':
+            writer.wait(bilet)
+
+    def write_pending(self, jobs):
+        # Yazıcı thread'den çağrılır
+        if 'save' in jobs:
+            with self.lock, file_lock(self.lock_path):
+                self._refresh_locked()
+                if self._unsaved:
+                    self._write_snapshot_locked()
+        if 'sync' in jobs:
+            # fsync kilit dışında yapılır; kopyalanan tanıtıcı, dosya bu arada
+            # katlamayla döndürülse bile eski günlüğü işaret eder (o da anlık
+            # görüntüye fsync ile yazılmıştır)
+            with self.lock:
+                fd = os.dup(self._file.fileno()) if self._file is not None else None
+            if fd is not None:
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        if 'compact' in jobs:
+            self.compact()
+
+    def save(self):
+        # Tüm bölümleri hemen anlık görüntü olarak yaz
+        with self.lock, file_lock(self.lock_path):
+            self._dirty.update(self._snapshot())
+            self._write_snapshot_locked()
+
+    def _write_snapshot_locked(self):
+        data = self._snapshot()
+        gen = self._gen + 1
+        os.makedirs(self.sections_dir, exist_ok=True)
+        yeni = dict(self._sections)
+        for bolum in data:
+            if bolum in self._dirty or bolum not in yeni:
+                icerik = None
+                if BINARY_SNAPSHOT and bolum in binary_snapshot.BINARY_SECTIONS:
+                    icerik = binary_snapshot.encode_section(bolum, data[bolum])
+                if icerik is not None:
+                    dosya = f'{bolum}.{gen}.bin'
+                else:
+                    # Sabit düzene uymayan bölümler JSON olarak kalır
+                    dosya = f'{bolum}.{gen}.json'
+                    icerik = json.dumps(data[bolum], ensure_ascii=False, separators=(',', ':'),
+                                        default=json_default)
+                atomic_write(os.path.join(self.sections_dir, dosya), icerik)
+                yeni[bolum] = dosya
+        self.versions.prune(data)
+        manifest = {'gen': gen, 'journal_seq': self.seq, 'sections': yeni,
+                    'versions': self.versions.items()}
+        atomic_write(self.manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2))
+        # Artık manifestte olmayan eski bölüm dosyalarını temizle
+        for dosya in set(self._sections.values()) - set(yeni.values()):
+            try:
+                os.remove(os.path.join(self.sections_dir, dosya))
+            except FileNotFoundError:
+                pass
+        self._sections = yeni
+        self._gen = gen
+        self._dirty = set()
+        self._unsaved = []
+        self._snapshot_stamp = self._snapshot_file_stamp()
+
+    def flush(self):
+        # Bellekten çıkarılmadan ya da kapanıştan önce: yazıcıdaki işlerin bitmesini
+        # bekle, günlükte katlanmamış kayıt varsa anlık görüntüye yaz ve dosya
+        # tanıtıcısını bırak
+        writer.wait()
+        with self.lock:
+            if self.journal and self._journal_pos > 0:
+                self.compact()
+            elif self._unsaved:
+                self.save()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # --- Katlama ---
+    def compact_async(self):
+        with self.lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        writer.submit(self, 'compact')
+
+    def compact(self):
+        try:
+            with self.lock, file_lock(self.lock_path):
+                self._refresh_locked()
+                # Günlüğü kenara ayır, anlık görüntüyü yaz, ayrılan günlüğü sil.
+                # Arada çökülürse açılışta .old yeniden oynatılır (seq ile tekrar önlenir).
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                if os.path.exists(self.journal_path):
+                    if os.path.exists(self.journal_path + '.old'):
+                        # Önceki katlama yarıda kalmış; eski kayıtları birleştir
+                        with open(self.journal_path + '.old', 'ab') as eski, \
+                                open(self.journal_path, 'rb') as yeni:
+                            eski.write(yeni.read())
+                        os.remove(self.journal_path)
+                    else:
+                        os.replace(self.journal_path, self.journal_path + '.old')
+                self._write_snapshot_locked()
+                if os.path.exists(self.journal_path + '.old'):
+                    os.remove(self.journal_path + '.old')
+                self._journal_pos = 0
+                self._journal_stamp = None
+        finally:
+            self._compacting = False
+
+
+# --- SQLite deposu (koc.db) ---
+# Her bölüm kendi tablosunda tutulur; bir değişiklik yalnızca dokunduğu satırları
+# yazar. Satırlar kullanici_id ile ayrılır (0: varsayılan tek öğrenci verisi).
+
+SQLITE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS veri_surumu (
+    kullanici_id INTEGER PRIMARY KEY,
+    surum INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS ogrenci_bilgileri (
+    kullanici_id INTEGER PRIMARY KEY,
+    adsoyad TEXT NOT NULL DEFAULT '',
+    tarih TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS plan_hucreleri (
+    kullanici_id INTEGER NOT NULL,
+    saat TEXT NOT NULL,
+    gun TEXT NOT NULL,
+    ders TEXT NOT NULL DEFAULT '',
+    konu TEXT NOT NULL DEFAULT '',
+    soru_tipi TEXT NOT NULL DEFAULT '',
+    soru_adedi TEXT NOT NULL DEFAULT '',
+    youtube TEXT NOT NULL DEFAULT '',
+    kaynak TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (kullanici_id, saat, gun)
+);
+CREATE TABLE IF NOT EXISTS plan_haftalari (
+    kullanici_id INTEGER NOT NULL,
+    hafta TEXT NOT NULL,
+    saat TEXT NOT NULL,
+    gun TEXT NOT NULL,
+    ders TEXT NOT NULL DEFAULT '',
+    konu TEXT NOT NULL DEFAULT '',
+    soru_tipi TEXT NOT NULL DEFAULT '',
+    soru_adedi TEXT NOT NULL DEFAULT '',
+    youtube TEXT NOT NULL DEFAULT '',
+    kaynak TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (kullanici_id, hafta, saat, gun)
+);
+CREATE TABLE IF NOT EXISTS dersler (
+    kullanici_id INTEGER NOT NULL,
+    ders TEXT NOT NULL,
+    sira INTEGER NOT NULL,
+    konular TEXT NOT NULL DEFAULT '[]',
+    PRIMARY KEY (kullanici_id, ders)
+);
+CREATE TABLE IF NOT EXISTS konu_takip (
+    kullanici_id INTEGER NOT NULL,
+    ders TEXT NOT NULL,
+    konu TEXT NOT NULL,
+    yayin_no INTEGER NOT NULL,
+    ad TEXT NOT NULL DEFAULT '',
+    tik INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (kullanici_id, ders, konu, yayin_no)
+);
+CREATE TABLE IF NOT EXISTS deneme_sinavlari (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kullanici_id INTEGER NOT NULL,
+    tur TEXT NOT NULL,
+    ad TEXT NOT NULL,
+    tarih TEXT NOT NULL,
+    net REAL NOT NULL DEFAULT 0,
+    puan REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS deneme_sinavlari_kullanici ON deneme_sinavlari (kullanici_id, id);
+CREATE TABLE IF NOT EXISTS kaynaklar (
+    kullanici_id INTEGER NOT NULL,
+    ders TEXT NOT NULL,
+    kaynak_adi TEXT NOT NULL,
+    tur TEXT NOT NULL DEFAULT '',
+    aciklama TEXT NOT NULL DEFAULT '',
+    link TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (kullanici_id, ders, kaynak_adi)
+);
+CREATE TABLE IF NOT EXISTS surumler (
+    kullanici_id INTEGER NOT NULL,
+    yol TEXT NOT NULL,
+    agac INTEGER NOT NULL,
+    yazim INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (kullanici_id, yol)
+);
+'''
+
+PLAN_ALANLARI = ('ders', 'konu', 'soru_tipi', 'soru_adedi', 'youtube', 'kaynak')
+
+# Sabit SQL metinleri: sqlite3 her bağlantıda derlenmiş ifadeleri metne göre
+# önbelleğe aldığından aynı metin tekrar kullanıldıkça yeniden derlenmez
+SQL_SURUM_OKU = 'SELECT surum FROM veri_surumu WHERE kullanici_id = ?'
+SQL_SURUM_ARTIR = ('INSERT INTO veri_surumu (kullanici_id, surum) VALUES (?, 1) '
+                   'ON CONFLICT (kullanici_id) DO UPDATE SET surum = surum + 1')
+SQL_BILGI_YAZ = ('INSERT OR REPLACE INTO ogrenci_bilgileri (kullanici_id, adsoyad, tarih, hafta) '
+                 'VALUES (?, ?, ?, ?)')
+SQL_BILGI_OKU = 'SELECT adsoyad, tarih, hafta FROM ogrenci_bilgileri WHERE kullanici_id = ?'
+SQL_HUCRE_YAZ = ('INSERT OR REPLACE INTO plan_hucreleri (kullanici_id, saat, gun, ders, konu, soru_tipi, '
+                 'soru_adedi, youtube, kaynak) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)')
+SQL_HUCRE_SIL = 'DELETE FROM plan_hucreleri WHERE kullanici_id = ? AND saat = ? AND gun = ?'
+SQL_HUCRE_OKU = ('SELECT saat, gun, ders, konu, soru_tipi, soru_adedi, youtube, kaynak '
+                 'FROM plan_hucreleri WHERE kullanici_id = ?')
+SQL_HUCRE_TEMIZLE = 'DELETE FROM plan_hucreleri WHERE kullanici_id = ?'
+SQL_HAFTA_YAZ = ('INSERT INTO plan_haftalari (kullanici_id, hafta, saat, gun, ders, konu, soru_tipi, '
+                 'soru_adedi, youtube, kaynak) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)')
+SQL_HAFTA_SIL = 'DELETE FROM plan_haftalari WHERE kullanici_id = ? AND hafta = ?'
+SQL_HAFTA_TEMIZLE = 'DELETE FROM plan_haftalari WHERE kullanici_id = ?'
+SQL_HAFTA_OKU = ('SELECT hafta, saat, gun, ders, konu, soru_tipi, soru_adedi, youtube, kaynak '
+                 'FROM plan_haftalari WHERE kullanici_id = ?')
+SQL_DERS_YAZ = 'INSERT OR REPLACE INTO dersler (kullanici_id, ders, sira, konular) VALUES (?, ?, ?, ?)'
+SQL_DERS_SIL = 'DELETE FROM dersler WHERE kullanici_id = ? AND ders = ?'
+SQL_DERS_OKU = 'SELECT ders, konular FROM dersler WHERE kullanici_id = ? ORDER BY sira'
+SQL_TAKIP_YAZ = ('INSERT OR REPLACE INTO konu_takip (kullanici_id, ders, konu, yayin_no, ad, tik) '
+                 'VALUES (?, ?, ?, ?, ?, ?)')
+SQL_TAKIP_SIL_DERS = 'DELETE FROM konu_takip WHERE kullanici_id = ? AND ders = ?'
+SQL_TAKIP_SIL_KONU = 'DELETE FROM konu_takip WHERE kullanici_id = ? AND ders = ? AND konu = ?'
+SQL_TAKIP_OKU = ('SELECT ders, konu, yayin_no, ad, tik FROM konu_takip WHERE kullanici_id = ? '
+                 'ORDER BY rowid')
+SQL_DENEME_EKLE = ('INSERT INTO deneme_sinavlari (kullanici_id, tur, ad, tarih, net, puan) '
+                   'VALUES (?, ?, ?, ?, ?, ?)')
+SQL_DENEME_SIL_SIRA = ('DELETE FROM deneme_sinavlari WHERE id = (SELECT id FROM deneme_sinavlari '
+                       'WHERE kullanici_id = ? ORDER BY id LIMIT 1 OFFSET ?)')
+SQL_DENEME_OKU = 'SELECT tur, ad, tarih, net, puan FROM deneme_sinavlari WHERE kullanici_id = ? ORDER BY id'
+SQL_KAYNAK_YAZ = ('INSERT OR REPLACE INTO kaynaklar (kullanici_id, ders, kaynak_adi, tur, aciklama, link) '
+                  'VALUES (?, ?, ?, ?, ?, ?)')
+SQL_KAYNAK_SIL = 'DELETE FROM kaynaklar WHERE kullanici_id = ? AND ders = ? AND kaynak_adi = ?'
+SQL_KAYNAK_SIL_DERS = 'DELETE FROM kaynaklar WHERE kullanici_id = ? AND ders = ?'
+SQL_KAYNAK_OKU = 'SELECT ders, kaynak_adi, tur, aciklama, link FROM kaynaklar WHERE kullanici_id = ? ORDER BY rowid'
+SQL_YOL_SURUM_YAZ = ('INSERT INTO surumler (kullanici_id, yol, agac, yazim) VALUES (?, ?, ?, ?) '
+                     'ON CONFLICT (kullanici_id, yol) DO UPDATE SET agac = excluded.agac, '
+                     'yazim = MAX(yazim, excluded.yazim)')
+SQL_YOL_SURUM_OKU = 'SELECT yol, agac, yazim FROM surumler WHERE kullanici_id = ?'
+SQL_KULLANICI_TEMIZLE = [
+    'DELETE FROM ogrenci_bilgileri WHERE kullanici_id = ?',
+    SQL_HUCRE_TEMIZLE,
+    SQL_HAFTA_TEMIZLE,
+    'DELETE FROM dersler WHERE kullanici_id = ?',
+    'DELETE FROM konu_takip WHERE kullanici_id = ?',
+    'DELETE FROM deneme_sinavlari WHERE kullanici_id = ?',
+    'DELETE FROM kaynaklar WHERE kullanici_id = ?',
+]
+
+
+class ConnectionPool:
+    # Thread'ler arasında paylaşılan sabit boyutlu bağlantı havuzu
+    def __init__(self, path, size=int(os.environ.get('KOC_SQLITE_POOL', 4))):
+        self.path = path
+        self._pool = queue.LifoQueue()
+        for _ in range(size):
+            self._pool.put(self._connect())
+
+    def _connect(self):
+        # isolation_level=None: işlemler transaction() içinde açıkça başlatılır
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False,
+                               cached_statements=64, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA foreign_keys=ON')
+        return conn
+
+    @contextlib.contextmanager
+    def connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        # BEGIN IMMEDIATE yazma kilidini hemen alır; böylece işlem içinde okunan
+        # sürüm, commit anına kadar başka bir süreç tarafından değiştirilemez
+        with self.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+
+
+class SqliteStore:
+    # JournalStore ile aynı arayüz: bind / load / refresh / record / save.
+    # veri_surumu tablosu her yazımda artar; diğer worker'lar bunu her istekte
+    # tek satırlık bir sorguyla kontrol edip yalnızca değiştiyse yeniden yükler.
+
+    def __init__(self, db_path, kullanici_id=0, import_path=None, pool=None):
+        self.db_path = db_path
+        self.kullanici_id = kullanici_id
+        self.import_path = import_path
+        self.pool = pool or ConnectionPool(db_path)
+        self.lock = threading.RLock()
+        self.seq = 0
+        self.versions = VersionMap()
+        self._snapshot = None
+        self._reload = None
+        with self.pool.transaction() as conn:
+            # executescript kendi COMMIT'ini yaptığından ifadeler tek tek çalıştırılır
+            for ifade in SQLITE_SCHEMA.split(';'):
+                if ifade.strip():
+                    conn.execute(ifade)
+            # Eski veritabanlarında aktif hafta sütunu yok
+            sutunlar = {row[1] for row in conn.execute('PRAGMA table_info(ogrenci_bilgileri)')}
+            if 'hafta' not in sutunlar:
+                conn.execute("ALTER TABLE ogrenci_bilgileri ADD COLUMN hafta TEXT NOT NULL DEFAULT ''")
+
+    def bind(self, snapshot, reload):
+        self._snapshot = snapshot
+        self._reload = reload
+
+    @property
+    def version(self):
+        return self.seq
+
+    def _read_version(self, conn):
+        row = conn.execute(SQL_SURUM_OKU, (self.kullanici_id,)).fetchone()
+        return row[0] if row else 0
+
+    def _read_versions(self, conn):
+        return VersionMap((json.loads(yol), agac, yazim)
+                          for yol, agac, yazim in conn.execute(SQL_YOL_SURUM_OKU, (self.kullanici_id,)))
+
+    # --- Okuma ---
+    def load(self):
+        with self.lock:
+            with self.pool.connection() as conn:
+                surum = self._read_version(conn)
+                data = self._read_all(conn)
+                surumler = self._read_versions(conn)
+            if data is None:
+                # İlk açılış: varsa data.json içeriği tablolara aktarılır. Aynı anda
+                # açılan başka bir worker aktarımı bitirmiş olabilir; yazma kilidi
+                # altında tekrar bakılır, yoksa onun kayıtları silinirdi
+                with self.pool.transaction() as conn:
+                    data = self._read_all(conn)
+                    if data is None:
+                        self._reload(load_snapshot(self.import_path) if self.import_path else {})
+                        self._save_rows(conn)
+                        return
+                    surum = self._read_version(conn)
+                    surumler = self._read_versions(conn)
+            self._reload(data)
+            self.seq = surum
+            self.versions = surumler
+
+    def refresh(self):
+        # Her istekte çağrılır; kimse yazmadıysa tek satırlık bir sorgu maliyetindedir
+        with self.pool.connection() as conn:
+            if self._read_version(conn) == self.seq:
+                return False
+        self.load()
+        return True
+
+    def _read_all(self, conn):
+        k = self.kullanici_id
+        bilgi = conn.execute(SQL_BILGI_OKU, (k,)).fetchone()
+        if bilgi is None:
+            return None
+        data = {'program_info': {'adsoyad': bilgi[0], 'tarih': bilgi[1], 'hafta': bilgi[2]}}
+        plan = {}
+        for row in conn.execute(SQL_HUCRE_OKU, (k,)):
+            plan.setdefault(row[0], {})[row[1]] = dict(zip(PLAN_ALANLARI, row[2:]))
+        data['weekly_plan_table'] = plan
+        haftalar = {}
+        for row in conn.execute(SQL_HAFTA_OKU, (k,)):
+            haftalar.setdefault(row[0], {}).setdefault(row[1], {})[row[2]] = dict(zip(PLAN_ALANLARI, row[3:]))
+        data['plan_haftalari'] = haftalar
+        data['DERSLER'] = {ders: json.loads(konular) for ders, konular in conn.execute(SQL_DERS_OKU, (k,))}
+        takip = {}
+        for ders, konu, yayin_no, ad, tik in conn.execute(SQL_TAKIP_OKU, (k,)):
+            yayinlar = takip.setdefault(ders, {}).setdefault(konu, [])
+            while len(yayinlar) <= yayin_no:
+                yayinlar.append({'ad': '', 'tik': False})
+            yayinlar[yayin_no] = {'ad': ad, 'tik': bool(tik)}
+        # Konusu olmayan dersler de konu takibinde boş olarak görünsün
+        for ders in data['DERSLER']:
+            takip.setdefault(ders, {})
+        data['konu_takip'] = takip
+        data['deneme_sinavlari'] = [
+            {'tur': tur, 'ad': ad, 'tarih': tarih, 'net': net, 'puan': puan}
+            for tur, ad, tarih, net, puan in conn.execute(SQL_DENEME_OKU, (k,))
+        ]
+        kaynaklar = {}
+        for ders, kaynak_adi, tur, aciklama, link in conn.execute(SQL_KAYNAK_OKU, (k,)):
+            kaynaklar.setdefault(ders, {})[kaynak_adi] = {'tur': tur, 'aciklama': aciklama, 'link': link}
+        data['kaynaklar'] = kaynaklar
+        return data
+
+    # --- Yazma ---
+    def check_versions(self, expected):
+        for path, surum in expected:
+            if self.versions.get(path) != surum:
+                raise ConflictError(path, self.versions.get(path), lookup(self._snapshot(), path))
+
+    def record(self, op, path, value=None, expected=None):
+        self.record_many([(op, path, value)], [] if expected is None else [(path, expected)])
+
+    def record_many(self, changes, expected=()):
+        with self.lock:
+            with self.pool.transaction() as conn:
+                surum = self._read_version(conn)
+                if surum != self.seq:
+                    # Başka bir worker yazmış; değişikliği güncel veriye uygula
+                    self._reload(self._read_all(conn))
+                    self.versions = self._read_versions(conn)
+                    self.seq = surum
+                self.check_versions(expected)
+                data = self._snapshot()
+                yeni = dict(data)
+                for op, path, value in changes:
+                    apply_change(yeni, op, path, value)
+                    self._write_rows(conn, yeni, op, path, value)
+                conn.execute(SQL_SURUM_ARTIR, (self.kullanici_id,))
+                seq = self._read_version(conn)
+                # Yolların tüm önekleri için sürüm satırları (son öğe bütünüyle yazıldı)
+                for _, path, _ in changes:
+                    for i in range(1, len(path) + 1):
+                        conn.execute(SQL_YOL_SURUM_YAZ, (self.kullanici_id,
+                                                         json.dumps(list(path[:i]), ensure_ascii=False),
+                                                         seq, seq if i == len(path) else 0))
+            # Bellek ancak işlem kalıcı olduktan sonra değişir
+            data.update(yeni)
+            self.seq = seq
+            for _, path, _ in changes:
+                self.versions.bump(path, seq)
+
+    def flush(self):
+        # Her değişiklik zaten kendi işleminde yazıldı
+        pass
+
+    def save(self):
+        # Tüm veriyi tek işlemde yeniden yaz (ilk aktarım için)
+        with self.lock, self.pool.transaction() as conn:
+            self._save_rows(conn)
+
+    def _save_rows(self, conn):
+        data = self._snapshot()
+        for sql in SQL_KULLANICI_TEMIZLE:
+            conn.execute(sql, (self.kullanici_id,))
+        self._write_info(conn, data['program_info'])
+        self._write_plan(conn, data)
+        for hafta in data['plan_haftalari']:
+            self._write_hafta(conn, data, hafta)
+        for ders in data['DERSLER']:
+            self._write_ders(conn, data, ders)
+        for ders in data['konu_takip']:
+            self._write_takip(conn, data, ders)
+        for sinav in data['deneme_sinavlari']:
+            self._insert_deneme(conn, sinav)
+        for ders in data['kaynaklar']:
+            self._write_kaynaklar(conn, data, ders)
+        conn.execute(SQL_SURUM_ARTIR, (self.kullanici_id,))
+        self.seq = self._read_version(conn)
+
+    def _write_rows(self, conn, data, op, path, value):
+        # Değişiklik yolunu etkilenen satırlara çevir; yazılacak değer her zaman
+        # değişiklik uygulanmış bellekteki veriden okunur
+        bolum = path[0]
+        k = self.kullanici_id
+        if bolum == 'program_info':
+            self._write_info(conn, data['program_info'])
+        elif bolum == 'weekly_plan_table':
+            if len(path) < 3:
+                self._write_plan(conn, data)
+            else:
+                saat, gun = path[1], path[2]
+                self._write_cell(conn, saat, gun, data['weekly_plan_table'][saat][gun])
+        elif bolum == 'plan_haftalari':
+            if len(path) == 1:
+                conn.execute(SQL_HAFTA_TEMIZLE, (k,))
+                for hafta in data['plan_haftalari']:
+                    self._write_hafta(conn, data, hafta)
+            else:
+                self._write_hafta(conn, data, path[1])
+        elif bolum == 'DERSLER':
+            self._write_ders(conn, data, path[1])
+        elif bolum == 'konu_takip':
+            if len(path) == 2:
+                self._write_takip(conn, data, path[1])
+            else:
+                ders, konu = path[1], path[2]
+                conn.execute(SQL_TAKIP_SIL_KONU, (k, ders, konu))
+                yayinlar = data['konu_takip'].get(ders, {}).get(konu)
+                for no, yayin in enumerate(yayinlar or []):
+                    conn.execute(SQL_TAKIP_YAZ, (k, ders, konu, no, yayin['ad'], int(yayin['tik'])))
+        elif bolum == 'deneme_sinavlari':
+            if op == 'append':
+                self._insert_deneme(conn, value)
+            elif op == 'pop':
+                conn.execute(SQL_DENEME_SIL_SIRA, (k, value))
+            else:
+                raise ValueError(f"deneme_sinavlari için desteklenmeyen değişiklik: {op}")
+        elif bolum == 'kaynaklar':
+            if len(path) == 2:
+                self._write_kaynaklar(conn, data, path[1])
+            else:
+                ders, kaynak_adi = path[1], path[2]
+                kaynak = data['kaynaklar'].get(ders, {}).get(kaynak_adi)
+                if kaynak is None:
+                    conn.execute(SQL_KAYNAK_SIL, (k, ders, kaynak_adi))
+                else:
+                    conn.execute(SQL_KAYNAK_YAZ, (k, ders, kaynak_adi, kaynak['tur'],
+                                                 kaynak['aciklama'], kaynak['link']))
+        else:
+            raise ValueError(f"Bilinmeyen bölüm: {bolum}")
+
+    def _write_info(self, conn, info):
+        conn.execute(SQL_BILGI_YAZ, (self.kullanici_id, info.get('adsoyad', ''), info.get('tarih', ''),
+                                     info.get('hafta', '')))
+
+    def _write_plan(self, conn, data):
+        conn.execute(SQL_HUCRE_TEMIZLE, (self.kullanici_id,))
+        for saat, gunler in data['weekly_plan_table'].items():
+            for gun, hucre in gunler.items():
+                if hucre.get('ders'):
+                    self._write_cell(conn, saat, gun, hucre)
+
+    def _write_hafta(self, conn, data, hafta):
+        # Haftanın satırları baştan yazılır; silinen hafta yalnızca silinir
+        conn.execute(SQL_HAFTA_SIL, (self.kullanici_id, hafta))
+        grid = data['plan_haftalari'].get(hafta)
+        for saat, gun, hucre in (grid.filled() if grid is not None else ()):
+            conn.execute(SQL_HAFTA_YAZ, (self.kullanici_id, hafta, saat, gun) +
+                         tuple(hucre.get(alan, '') for alan in PLAN_ALANLARI))
+
+    def _write_cell(self, conn, saat, gun, hucre):
+        if hucre.get('ders'):
+            conn.execute(SQL_HUCRE_YAZ, (self.kullanici_id, saat, gun) +
+                         tuple(hucre.get(alan, '') for alan in PLAN_ALANLARI))
+        else:
+            conn.execute(SQL_HUCRE_SIL, (self.kullanici_id, saat, gun))
+
+    def _write_ders(self, conn, data, ders):
+        if ders in data['DERSLER']:
+            sira = list(data['DERSLER']).index(ders)
+            conn.execute(SQL_DERS_YAZ, (self.kullanici_id, ders, sira,
+                                        json.dumps(data['DERSLER'][ders], ensure_ascii=False)))
+        else:
+            conn.execute(SQL_DERS_SIL, (self.kullanici_id, ders))
+
+    def _write_takip(self, conn, data, ders):
+        conn.execute(SQL_TAKIP_SIL_DERS, (self.kullanici_id, ders))
+        for konu, yayinlar in data['konu_takip'].get(ders, {}).items():
+            for no, yayin in enumerate(yayinlar):
+                conn.execute(SQL_TAKIP_YAZ, (self.kullanici_id, ders, konu, no, yayin['ad'], int(yayin['tik'])))
+
+    def _insert_deneme(self, conn, sinav):
+        conn.execute(SQL_DENEME_EKLE, (self.kullanici_id, sinav['tur'], sinav['ad'], sinav['tarih'],
+                                       sinav['net'], sinav['puan']))
+
+    def _write_kaynaklar(self, conn, data, ders):
+        conn.execute(SQL_KAYNAK_SIL_DERS, (self.kullanici_id, ders))
+        for kaynak_adi, kaynak in data['kaynaklar'].get(ders, {}).items():
+            conn.execute(SQL_KAYNAK_YAZ, (self.kullanici_id, ders, kaynak_adi, kaynak['tur'],
+                                          kaynak['aciklama'], kaynak['link']))
+
+
+# --- Öğrenci bölümleri ---
+# Her öğrencinin verisi ayrı bir bölümdür (partition). Yalnızca son kullanılan
+# öğrencilerin bölümleri bellekte tutulur; toplam tahmini boyut bütçeyi aşınca
+# en uzun süredir kullanılmayan bölüm diske yazılıp bellekten çıkarılır.
+
+# Bellekte tutulacak bölümlerin toplam tahmini boyutu (MB)
+PARTITION_BUDGET = int(float(os.environ.get('KOC_PARTITION_BUDGET_MB', 64)) * 1024 * 1024)
+
+
+def estimate_size(value):
+    # Kabaca bellek tahmini: kompakt JSON uzunluğu (Python nesneleri bunun birkaç katı)
+    return len(json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=json_default))
+
+
+class Partition:
+    # Tek bir öğrencinin bellekteki verisi ve ona bağlı depo.
+    # Yazmalar öğrenci başına deponun kilidiyle (store.lock, süreçler arasında
+    # dosya kilidi) sıraya girer ve apply_change ile kopyala-yaz uygulanır.
+    # Okumalar snapshot() ile alınan, hiç değişmeyecek bölüm nesnelerini kullanır;
+    # bu yüzden okuyucular kilit almaz ve yazarları bekletmez.
+    def __init__(self, key, data, store):
+        self.key = key
+        self.data = data
+        self.store = store
+        self._size = 0
+        # Bu veriden türetilen önbellekler (ör. plan görünümü); bölüm
+        # PartitionCache'ten düşünce onlar da gider
+        self.derived = {}
+
+    @property
+    def size(self):
+        # Yazımdan sonra ilk sorulduğunda (PartitionCache bütçeyi kontrol
+        # ederken) yeniden ölçülür; değiştirilen ya da silinen değerlerin eski
+        # boyutu böylece toplamdan düşer
+        if self._size is None:
+            self._size = estimate_size(self.snapshot())
+        return self._size
+
+    @size.setter
+    def size(self, value):
+        self._size = value
+
+    def snapshot(self):
+        # Bölümlerin o anki sürümleri; sonraki yazmalar bunları değiştirmez
+        return dict(self.data)
+
+    def record(self, op, path, value=None, expected=None):
+        self.store.record(op, path, value, expected)
+        self._size = None
+
+    def record_many(self, changes, expected=()):
+        self.store.record_many(changes, expected)
+        self._size = None
+
+
+class PartitionCache:
+    # open_partition(key) -> Partition: bölümü diskten/veritabanından yükler
+
+    def __init__(self, open_partition, budget=PARTITION_BUDGET):
+        self._open = open_partition
+        self.budget = budget
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}
+
+    @property
+    def used(self):
+        return sum(p.size for p in self._items.values())
+
+    def get(self, key):
+        with self._lock:
+            p = self._items.get(key)
+            if p is not None:
+                self._items.move_to_end(key)
+                return p
+            # Aynı öğrenci için eş zamanlı yüklemeler tek yüklemede birleşir;
+            # diğer öğrencilerin istekleri bu sırada beklemez
+            yukleme = self._loading.setdefault(key, threading.Lock())
+        with yukleme:
+            with self._lock:
+                p = self._items.get(key)
+                if p is not None:
+                    return p
+            p = self._open(key)
+            p.size = estimate_size(p.data)
+            with self._lock:
+                self._items[key] = p
+                self._loading.pop(key, None)
+                tasan = self._evict_locked(keep=key)
+        for eski in tasan:
+            eski.store.flush()
+        return p
+
+    def _evict_locked(self, keep):
+        tasan = []
+        toplam = self.used
+        while toplam > self.budget and len(self._items) > 1:
+            key = next(iter(self._items))
+            if key == keep:
+                break
+            eski = self._items.pop(key)
+            toplam -= eski.size
+            tasan.append(eski)
+        return tasan
+
+    def flush_all(self):
+        with self._lock:
+            bolumler = list(self._items.values())
+        for p in bolumler:
+            p.store.flush()
@@ -0,0 +1,123 @@
+# Sayfalar için SVG grafikler
+# Basit çizgi ve çubuk grafikler doğrudan SVG metni olarak üretilir; matplotlib
+# gerekmez, çizim mikrosaniyeler sürer ve grafik sayfanın içinde gelir (ayrı
+# istek, PNG rasterleştirme yok). Ölçüler viewBox birimidir; SVG kabın
+# genişliğine ölçeklenir. PDF'teki grafikler charts.py ile çizilmeye devam eder.
+#
+# Dönen değerler Markup'tır; tüm etiketler kaçışlanır.
+import math
+
+from markupsafe import Markup, escape
+
+from chart_data import etiket_adimi
+
+RENK = '#2563eb'
+TUR_RENKLERI = {'TYT': '#667eea', 'AYT': '#ed64a6'}
+DIGER_RENK = '#a0aec0'
+# Bundan fazla noktada nokta işaretleri birbirine girer
+ISARET_SINIRI = 60
+YAZI = 'font-family="sans-serif" fill="#2d3748"'
+
+
+def _sayi(x):
+    # SVG'de gereksiz ondalıkları yazma
+    return f'{x:.1f}'.rstrip('0').rstrip('.')
+
+
+def _araliklar(en_kucuk, en_buyuk, adet=5):
+    # Eksen için yuvarlak (1, 2, 5 x 10^n) adımlı çizgiler
+    if en_kucuk == en_buyuk:
+        en_kucuk, en_buyuk = en_kucuk - 1, en_buyuk + 1
+    ham = (en_buyuk - en_kucuk) / adet
+    us = 10 ** math.floor(math.log10(ham))
+    adim = next(k * us for k in (1, 2, 5, 10) if k * us >= ham)
+    bas = math.floor(en_kucuk / adim) * adim
+    son = math.ceil(en_buyuk / adim) * adim
+    return [bas + i * adim for i in range(int(round((son - bas) / adim)) + 1)]
+
+
+def puan_svg(puanlar, etiketler, baslik='Deneme Sınavı Puanları'):
+    # Puanların çizgi grafiği; etiketler (ör. "TYT\n2026-01-05") x ekseninin
+    # altına eğik yazılır, satır sonları ayrı satır olur
+    g, y = 800, 420
+    sol, sag, ust, alt = 70, 20, 50, 110
+    cizim_g, cizim_y = g - sol - sag, y - ust - alt
+    cizgiler = _araliklar(min(puanlar), max(puanlar))
+    y_min, y_max = cizgiler[0], cizgiler[-1]
+    n = len(puanlar)
+
+    def px(i):
+        return sol + (cizim_g * (i + 0.5) / n)
+
+    def py(v):
+        return ust + cizim_y * (1 - (v - y_min) / (y_max - y_min))
+
+    parcalar = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {g} {y}" width="100%" role="img" '
+        f'aria-label="{escape(baslik)}">',
+        f'<text x="{g / 2}" y="28" text-anchor="middle" font-size="18" font-weight="bold" {YAZI}>{escape(baslik)}</text>',
+    ]
+    for deger in cizgiler:
+        yy = _sayi(py(deger))
+        parcalar.append(f'<line x1="{sol}" y1="{yy}" x2="{g - sag}" y2="{yy}" stroke="#000" stroke-opacity=".1"/>'
+                        f'<text x="{sol - 8}" y="{yy}" dy="4" text-anchor="end" font-size="12" {YAZI}>{_sayi(deger)}</text>')
+    noktalar = ' '.join(f'{_sayi(px(i))},{_sayi(py(v))}' for i, v in enumerate(puanlar))
+    parcalar.append(f'<polyline points="{noktalar}" fill="none" stroke="{RENK}" stroke-width="2.5"/>')
+    # Uzun serilerde işaretler çizilmez, etiketler seyreltilir
+    adim = etiket_adimi(n)
+    for i, (v, etiket) in enumerate(zip(puanlar, etiketler)):
+        x, yy = _sayi(px(i)), _sayi(py(v))
+        if n <= ISARET_SINIRI:
+            parcalar.append(f'<circle cx="{x}" cy="{yy}" r="4" fill="{RENK}">'
+                            f'<title>{escape(etiket)}: {_sayi(v)}</title></circle>')
+        if i % adim:
+            continue
+        satirlar = ''.join(f'<tspan x="{x}" dy="{0 if k == 0 else 13}">{escape(s)}</tspan>'
+                           for k, s in enumerate(str(etiket).split('\n')))
+        parcalar.append(f'<text x="{x}" y="{y - alt + 18}" transform="rotate(-40 {x} {y - alt + 18})" '
+                        f'text-anchor="end" font-size="11" {YAZI}>{satirlar}</text>')
+    parcalar.append(f'<text x="18" y="{ust + cizim_y / 2}" transform="rotate(-90 18 {ust + cizim_y / 2})" '
+                    f'text-anchor="middle" font-size="13" {YAZI}>Puan</text>'
+                    f'<text x="{sol + cizim_g / 2}" y="{y - 6}" text-anchor="middle" font-size="13" {YAZI}>Deneme Sırası</text>'
+                    '</svg>')
+    return Markup(''.join(parcalar))
+
+
+def dagilim_svg(sayilar):
+    # Tek yatay yığılmış çubuk: {'TYT': 5, 'AYT': 3} -> oranlarıyla dilimler
+    toplam = sum(sayilar.values())
+    g, y = 600, 70
+    parcalar = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {g} {y}" width="100%" role="img" '
+                f'aria-label="Deneme türü dağılımı">']
+    x = 0.0
+    for tur, sayi in sayilar.items():
+        if not sayi:
+            continue
+        genislik = g * sayi / toplam
+        renk = TUR_RENKLERI.get(tur, DIGER_RENK)
+        parcalar.append(f'<rect x="{_sayi(x)}" y="0" width="{_sayi(genislik)}" height="36" fill="{renk}">'
+                        f'<title>{escape(tur)}: {sayi}</title></rect>'
+                        f'<text x="{_sayi(x + genislik / 2)}" y="58" text-anchor="middle" font-size="14" {YAZI}>'
+                        f'{escape(tur)} {sayi} (%{_sayi(100 * sayi / toplam)})</text>')
+        x += genislik
+    parcalar.append('</svg>')
+    return Markup(''.join(parcalar))
+
+
+def ilerleme_svg(satirlar):
+    # Yatay tamamlanma çubukları: [(ad, tamamlanan, toplam), ...]
+    satir_y, etiket_g, g = 34, 150, 600
+    y = satir_y * len(satirlar)
+    parcalar = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {g} {y}" width="100%" role="img" '
+                f'aria-label="Ders bazında ilerleme">']
+    cubuk_g = g - etiket_g - 110
+    for i, (ad, tamamlanan, toplam) in enumerate(satirlar):
+        oran = tamamlanan / toplam if toplam else 0
+        ust = i * satir_y + 8
+        parcalar.append(f'<text x="{etiket_g - 10}" y="{ust + 14}" text-anchor="end" font-size="14" {YAZI}>{escape(ad)}</text>'
+                        f'<rect x="{etiket_g}" y="{ust}" width="{cubuk_g}" height="18" rx="6" fill="#e2e8f0"/>'
+                        f'<rect x="{etiket_g}" y="{ust}" width="{_sayi(cubuk_g * oran)}" height="18" rx="6" fill="#667eea"/>'
+                        f'<text x="{etiket_g + cubuk_g + 10}" y="{ust + 14}" font-size="13" {YAZI}>'
+                        f'%{_sayi(100 * oran)} ({tamamlanan}/{toplam})</text>')
+    parcalar.append('</svg>')
+    return Markup(''.join(parcalar))